@@ -0,0 +1,303 @@
+"""Discord에 연결하지 않고 가짜 게이트웨이 이벤트를 이벤트 핸들러에 재생해 처리량을 측정합니다.
+
+사용법 (저장소 최상위 폴더에서):
+    python -m benchmarks.replay --guilds 50 --keywords 200 --events 20000
+    python -m benchmarks.replay --rate 500 --mix message=0.7,voice=0.25,join=0.05 --storage json
+
+임시 폴더에서 실행하므로 실제 mogakco.db, config.json, voice_sessions.jsonl은 건드리지 않습니다.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+HANDLERS = {
+    "message": "on_message",
+    "voice": "on_voice_state_update",
+    "join": "on_member_join",
+}
+VOICE_CHANNELS_PER_GUILD = 3
+
+
+# -------------------- 가짜 Discord 객체 --------------------
+
+class FakeChannel:
+    def __init__(self, channel_id, guild, members=None):
+        self.id = channel_id
+        self.name = f"channel-{channel_id}"
+        self.mention = f"<#{channel_id}>"
+        self.guild = guild
+        self.members = members if members is not None else []
+        self.sent = 0
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+
+
+class FakeGuild:
+    def __init__(self, guild_id):
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+        self.icon = None
+        self.member_count = 0
+        self.channels = {}
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def add_channel(self, channel):
+        self.channels[channel.id] = channel
+        return channel
+
+    def __str__(self):
+        return self.name
+
+
+class FakeAvatar:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+
+class FakeMember:
+    bot = False
+    display_avatar = FakeAvatar()
+
+    def __init__(self, member_id, guild):
+        self.id = member_id
+        self.guild = guild
+        self.display_name = f"user-{member_id}"
+        self.mention = f"<@{member_id}>"
+
+    async def send(self, *args, **kwargs):
+        pass
+
+    async def timeout(self, duration, reason=None):
+        pass
+
+    async def kick(self, reason=None):
+        pass
+
+    async def ban(self, reason=None):
+        pass
+
+    def __str__(self):
+        return self.display_name
+
+
+class FakeMessage:
+    def __init__(self, author, channel, content):
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.content = content
+
+    async def delete(self):
+        pass
+
+
+class FakeVoiceState:
+    def __init__(self, channel=None):
+        self.channel = channel
+
+
+# -------------------- 시나리오 생성 --------------------
+
+HANGUL_START, HANGUL_COUNT = 0xAC00, 11172
+
+def random_word(rng, length):
+    return "".join(chr(HANGUL_START + rng.randrange(HANGUL_COUNT)) for _ in range(length))
+
+class Scenario:
+    """서버, 채널, 멤버, 검열 규칙을 만들고 이벤트를 무작위로 생성합니다."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.guilds = []
+        self.next_member_id = 10_000
+
+        for index in range(args.guilds):
+            guild = FakeGuild((index + 1) << 22)  # 샤드 번호 계산과 같은 방식의 ID
+            guild.log_channel = guild.add_channel(FakeChannel(guild.id + 1, guild))
+            guild.text_channel = guild.add_channel(FakeChannel(guild.id + 2, guild))
+            guild.voice_channels = [guild.add_channel(FakeChannel(guild.id + 10 + n, guild)) for n in range(VOICE_CHANNELS_PER_GUILD)]
+            guild.keywords = [random_word(self.rng, self.rng.randint(2, 4)) for _ in range(args.keywords)]
+            guild.members = [self.new_member(guild) for _ in range(args.members)]
+            guild.in_voice = {}  # {member: channel}
+            self.guilds.append(guild)
+
+    def new_member(self, guild):
+        self.next_member_id += 1
+        guild.member_count += 1
+        return FakeMember(self.next_member_id, guild)
+
+    def guild_settings(self, guild):
+        patterns = [{"type": "wildcard", "pattern": f"{random_word(self.rng, 1)}*{random_word(self.rng, 1)}"} for _ in range(self.args.patterns)]
+        return {
+            "text_channel_id": guild.log_channel.id,
+            "voice_channel_ids": [channel.id for channel in guild.voice_channels],
+            "censored_keywords": guild.keywords,
+            "censored_patterns": patterns,
+            "punishment": {"type": "timeout", "threshold": 3, "timeout_duration_minutes": 10, "warning_decay_days": 7},
+            "spam_protection": {"enabled": True},
+            "welcome_message": {
+                "enabled": True,
+                "channel_id": guild.text_channel.id,
+                "message": "$user_mention 님, $server_name에 오신 것을 환영합니다! (현재 $member_count명)",
+                "use_embed": True,
+            },
+        }
+
+    def message_event(self, guild):
+        author = self.rng.choice(guild.members)
+        words = [random_word(self.rng, self.rng.randint(1, 5)) for _ in range(self.rng.randint(3, 20))]
+        if guild.keywords and self.rng.random() < self.args.hit_rate:
+            words.insert(self.rng.randrange(len(words) + 1), self.rng.choice(guild.keywords))
+        return (FakeMessage(author, guild.text_channel, " ".join(words)),)
+
+    def voice_event(self, guild):
+        member = self.rng.choice(guild.members)
+        current = guild.in_voice.get(member)
+        if current is None:
+            after = self.rng.choice(guild.voice_channels)
+        elif self.rng.random() < 0.3:
+            after = self.rng.choice([channel for channel in guild.voice_channels if channel is not current])
+        else:
+            after = None
+
+        before_state, after_state = FakeVoiceState(current), FakeVoiceState(after)
+        if current is not None:
+            current.members.remove(member)
+        if after is not None:
+            after.members.append(member)
+            guild.in_voice[member] = after
+        else:
+            guild.in_voice.pop(member, None)
+        return (member, before_state, after_state)
+
+    def join_event(self, guild):
+        member = self.new_member(guild)
+        guild.members.append(member)
+        return (member,)
+
+    def events(self, count):
+        kinds, weights = zip(*self.args.mix.items())
+        builders = {"message": self.message_event, "voice": self.voice_event, "join": self.join_event}
+        for _ in range(count):
+            kind = self.rng.choices(kinds, weights)[0]
+            yield kind, builders[kind](self.rng.choice(self.guilds))
+
+
+# -------------------- 실행 --------------------
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in HANDLERS:
+            raise argparse.ArgumentTypeError(f"알 수 없는 이벤트 종류입니다: {name} (가능: {', '.join(HANDLERS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+async def run(args):
+    # 설정과 기록 파일은 모두 임시 폴더에 만들어지도록 모듈을 불러오기 전에 이동
+    workdir = tempfile.mkdtemp(prefix="mogakco-bench-")
+    os.chdir(workdir)
+    os.environ["STORAGE_BACKEND"] = args.storage
+    os.environ["DATABASE_FILE"] = os.path.join(workdir, "bench.db")
+    for name in ("SHARD_COUNT", "SHARD_IDS"):
+        os.environ.pop(name, None)
+
+    from events import member_events, voice_events, message_events
+    from utils import load_config, save_config, flush_config, log_dispatcher, moderation_queue, voice_ledger, audit_journal, metrics
+    modules = {"message": message_events, "voice": voice_events, "join": member_events}
+    handlers = {kind: getattr(modules[kind], name) for kind, name in HANDLERS.items()}
+
+    scenario = Scenario(args)
+    config = load_config()
+    for guild in scenario.guilds:
+        config[str(guild.id)] = scenario.guild_settings(guild)
+        save_config(config, str(guild.id))
+    flush_config()
+
+    # 준비 단계의 저장 기록은 결과에서 제외
+    metrics.enabled = True
+    rows_before = metrics.counters.get("storage.rows", 0)
+    batches_before = metrics.counters.get("storage.batches", 0)
+
+    latencies = {kind: [] for kind in HANDLERS}
+    events = list(scenario.events(args.events))
+    interval = 1.0 / args.rate if args.rate > 0 else 0.0
+
+    started = time.perf_counter()
+    for index, (kind, event_args) in enumerate(events):
+        if interval:
+            delay = started + index * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        handler_start = time.perf_counter()
+        await handlers[kind](*event_args)
+        latencies[kind].append(time.perf_counter() - handler_start)
+    elapsed = time.perf_counter() - started
+
+    # 대기 중인 검열 작업, 로그, 저장을 마저 처리해야 이벤트당 기록 수가 정확해짐
+    await moderation_queue.close()
+    await log_dispatcher.close()
+    flush_config()
+    voice_ledger.shutdown()
+    audit_journal.shutdown()
+    rows = metrics.counters.get("storage.rows", 0) - rows_before
+    batches = metrics.counters.get("storage.batches", 0) - batches_before
+
+    total = len(events)
+    print(f"설정: 서버 {args.guilds}개, 서버당 키워드 {args.keywords}개/패턴 {args.patterns}개, 멤버 {args.members}명, "
+          f"저장소 {args.storage}, 목표 속도 {'최대' if not args.rate else f'{args.rate:g}/s'}")
+    print(f"{'핸들러':<24}{'이벤트':>8}{'p50':>11}{'p99':>11}{'최대':>11}{'평균':>11}")
+    for kind, values in latencies.items():
+        if not values:
+            continue
+        values.sort()
+        print(f"{HANDLERS[kind]:<24}{len(values):>8}"
+              + "".join(f"{value * 1e6:>9.1f}us" for value in (percentile(values, 0.5), percentile(values, 0.99), values[-1], statistics.fmean(values))))
+    all_values = sorted(value for values in latencies.values() for value in values)
+    print(f"{'전체':<24}{total:>8}"
+          + "".join(f"{value * 1e6:>9.1f}us" for value in (percentile(all_values, 0.5), percentile(all_values, 0.99), all_values[-1], statistics.fmean(all_values))))
+    print(f"처리량: {total / elapsed:,.0f} 이벤트/초 ({elapsed:.2f}초)")
+    print(f"저장소 기록: {rows}행, {batches}번 저장 (이벤트당 {rows / total:.3f}행, {batches / total:.4f}번)")
+    if not args.keep:
+        import shutil
+        shutil.rmtree(workdir, ignore_errors=True)
+    else:
+        print(f"작업 폴더: {workdir}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 게이트웨이 이벤트로 이벤트 핸들러 처리량을 측정합니다.")
+    parser.add_argument("--guilds", type=int, default=20, help="서버 수")
+    parser.add_argument("--members", type=int, default=200, help="서버당 멤버 수")
+    parser.add_argument("--keywords", type=int, default=100, help="서버당 검열 키워드 수")
+    parser.add_argument("--patterns", type=int, default=5, help="서버당 와일드카드 패턴 수")
+    parser.add_argument("--hit-rate", type=float, default=0.05, help="검열 키워드가 들어간 메시지 비율")
+    parser.add_argument("--events", type=int, default=10000, help="재생할 이벤트 수")
+    parser.add_argument("--rate", type=float, default=0, help="초당 이벤트 수 (0이면 최대 속도)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("message=0.8,voice=0.15,join=0.05"), help="이벤트 종류별 비율")
+    parser.add_argument("--storage", choices=("sqlite", "json"), default="sqlite", help="저장소 종류")
+    parser.add_argument("--seed", type=int, default=1, help="난수 시드")
+    parser.add_argument("--keep", action="store_true", help="임시 작업 폴더를 지우지 않음")
+    args = parser.parse_args(argv)
+
+    # 임시 폴더로 이동한 뒤에도 봇 모듈을 찾을 수 있도록 저장소 경로를 추가
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,104 @@
+import time
+_started_at = time.perf_counter()
+
 import discord
 from discord.ext import commands
 from discord import app_commands
 import os
 from dotenv import load_dotenv
 
-# 모듈 import
-from cogs import setup_all_cogs
-from events import setup_all_events
+# 모듈 import (Cog와 이벤트 모듈은 setup_hook에서 확장으로 불러옴)
+from cogs import EXTENSIONS as COG_EXTENSIONS
+from events import EXTENSIONS as EVENT_EXTENSIONS
+from events.voice_events import reconcile_voice_sessions
+from utils import (
+    flush_config, start_config_refresh, get_shard_config, sync_command_tree, log_dispatcher, moderation_queue, voice_ledger, audit_journal, StartupReport,
+    metrics, start_metrics_server, stop_metrics_server
+)
+
+startup_report = StartupReport(_started_at)
+startup_report.record("모듈 import", time.perf_counter() - _started_at)
 
 # -------------------- 초기 설정 --------------------
 
 load_dotenv()
 BOT_TOKEN = os.environ.get("API_KEY")
+metrics.enabled = os.environ.get("METRICS_ENABLED", "1") != "0"
+METRICS_PORT = os.environ.get("METRICS_PORT")
 
 intents = discord.Intents.default()
 intents.voice_states = True
 intents.members = True
 intents.message_content = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+# SHARD_COUNT만 주면 한 프로세스에서 모든 샤드를, SHARD_IDS도 주면 해당 샤드만 실행
+shard_config = get_shard_config()
+
+class MogakcoBot(commands.AutoShardedBot):
+    async def setup_hook(self):
+        # setup_hook은 로그인 직후 한 번만 실행되므로, 재연결로 on_ready가 다시 와도 중복 등록되지 않음
+        for name in COG_EXTENSIONS + EVENT_EXTENSIONS:
+            with startup_report.measure(f"확장 로드: {name}"):
+                try:
+                    await self.load_extension(name)
+                except commands.ExtensionError as e:
+                    print(f"'{name}' 확장을 불러오지 못했습니다: {e}")
+
+        # 슬래시 명령어는 전역이므로 0번 샤드를 맡은 프로세스만, 정의가 바뀌었을 때만 동기화
+        if shard_config.is_primary:
+            with startup_report.measure("명령어 동기화"):
+                try:
+                    synced = await sync_command_tree(self, force=os.environ.get("FORCE_COMMAND_SYNC") == "1")
+                    if synced is None:
+                        print("슬래시 명령어 변경 사항이 없어 동기화를 건너뜁니다.")
+                    else:
+                        print(f"{synced}개의 슬래시 명령어를 동기화했습니다.")
+                except Exception as e:
+                    print(f"명령어 동기화 실패: {e}")
+
+        # Prometheus 형식 지표는 METRICS_PORT를 지정했을 때만 로컬에서 제공
+        if METRICS_PORT and metrics.enabled:
+            try:
+                await start_metrics_server(int(METRICS_PORT))
+                print(f"지표 서버 시작: http://127.0.0.1:{METRICS_PORT}/metrics")
+            except (OSError, ValueError) as e:
+                print(f"지표 서버를 시작하지 못했습니다: {e}")
+        self.setup_finished_at = time.perf_counter()
+
+    async def close(self):
+        # 연결을 끊기 전에 남은 검열 작업을 처리하고, 묶여서 대기 중인 로그를 모두 전송
+        await moderation_queue.close()
+        await log_dispatcher.close()
+        await stop_metrics_server()
+        await super().close()
+        # 종료 시각을 기록해 두면 재시작 후 빠진 퇴장을 이 시각으로 마감
+        voice_ledger.shutdown()
+        audit_journal.shutdown()
+
+bot = MogakcoBot(command_prefix="!", intents=intents, **shard_config.bot_options())
 
 # -------------------- 봇 이벤트 핸들러 --------------------
 
 @bot.event
 async def on_ready():
-    print(f'{bot.user} (으)로 로그인 성공!')
+    print(f'{bot.user} (으)로 로그인 성공! ({shard_config.describe()}, 서버 {len(bot.guilds)}개)')
 
-    # Cogs 로드
-    await setup_all_cogs(bot)
+    if not startup_report.finished:
+        startup_report.record("게이트웨이 연결", time.perf_counter() - bot.setup_finished_at)
 
-    # 이벤트 핸들러 등록
-    setup_all_events(bot)
+    # 재시작/재연결 동안 놓친 음성 채널 입장·퇴장 정리 (여러 번 실행해도 결과가 같음)
+    with startup_report.measure("음성 세션 복원"):
+        await reconcile_voice_sessions(bot)
 
-    # 슬래시 명령어 동기화
-    try:
-        synced = await bot.tree.sync()
-        print(f"{len(synced)}개의 슬래시 명령어를 동기화했습니다.")
-    except Exception as e:
-        print(f"명령어 동기화 실패: {e}")
+    # 다른 프로세스가 맡은 샤드에서 저장한 설정 변경을 주기적으로 반영
+    start_config_refresh()
+
+    if not startup_report.finished:
+        print(startup_report.finish())
+
+@bot.event
+async def on_shard_ready(shard_id):
+    print(f"{shard_id}번 샤드 연결 완료")
 
 @bot.event
 async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
@@ -56,6 +117,10 @@ async def on_app_command_error(interaction: discord.Interaction, error: app_comm
 # -------------------- 봇 실행 --------------------
 
 if BOT_TOKEN:
-    bot.run(BOT_TOKEN)
+    try:
+        bot.run(BOT_TOKEN)
+    finally:
+        # 종료 전에 메모리에 남은 설정 변경을 파일에 기록
+        flush_config()
 else:
     print("오류: .env 파일에서 BOT_TOKEN을 찾을 수 없습니다.")
@@ -1,13 +1,9 @@
-from .admin import AdminCog
-from .moderation import ModerationCog
-from .welcome import WelcomeCog
-from .voice import VoiceCog
+# 명령어 Cog 확장 목록. 각 모듈은 bot.load_extension()으로 불러올 때 import됩니다.
+EXTENSIONS = [
+    'cogs.admin',
+    'cogs.moderation',
+    'cogs.welcome',
+    'cogs.voice',
+]
 
-async def setup_all_cogs(bot):
-    """모든 Cog를 봇에 등록합니다."""
-    await bot.add_cog(AdminCog(bot))
-    await bot.add_cog(ModerationCog(bot))
-    await bot.add_cog(WelcomeCog(bot))
-    await bot.add_cog(VoiceCog(bot))
-
-__all__ = ['setup_all_cogs']
+__all__ = ['EXTENSIONS']
@@ -1,8 +1,19 @@
+import os
+import time
+import sqlite3
+import datetime
 import discord
 from discord import app_commands
 from discord.ext import commands
-from utils import load_config, save_config, config_lock
-from views import SettingsView
+from utils import load_config, save_config, guild_lock, sync_command_tree, get_shard_config, metrics, format_duration, export_guild_data, export_filename
+from views.settings_view import SettingsView, format_voice_channels
+from cogs import EXTENSIONS as COG_EXTENSIONS
+from events import EXTENSIONS as EVENT_EXTENSIONS
+
+ALL_EXTENSIONS = COG_EXTENSIONS + EVENT_EXTENSIONS
+
+async def is_bot_owner(interaction: discord.Interaction):
+    return await interaction.client.is_owner(interaction.user)
 
 class AdminCog(commands.Cog):
     """관리자 설정 관련 명령어"""
@@ -29,23 +40,149 @@ class AdminCog(commands.Cog):
                 await interaction.response.send_message("❌ 채널 생성 권한이 없습니다.", ephemeral=True)
                 return
 
-        async with config_lock:
+        async with guild_lock(guild_id, 'channels'):
             config = load_config()
             if guild_id not in config:
                 config[guild_id] = {}
             config[guild_id]['text_channel_id'] = log_channel.id
-            save_config(config)
+            save_config(config, guild_id)
 
     @app_commands.command(name="설정", description="음성 채널과 로그 채널 설정을 위한 패널을 엽니다.")
     @app_commands.checks.has_permissions(administrator=True)
     async def set_command(self, interaction: discord.Interaction):
         config = load_config().get(str(interaction.guild.id), {})
-        vc = interaction.guild.get_channel(config.get("voice_channel_id")) if config.get("voice_channel_id") else None
         tc = interaction.guild.get_channel(config.get("text_channel_id")) if config.get("text_channel_id") else None
         embed = discord.Embed(title="🎙️ 음성 채널 로그 설정", description="아래 드롭다운 메뉴에서 채널을 선택해 설정을 변경하세요.", color=discord.Color.blue())
-        embed.add_field(name="감시 중인 음성 채널", value=vc.mention if vc else "미설정", inline=False)
+        embed.add_field(name="감시 중인 음성 채널", value=format_voice_channels(interaction.guild), inline=False)
         embed.add_field(name="로그가 기록될 텍스트 채널", value=tc.mention if tc else "미설정", inline=False)
         await interaction.response.send_message(embed=embed, view=SettingsView(interaction), ephemeral=True)
 
+    @app_commands.command(name="상태", description="봇의 가동 시간과 이벤트 처리/저장소 지연 시간을 확인합니다.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def status(self, interaction: discord.Interaction):
+        embed = discord.Embed(title="📊 봇 상태", color=discord.Color.blurple())
+        embed.add_field(name="가동 시간", value=format_duration(time.time() - metrics.started_at), inline=True)
+        embed.add_field(name="서버 수", value=f"{len(self.bot.guilds)}개", inline=True)
+        embed.add_field(name="게이트웨이 지연", value=f"{self.bot.latency * 1000:.0f}ms", inline=True)
+        embed.add_field(name="샤드", value=get_shard_config().describe(), inline=False)
+
+        if not metrics.enabled:
+            embed.add_field(name="지연 시간", value="지표 수집이 꺼져 있습니다. (`METRICS_ENABLED=0`)", inline=False)
+        else:
+            rows = [f"{'이름':<28}{'횟수':>7}{'평균':>9}{'p50':>9}{'p99':>9}{'최대':>9}"]
+            for name, count, average, p50, p99, maximum in metrics.snapshot():
+                rows.append(f"{name:<28}{count:>7}" + "".join(f"{value * 1000:>7.1f}ms" for value in (average, p50, p99, maximum)))
+            value = "\n".join(rows) if len(rows) > 1 else "아직 기록된 지표가 없습니다."
+            embed.add_field(name="지연 시간 (p50/p99는 구간 상한)", value=f"```{value[:1000]}```", inline=False)
+            if metrics.counters:
+                counters = "\n".join(f"{name}: {value}" for name, value in sorted(metrics.counters.items()))
+                embed.add_field(name="카운터", value=f"```{counters[:1000]}```", inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="내보내기", description="음성 기록, 경고, 감사 기록을 압축한 CSV/JSONL 파일로 내려받습니다.")
+    @app_commands.describe(kind="내보낼 데이터", fmt="파일 형식 (기본: CSV)", user="이 사용자의 기록만 내보냅니다", since="시작 날짜 YYYY-MM-DD (포함)", until="끝 날짜 YYYY-MM-DD (포함)")
+    @app_commands.rename(kind="종류", fmt="형식", user="사용자", since="시작일", until="종료일")
+    @app_commands.choices(
+        kind=[
+            app_commands.Choice(name="일별 음성 채널 체류 시간", value="voice_daily"),
+            app_commands.Choice(name="누적 음성 채널 체류 시간", value="voice_totals"),
+            app_commands.Choice(name="경고 기록", value="warnings"),
+            app_commands.Choice(name="감사 기록", value="audit"),
+        ],
+        fmt=[
+            app_commands.Choice(name="CSV", value="csv"),
+            app_commands.Choice(name="JSONL", value="jsonl"),
+        ]
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def export(self, interaction: discord.Interaction, kind: str, fmt: str = "csv", user: discord.User = None, since: str = None, until: str = None):
+        try:
+            start = datetime.date.fromisoformat(since) if since else None
+            end = datetime.date.fromisoformat(until) if until else None
+        except ValueError:
+            await interaction.response.send_message("❌ 날짜는 YYYY-MM-DD 형식으로 입력해주세요. (예: 2024-03-01)", ephemeral=True)
+            return
+        if start and end and start > end:
+            await interaction.response.send_message("❌ 시작일이 종료일보다 늦습니다.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            path, count = await export_guild_data(kind, fmt, interaction.guild.id, user.id if user else None, start, end)
+        except (OSError, sqlite3.Error) as e:
+            print(f"데이터 내보내기 실패 ({interaction.guild.id}, {kind}): {e}")
+            await interaction.followup.send(f"❌ 데이터를 내보내지 못했습니다: {e}", ephemeral=True)
+            return
+        try:
+            size = os.path.getsize(path)
+            if size > interaction.guild.filesize_limit:
+                await interaction.followup.send(
+                    f"❌ 파일이 너무 큽니다. ({size / 1024 / 1024:.1f}MB, 이 서버의 업로드 한도 {interaction.guild.filesize_limit / 1024 / 1024:.0f}MB)\n"
+                    "기간이나 사용자를 지정하거나, 서버에서 `python -m tools.export_data`로 내보내주세요.",
+                    ephemeral=True
+                )
+                return
+            await interaction.followup.send(
+                f"📦 {count:,}개 행을 내보냈습니다.",
+                file=discord.File(path, filename=export_filename(kind, fmt, interaction.guild.id)),
+                ephemeral=True
+            )
+        finally:
+            os.remove(path)
+
+    extension_action_choices = [
+        app_commands.Choice(name="다시 불러오기", value="reload"),
+        app_commands.Choice(name="불러오기", value="load"),
+        app_commands.Choice(name="내리기", value="unload"),
+    ]
+
+    @app_commands.command(name="리로드", description="Cog나 이벤트 확장을 봇을 끄지 않고 다시 불러옵니다. (봇 소유자 전용)")
+    @app_commands.describe(extension="대상 확장 (예: cogs.voice)", action="실행할 동작 (기본: 다시 불러오기)")
+    @app_commands.rename(extension="확장", action="동작")
+    @app_commands.choices(action=extension_action_choices)
+    @app_commands.check(is_bot_owner)
+    async def manage_extension(self, interaction: discord.Interaction, extension: str, action: str = "reload"):
+        if extension not in ALL_EXTENSIONS:
+            await interaction.response.send_message(f"❌ `{extension}`은(는) 알 수 없는 확장입니다.", ephemeral=True)
+            return
+        if action == "unload" and extension == __name__:
+            await interaction.response.send_message("❌ 이 명령어가 들어 있는 확장은 내릴 수 없습니다. 다시 불러오기를 사용하세요.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        start = time.perf_counter()
+        try:
+            if action == "load":
+                await self.bot.load_extension(extension)
+            elif action == "unload":
+                await self.bot.unload_extension(extension)
+            else:
+                await self.bot.reload_extension(extension)
+        except commands.ExtensionError as e:
+            await interaction.followup.send(f"❌ `{extension}` 처리 실패: {e}", ephemeral=True)
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        # 명령어 정의가 바뀌었을 때만 동기화 (코드만 고친 경우는 건너뜀)
+        sync_message = ""
+        if get_shard_config().is_primary:
+            try:
+                synced = await sync_command_tree(self.bot)
+                if synced is not None:
+                    sync_message = f"\n슬래시 명령어 {synced}개를 다시 동기화했습니다."
+            except Exception as e:
+                sync_message = f"\n⚠️ 명령어 동기화 실패: {e}"
+
+        action_names = {choice.value: choice.name for choice in self.extension_action_choices}
+        await interaction.followup.send(f"✅ `{extension}` {action_names[action]} 완료 ({elapsed_ms:.1f}ms){sync_message}", ephemeral=True)
+
+    @manage_extension.autocomplete('extension')
+    async def extension_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=f"{name} ({'로드됨' if name in self.bot.extensions else '내려짐'})", value=name)
+            for name in ALL_EXTENSIONS if current in name
+        ][:25]
+
 async def setup(bot):
     await bot.add_cog(AdminCog(bot))
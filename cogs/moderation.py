@@ -1,58 +1,160 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from utils import load_config, save_config, config_lock
-from views import KeywordModal, PunishmentSettingsView
+from utils import (
+    load_config, save_config, guild_lock, reset_warnings, invalidate_keyword_matcher, describe_rule, send_log,
+    get_raid_settings, join_rate_tracker, get_spam_settings, spam_detector,
+    get_keyword_matcher, get_pattern_rules, active_scans, resume_or_start, record_audit
+)
+from views.keyword_modal import KeywordModal
+from views.history_scan_view import HistoryScanView, build_scan_embed
+from views.audit_view import AuditLogView
+from views.punishment_view import PunishmentSettingsView
 
 class ModerationCog(commands.Cog):
     """검열 및 처벌 관련 명령어"""
     def __init__(self, bot):
         self.bot = bot
 
-    @app_commands.command(name="검열추가", description="검열할 키워드를 추가합니다.")
+    rule_type_choices = [
+        app_commands.Choice(name="키워드", value="keyword"),
+        app_commands.Choice(name="와일드카드 (* = 아무 글자, ? = 한 글자)", value="wildcard"),
+        app_commands.Choice(name="정규식", value="regex"),
+    ]
+
+    @app_commands.command(name="검열추가", description="검열할 키워드나 패턴을 추가합니다.")
+    @app_commands.describe(rule_type="검열 규칙의 종류 (기본: 키워드)")
+    @app_commands.rename(rule_type="유형")
+    @app_commands.choices(rule_type=rule_type_choices)
     @app_commands.checks.has_permissions(administrator=True)
-    async def add_keyword(self, interaction: discord.Interaction):
-        await interaction.response.send_modal(KeywordModal(title="검열 키워드 추가", action='add'))
+    async def add_keyword(self, interaction: discord.Interaction, rule_type: str = "keyword"):
+        await interaction.response.send_modal(KeywordModal(title="검열 규칙 추가", action='add', rule_type=rule_type))
 
-    @app_commands.command(name="검열삭제", description="등록된 검열 키워드를 삭제합니다.")
+    @app_commands.command(name="검열삭제", description="등록된 검열 키워드나 패턴을 삭제합니다.")
+    @app_commands.describe(rule_type="검열 규칙의 종류 (기본: 키워드)")
+    @app_commands.rename(rule_type="유형")
+    @app_commands.choices(rule_type=rule_type_choices)
     @app_commands.checks.has_permissions(administrator=True)
-    async def remove_keyword(self, interaction: discord.Interaction):
-        await interaction.response.send_modal(KeywordModal(title="검열 키워드 삭제", action='remove'))
+    async def remove_keyword(self, interaction: discord.Interaction, rule_type: str = "keyword"):
+        await interaction.response.send_modal(KeywordModal(title="검열 규칙 삭제", action='remove', rule_type=rule_type))
 
-    @app_commands.command(name="검열목록", description="등록된 모든 검열 키워드를 확인합니다.")
+    @app_commands.command(name="검열목록", description="등록된 모든 검열 키워드와 패턴을 확인합니다.")
     @app_commands.checks.has_permissions(administrator=True)
     async def list_keywords(self, interaction: discord.Interaction):
-        keywords = load_config().get(str(interaction.guild.id), {}).get("censored_keywords", [])
-        if not keywords:
+        server_config = load_config().get(str(interaction.guild.id), {})
+        keywords = server_config.get("censored_keywords", [])
+        patterns = server_config.get("censored_patterns", [])
+        if not keywords and not patterns:
             await interaction.response.send_message("📝 등록된 검열 키워드가 없습니다.", ephemeral=True)
             return
         embed = discord.Embed(title="🚫 검열 키워드 목록", description="\n".join(f"- {word}" for word in keywords), color=discord.Color.orange())
+        if patterns:
+            embed.add_field(name="패턴 규칙", value="\n".join(f"- {describe_rule(rule)}" for rule in patterns)[:1024], inline=False)
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
-    @app_commands.command(name="경고초기화", description="특정 사용자의 누적된 경고 횟수를 0으로 초기화합니다.")
-    @app_commands.describe(member="경고를 초기화할 서버 멤버를 선택하세요.")
+    @app_commands.command(name="검열스캔", description="채널의 지난 메시지를 검사해 검열 규칙에 걸린 메시지를 삭제합니다.")
+    @app_commands.describe(
+        channel="검사할 채널 (기본: 현재 채널)",
+        days="며칠 전 메시지까지 검사할지 (기본: 7)",
+        restart="저장된 진행 위치를 무시하고 처음부터 다시 검사합니다."
+    )
+    @app_commands.rename(channel="채널", days="기간", restart="처음부터")
     @app_commands.checks.has_permissions(administrator=True)
-    async def reset_warnings(self, interaction: discord.Interaction, member: discord.Member):
+    async def scan_history(self, interaction: discord.Interaction, channel: discord.TextChannel = None,
+                           days: app_commands.Range[int, 1, 365] = 7, restart: bool = False):
         guild_id = str(interaction.guild.id)
-        user_id = str(member.id)
+        channel = channel or interaction.channel
+
+        if channel.id in active_scans:
+            await interaction.response.send_message(f"⚠️ {channel.mention} 채널은 이미 검사 중입니다.", ephemeral=True)
+            return
+        if not get_keyword_matcher(guild_id) and not get_pattern_rules(guild_id):
+            await interaction.response.send_message("📝 등록된 검열 키워드나 패턴이 없습니다. `/검열추가`로 먼저 등록해주세요.", ephemeral=True)
+            return
+        permissions = channel.permissions_for(interaction.guild.me)
+        if not (permissions.read_message_history and permissions.manage_messages):
+            await interaction.response.send_message(f"⚠️ {channel.mention} 채널의 메시지 기록 보기와 메시지 관리 권한이 필요합니다.", ephemeral=True)
+            return
+
+        scan = active_scans[channel.id] = resume_or_start(channel, days, restart)
+        view = HistoryScanView(scan)
+        status = f"저장된 위치부터 이어서 검사하는 중... (이전 실행에서 {scan.scanned:,}개 검사)" if scan.before else "검사하는 중..."
+        await interaction.response.send_message(embed=build_scan_embed(scan, status), view=view, ephemeral=True)
+
+        async def report_progress(scan):
+            try:
+                await interaction.edit_original_response(embed=build_scan_embed(scan, status), view=view)
+            except discord.HTTPException:
+                pass  # 응답 수정 기한(15분)이 지나도 검사는 계속함
 
-        async with config_lock:
+        try:
+            await scan.run(on_progress=report_progress)
+            if scan.finished:
+                result = "✅ 검사를 마쳤습니다."
+            else:
+                result = "⏹️ 검사를 중지했습니다. 다시 `/검열스캔`을 실행하면 이어서 검사합니다."
+        except discord.Forbidden:
+            result = "⚠️ 권한이 부족해 검사를 중단했습니다. 다시 실행하면 이어서 검사합니다."
+        except discord.HTTPException as e:
+            result = f"⚠️ 오류로 검사를 중단했습니다: {e}"
+        finally:
+            active_scans.pop(channel.id, None)
+            view.stop()
+
+        try:
+            await interaction.edit_original_response(embed=build_scan_embed(scan, result), view=None)
+        except discord.HTTPException:
+            pass
+
+        log_channel_id = load_config().get(guild_id, {}).get("text_channel_id")
+        log_channel = interaction.guild.get_channel(log_channel_id) if log_channel_id else None
+        if log_channel:
+            embed = build_scan_embed(scan, result)
+            embed.add_field(name="실행한 관리자", value=interaction.user.mention, inline=False)
+            send_log(log_channel, embed=embed)
+
+    @app_commands.command(name="검열설정", description="검열 시 유사 문자 치환 여부를 설정합니다.")
+    @app_commands.describe(fold_homoglyphs="켜면 0→o, 키릴 문자 а→a처럼 모양이 비슷한 문자를 같은 글자로 보고 검열합니다.")
+    @app_commands.rename(fold_homoglyphs="유사문자치환")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def censor_settings(self, interaction: discord.Interaction, fold_homoglyphs: bool):
+        guild_id = str(interaction.guild.id)
+        async with guild_lock(guild_id, 'censored_keywords'):
             config = load_config()
-            if guild_id not in config or 'warning_counts' not in config[guild_id] or user_id not in config[guild_id]['warning_counts']:
-                await interaction.response.send_message(f"✅ **{member.display_name}** 님은 초기화할 경고 기록이 없습니다.", ephemeral=True)
-                return
+            if guild_id not in config:
+                config[guild_id] = {}
+            config[guild_id]["fold_homoglyphs"] = fold_homoglyphs
+            save_config(config, guild_id)
+        invalidate_keyword_matcher(guild_id)
+        await interaction.response.send_message(f"✅ 유사 문자 치환을 {'켰습니다' if fold_homoglyphs else '껐습니다'}.", ephemeral=True)
 
-            del config[guild_id]['warning_counts'][user_id]
-            save_config(config)
+    @app_commands.command(name="경고초기화", description="특정 사용자의 누적된 경고 횟수를 0으로 초기화합니다.")
+    @app_commands.describe(member="경고를 초기화할 서버 멤버를 선택하세요.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def reset_member_warnings(self, interaction: discord.Interaction, member: discord.Member):
+        guild_id = str(interaction.guild.id)
 
+        if not reset_warnings(guild_id, member.id):
+            await interaction.response.send_message(f"✅ **{member.display_name}** 님은 초기화할 경고 기록이 없습니다.", ephemeral=True)
+            return
+
+        record_audit(guild_id, "warning_reset", user_id=member.id, actor_id=interaction.user.id)
         await interaction.response.send_message(f"✅ **{member.display_name}** 님의 경고 횟수를 성공적으로 초기화했습니다.", ephemeral=True)
 
-        log_channel_id = load_config()[guild_id].get("text_channel_id")
+        log_channel_id = load_config().get(guild_id, {}).get("text_channel_id")
         if log_channel_id:
             log_channel = self.bot.get_channel(log_channel_id)
             if log_channel:
                 embed = discord.Embed(title="ℹ️ 경고 초기화", description=f"관리자 **{interaction.user.display_name}** 님이 **{member.mention}** 님의 경고를 초기화했습니다.", color=discord.Color.light_grey())
-                await log_channel.send(embed=embed)
+                send_log(log_channel, embed=embed)
+
+    @app_commands.command(name="기록", description="검열, 처벌, 경고 초기화 기록을 최신순으로 확인합니다.")
+    @app_commands.describe(user="기록을 확인할 사용자 (비우면 서버 전체 기록)")
+    @app_commands.rename(user="사용자")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def audit_log(self, interaction: discord.Interaction, user: discord.User = None):
+        view = AuditLogView(str(interaction.guild.id), user)
+        await interaction.response.send_message(embed=await view.build_embed(), view=view, ephemeral=True)
 
     @app_commands.command(name="처벌설정", description="검열 적발 시 자동 처벌 규칙을 설정합니다.")
     @app_commands.checks.has_permissions(administrator=True)
@@ -63,6 +165,7 @@ class ModerationCog(commands.Cog):
         ptype = punishment_config.get('type', 'none')
         threshold = punishment_config.get('threshold', 0)
         duration = punishment_config.get('timeout_duration_minutes', 0)
+        decay_days = punishment_config.get('warning_decay_days', 0)
 
         type_map = {"none": "사용 안함", "timeout": "타임아웃", "kick": "추방", "ban": "차단"}
 
@@ -71,8 +174,95 @@ class ModerationCog(commands.Cog):
         embed.add_field(name="적발 횟수", value=f"{threshold}회" if ptype != 'none' else "미설정", inline=True)
         if ptype == 'timeout':
             embed.add_field(name="타임아웃 시간", value=f"{duration}분" if ptype == 'timeout' else "미설정", inline=True)
+        if ptype != 'none':
+            embed.add_field(name="경고 유효 기간", value=f"{decay_days}일" if decay_days else "만료 없음", inline=True)
 
         await interaction.response.send_message(embed=embed, view=PunishmentSettingsView(), ephemeral=True)
 
+    @app_commands.command(name="도배방지", description="짧은 시간에 메시지를 많이 보내거나 같은 메시지를 반복하는 도배를 막습니다.")
+    @app_commands.describe(
+        enabled="켜면 도배 메시지를 삭제하고 검열과 같은 경고/처벌 규칙을 적용합니다.",
+        flood_messages="도배로 판단할 메시지 수 (기본: 6)",
+        flood_seconds="메시지 수를 세는 시간(초) (기본: 5)",
+        duplicate_count="거의 같은 메시지를 이 횟수만큼 보내면 도배로 판단 (기본: 3)",
+        duplicate_seconds="같은 메시지 반복을 확인하는 시간(초) (기본: 60)"
+    )
+    @app_commands.rename(enabled="사용", flood_messages="메시지수", flood_seconds="시간", duplicate_count="반복횟수", duplicate_seconds="반복시간")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def spam_settings(self, interaction: discord.Interaction, enabled: bool,
+                            flood_messages: app_commands.Range[int, 2, 50] = None,
+                            flood_seconds: app_commands.Range[int, 1, 60] = None,
+                            duplicate_count: app_commands.Range[int, 2, 10] = None,
+                            duplicate_seconds: app_commands.Range[int, 1, 600] = None):
+        guild_id = str(interaction.guild.id)
+        async with guild_lock(guild_id, 'spam_protection'):
+            config = load_config()
+            if guild_id not in config:
+                config[guild_id] = {}
+            spam_config = config[guild_id].setdefault('spam_protection', {})
+            spam_config['enabled'] = enabled
+            # 지정하지 않은 항목은 기존 값을 유지
+            for key, value in (("flood_messages", flood_messages), ("flood_window_seconds", flood_seconds),
+                               ("duplicate_count", duplicate_count), ("duplicate_window_seconds", duplicate_seconds)):
+                if value is not None:
+                    spam_config[key] = value
+            save_config(config, guild_id)
+            settings = get_spam_settings(config[guild_id])
+        spam_detector.reset(guild_id)
+
+        embed = discord.Embed(title="🔁 도배 방지 설정", description="도배로 삭제된 메시지는 `/처벌설정`의 경고 횟수에 포함됩니다.", color=discord.Color.orange())
+        embed.add_field(name="기능 상태", value="**🟢 켜짐**" if settings['enabled'] else "⚫ 꺼짐", inline=False)
+        embed.add_field(name="빠른 도배", value=f"{settings['flood_window_seconds']}초 안에 {settings['flood_messages']}개 초과", inline=True)
+        embed.add_field(name="같은 메시지 반복", value=f"{settings['duplicate_window_seconds']}초 안에 {settings['duplicate_count']}번", inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    raid_action_choices = [
+        app_commands.Choice(name="조치 안함 (환영 메시지와 로그만 묶음)", value="none"),
+        app_commands.Choice(name="타임아웃", value="timeout"),
+        app_commands.Choice(name="추방", value="kick"),
+        app_commands.Choice(name="차단", value="ban"),
+    ]
+
+    @app_commands.command(name="레이드방지", description="짧은 시간에 많은 멤버가 입장할 때의 처리 방식을 설정합니다.")
+    @app_commands.describe(
+        enabled="켜면 입장 급증 시 환영 메시지와 로그를 한 번에 묶어 보냅니다.",
+        threshold="레이드로 판단할 입장 인원 (기본: 10)",
+        window_seconds="입장 인원을 세는 시간(초) (기본: 10)",
+        action="레이드 중 입장한 멤버에게 일괄 적용할 조치 (기본: 조치 안함)",
+        timeout_minutes="조치가 타임아웃일 때 적용할 시간(분) (기본: 60)"
+    )
+    @app_commands.rename(enabled="사용", threshold="인원", window_seconds="시간", action="조치", timeout_minutes="타임아웃시간")
+    @app_commands.choices(action=raid_action_choices)
+    @app_commands.checks.has_permissions(administrator=True)
+    async def raid_settings(self, interaction: discord.Interaction, enabled: bool,
+                            threshold: app_commands.Range[int, 2, 500] = None,
+                            window_seconds: app_commands.Range[int, 1, 300] = None,
+                            action: str = None,
+                            timeout_minutes: app_commands.Range[int, 1, 40320] = None):
+        guild_id = str(interaction.guild.id)
+        async with guild_lock(guild_id, 'raid_protection'):
+            config = load_config()
+            if guild_id not in config:
+                config[guild_id] = {}
+            raid_config = config[guild_id].setdefault('raid_protection', {})
+            raid_config['enabled'] = enabled
+            # 지정하지 않은 항목은 기존 값을 유지
+            for key, value in (("threshold", threshold), ("window_seconds", window_seconds), ("action", action), ("timeout_duration_minutes", timeout_minutes)):
+                if value is not None:
+                    raid_config[key] = value
+            save_config(config, guild_id)
+            settings = get_raid_settings(config[guild_id])
+        join_rate_tracker.reset(guild_id)
+
+        action_map = {choice.value: choice.name for choice in self.raid_action_choices}
+        embed = discord.Embed(title="🚨 레이드 방지 설정", color=discord.Color.orange())
+        embed.add_field(name="기능 상태", value="**🟢 켜짐**" if settings['enabled'] else "⚫ 꺼짐", inline=True)
+        embed.add_field(name="감지 기준", value=f"{settings['window_seconds']}초 안에 {settings['threshold']}명 이상 입장", inline=True)
+        action_text = action_map.get(settings['action'], "조치 안함")
+        if settings['action'] == "timeout":
+            action_text += f" ({settings['timeout_duration_minutes']}분)"
+        embed.add_field(name="자동 조치", value=action_text, inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(ModerationCog(bot))
@@ -1,7 +1,8 @@
 import discord
+import asyncio
 from discord import app_commands
 from discord.ext import commands
-from utils import load_config, format_duration
+from utils import get_voice_period_ranking, format_duration, PERIODS
 
 class VoiceCog(commands.Cog):
     """음성 채널 관련 명령어"""
@@ -9,30 +10,44 @@ class VoiceCog(commands.Cog):
         self.bot = bot
 
     @app_commands.command(name="랭킹", description="음성 채널 체류 시간 랭킹을 표시합니다.")
-    async def show_ranking(self, interaction: discord.Interaction):
-        guild_id = str(interaction.guild.id)
-        voice_time_data = load_config().get(guild_id, {}).get("voice_time_tracking", {})
+    @app_commands.describe(period="랭킹을 집계할 기간 (기본: 전체)")
+    @app_commands.rename(period="기간")
+    @app_commands.choices(period=[app_commands.Choice(name=label, value=value) for value, label in PERIODS.items()])
+    async def show_ranking(self, interaction: discord.Interaction, period: str = "all"):
+        guild = interaction.guild
+        top_users = get_voice_period_ranking(guild.id, period)
 
-        if not voice_time_data:
-            await interaction.response.send_message("아직 음성 채널 체류 시간 기록이 없습니다.", ephemeral=True)
+        if not top_users:
+            await interaction.response.send_message(f"{PERIODS[period]} 음성 채널 체류 시간 기록이 없습니다.", ephemeral=True)
             return
 
-        sorted_users = sorted(voice_time_data.items(), key=lambda item: item[1], reverse=True)
-        embed = discord.Embed(title="🏆 음성 채널 활동 랭킹", color=discord.Color.gold())
+        # 이름은 게이트웨이 멤버 캐시에서 가져오고, 캐시에 없는 멤버만 한꺼번에 동시 조회
+        display_names = {}
+        missing_ids = []
+        for user_id, _ in top_users:
+            member = guild.get_member(int(user_id))
+            if member:
+                display_names[user_id] = member.display_name
+            else:
+                missing_ids.append(user_id)
+
+        if missing_ids:
+            results = await asyncio.gather(*(guild.fetch_member(int(user_id)) for user_id in missing_ids), return_exceptions=True)
+            for user_id, result in zip(missing_ids, results):
+                if isinstance(result, discord.Member):
+                    display_names[user_id] = result.display_name
+                elif isinstance(result, discord.NotFound):
+                    display_names[user_id] = f"알 수 없는 유저 (ID: {user_id})"
+                else:
+                    display_names[user_id] = "유저 정보 로드 실패"
+
+        embed = discord.Embed(title=f"🏆 음성 채널 활동 랭킹 ({PERIODS[period]})", color=discord.Color.gold())
         medals = ["🥇", "🥈", "🥉"]
         rank_description = []
 
-        for i, (user_id, total_seconds) in enumerate(sorted_users[:10]):
-            try:
-                member = await interaction.guild.fetch_member(int(user_id))
-                user_display_name = member.display_name
-            except discord.NotFound:
-                user_display_name = f"알 수 없는 유저 (ID: {user_id})"
-            except Exception:
-                user_display_name = f"유저 정보 로드 실패"
-
+        for i, (user_id, total_seconds) in enumerate(top_users):
             formatted_time = format_duration(total_seconds)
-            rank_entry = f"{medals[i] if i < len(medals) else f'**{i+1}위.**'} {user_display_name} - `{formatted_time}`"
+            rank_entry = f"{medals[i] if i < len(medals) else f'**{i+1}위.**'} {display_names[user_id]} - `{formatted_time}`"
             rank_description.append(rank_entry)
 
         embed.description = "\n".join(rank_description)
@@ -43,7 +58,7 @@ class VoiceCog(commands.Cog):
         embed = discord.Embed(title="🤖 봇 명령어", description="서버 운영을 돕는 봇의 명령어 목록입니다.", color=discord.Color.blurple())
         user_commands = (
             "`/명령어` : 봇의 명령어 목록을 확인합니다.\n"
-            "`/랭킹` : 음성 채널 체류 시간 랭킹을 확인합니다."
+            "`/랭킹 [기간]` : 음성 채널 체류 시간 랭킹을 전체/오늘/이번 주/이번 달 기준으로 확인합니다."
         )
         embed.add_field(name="🙋‍♂️ 모든 사용자 명령어", value=user_commands, inline=False)
         admin_commands = (
@@ -52,11 +67,20 @@ class VoiceCog(commands.Cog):
             "`/설정` : 음성 채널 및 로그 채널을 설정하는 패널을 엽니다.\n"
             "`/입장` : 새로운 멤버를 위한 환영 메시지를 설정합니다.\n\n"
             "**[ 검열 및 처벌 ]**\n"
-            "`/검열추가` : 검열할 키워드를 추가합니다.\n"
-            "`/검열삭제` : 등록된 검열 키워드를 삭제합니다.\n"
-            "`/검열목록` : 등록된 모든 검열 키워드를 확인합니다.\n"
+            "`/검열추가 [유형]` : 검열할 키워드나 와일드카드/정규식 패턴을 추가합니다.\n"
+            "`/검열삭제 [유형]` : 등록된 검열 키워드나 패턴을 삭제합니다.\n"
+            "`/검열목록` : 등록된 모든 검열 키워드와 패턴을 확인합니다.\n"
+            "`/검열스캔 [채널] [기간]` : 지난 메시지를 검사해 검열 규칙에 걸린 메시지를 한꺼번에 삭제합니다.\n"
+            "`/검열설정` : 유사 문자 치환 등 검열 옵션을 설정합니다.\n"
             "`/처벌설정` : 검열 적발 시 자동 처벌 규칙을 설정합니다.\n"
-            "`/경고초기화 [멤버]` : 특정 사용자의 경고 횟수를 초기화합니다."
+            "`/경고초기화 [멤버]` : 특정 사용자의 경고 횟수를 초기화합니다.\n"
+            "`/기록 [사용자]` : 검열, 처벌, 경고 초기화 기록을 확인합니다.\n"
+            "`/도배방지` : 빠른 도배와 같은 메시지 반복을 감지해 삭제하고 경고합니다.\n"
+            "`/레이드방지` : 입장이 급증할 때 환영 메시지를 묶고 일괄 조치를 설정합니다.\n\n"
+            "**[ 봇 관리 ]**\n"
+            "`/상태` : 봇의 가동 시간과 이벤트 처리/저장소 지연 시간을 확인합니다.\n"
+            "`/내보내기 [종류]` : 음성/경고/감사 기록을 압축한 CSV·JSONL 파일로 내려받습니다.\n"
+            "`/리로드 [확장] [동작]` : Cog나 이벤트 확장을 다시 불러옵니다. (봇 소유자 전용)"
         )
         embed.add_field(name="🛠️ 관리자 명령어", value=admin_commands, inline=False)
         embed.set_footer(text=f"{self.bot.user.name} | 궁금한 점이 있다면 서버 관리자에게 문의해주세요.")
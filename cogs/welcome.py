@@ -2,7 +2,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from utils import load_config
-from views import WelcomeSettingsView
+from views.welcome_view import WelcomeSettingsView
 
 class WelcomeCog(commands.Cog):
     """환영 메시지 관련 명령어"""
@@ -1,99 +1,207 @@
+import time
+import asyncio
 import discord
 import datetime
-from string import Template
-from utils import load_config
+from utils import timed, load_config, send_log, get_welcome_template, get_raid_settings, join_rate_tracker, record_audit
 
-def setup(bot):
-    """멤버 관련 이벤트 핸들러를 등록합니다."""
+MAX_LISTED_MEMBERS = 50  # 묶음 환영 메시지와 요약 로그에 이름을 나열할 최대 인원
 
-    @bot.event
-    async def on_member_join(member: discord.Member):
-        guild_id = str(member.guild.id)
-        config = load_config().get(guild_id, {})
-        welcome_config = config.get('welcome_message', {})
+# 레이드 중 입장한 멤버를 모았다가 윈도우마다 한 번에 처리
+_raid_batches = {}  # {guild_id: [member]}
+_raid_workers = {}  # {guild_id: asyncio.Task}
 
-        if not welcome_config.get('enabled', False):
-            return
+@timed("event.on_member_join")
+async def on_member_join(member: discord.Member):
+    guild_id = str(member.guild.id)
+    config = load_config().get(guild_id, {})
 
-        channel_id = welcome_config.get('channel_id')
-        message_template = welcome_config.get('message')
-        use_embed = welcome_config.get('use_embed', False)
+    raid_settings = get_raid_settings(config)
+    if raid_settings['enabled'] and join_rate_tracker.record(guild_id, time.monotonic(), raid_settings['threshold'], raid_settings['window_seconds']):
+        _raid_batches.setdefault(guild_id, []).append(member)
+        if guild_id not in _raid_workers:
+            _raid_workers[guild_id] = asyncio.create_task(_run_raid_batches(member.guild))
+        return
 
-        if not channel_id or not message_template:
-            return
+    welcome_config = config.get('welcome_message', {})
 
-        channel = member.guild.get_channel(channel_id)
-        if not channel:
-            return
+    if not welcome_config.get('enabled', False):
+        return
 
-        # 변수 치환 (safe_substitute 사용하여 오류 방지)
-        try:
-            formatted_message = Template(message_template).safe_substitute(
-                user_mention=member.mention,
-                user_name=member.display_name,
-                user_id=member.id,
-                server_name=member.guild.name,
-                server_id=member.guild.id,
-                member_count=member.guild.member_count,
-                user=str(member),
-                server=str(member.guild)
+    channel_id = welcome_config.get('channel_id')
+    message_template = welcome_config.get('message')
+    use_embed = welcome_config.get('use_embed', False)
+
+    if not channel_id or not message_template:
+        return
+
+    channel = member.guild.get_channel(channel_id)
+    if not channel:
+        return
+
+    # 서버별로 미리 컴파일된 템플릿에 멤버 변수만 채움
+    try:
+        formatted_message = get_welcome_template(member.guild, message_template).render(member)
+    except Exception as e:
+        print(f"환영 메시지 변수 치환 오류: {e}")
+        return
+
+    # 로그 채널 가져오기
+    log_channel_id = config.get('text_channel_id')
+    log_channel = member.guild.get_channel(log_channel_id) if log_channel_id else None
+
+    try:
+        if use_embed:
+            # 임베드 메시지 전송
+            embed = discord.Embed(
+                description=formatted_message,
+                color=discord.Color.green(),
+                timestamp=datetime.datetime.now()
+            )
+            embed.set_author(
+                name=f"{member.guild.name}에 오신 것을 환영합니다!",
+                icon_url=member.guild.icon.url if member.guild.icon else None
+            )
+            embed.set_thumbnail(url=member.display_avatar.url)
+            await channel.send(embed=embed)
+        else:
+            # 일반 텍스트 메시지 전송
+            await channel.send(formatted_message)
+
+        # 로그 채널에 기록
+        if log_channel:
+            log_embed = discord.Embed(
+                title="👋 환영 메시지 전송됨",
+                description=f"**멤버:** {member.mention} ({member.id})\n**채널:** {channel.mention}",
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now()
+            )
+            log_embed.add_field(name="전송된 메시지", value=f"```{formatted_message[:1000]}```", inline=False)
+            send_log(log_channel, embed=log_embed)
+
+    except discord.Forbidden:
+        print(f"오류: '{member.guild.name}' 서버의 '{channel.name}' 채널에 메시지를 보낼 권한이 없습니다.")
+        # 로그 채널에 오류 기록
+        if log_channel:
+            error_embed = discord.Embed(
+                title="⚠️ 환영 메시지 전송 실패",
+                description=f"**멤버:** {member.mention}\n**사유:** 권한 부족",
+                color=discord.Color.red(),
+                timestamp=datetime.datetime.now()
             )
-        except Exception as e:
-            print(f"환영 메시지 변수 치환 오류: {e}")
-            return
+            send_log(log_channel, embed=error_embed)
+    except Exception as e:
+        print(f"환영 메시지 전송 중 오류: {e}")
+        # 로그 채널에 오류 기록
+        if log_channel:
+            error_embed = discord.Embed(
+                title="⚠️ 환영 메시지 전송 실패",
+                description=f"**멤버:** {member.mention}\n**사유:** {str(e)}",
+                color=discord.Color.red(),
+                timestamp=datetime.datetime.now()
+            )
+            send_log(log_channel, embed=error_embed)
+
+def _list_members(members):
+    """멤버 멘션을 최대 MAX_LISTED_MEMBERS명까지 나열합니다."""
+    listed = ", ".join(member.mention for member in members[:MAX_LISTED_MEMBERS])
+    if len(members) > MAX_LISTED_MEMBERS:
+        listed += f" 외 {len(members) - MAX_LISTED_MEMBERS}명"
+    return listed
+
+async def _run_raid_batches(guild):
+    """레이드가 끝날 때까지 윈도우마다 모인 입장을 묶어 처리합니다."""
+    guild_id = str(guild.id)
+    try:
+        while True:
+            window = get_raid_settings(load_config().get(guild_id, {}))['window_seconds']
+            await asyncio.sleep(window)
+            members = _raid_batches.pop(guild_id, None)
+            if not members:
+                break
+            try:
+                await _handle_raid_batch(guild, members, window)
+            except Exception as e:
+                print(f"'{guild.name}' 서버의 레이드 입장 처리 중 오류: {e}")
+    finally:
+        _raid_workers.pop(guild_id, None)
 
-        # 로그 채널 가져오기
-        log_channel_id = config.get('text_channel_id')
-        log_channel = member.guild.get_channel(log_channel_id) if log_channel_id else None
+async def _handle_raid_batch(guild, members, window):
+    """묶음 환영 메시지 한 개, 요약 로그 한 개를 보내고 설정된 경우 일괄 조치합니다."""
+    config = load_config().get(str(guild.id), {})
+    raid_settings = get_raid_settings(config)
+    welcome_config = config.get('welcome_message', {})
+    log_channel_id = config.get('text_channel_id')
+    log_channel = guild.get_channel(log_channel_id) if log_channel_id else None
 
+    action_result = await _apply_raid_action(guild, members, raid_settings)
+
+    # 조치로 내보낸 멤버에게는 환영 메시지를 보내지 않음
+    channel_id = welcome_config.get('channel_id')
+    channel = guild.get_channel(channel_id) if channel_id else None
+    if welcome_config.get('enabled', False) and channel and raid_settings['action'] not in ("kick", "ban"):
+        text = f"👋 새로운 멤버 **{len(members)}명**이 입장했습니다. 환영합니다!\n{_list_members(members)}"
         try:
-            if use_embed:
-                # 임베드 메시지 전송
-                embed = discord.Embed(
-                    description=formatted_message,
-                    color=discord.Color.green(),
-                    timestamp=datetime.datetime.now()
-                )
-                embed.set_author(
-                    name=f"{member.guild.name}에 오신 것을 환영합니다!",
-                    icon_url=member.guild.icon.url if member.guild.icon else None
-                )
-                embed.set_thumbnail(url=member.display_avatar.url)
-                await channel.send(embed=embed)
-            else:
-                # 일반 텍스트 메시지 전송
-                await channel.send(formatted_message)
-
-            # 로그 채널에 기록
-            if log_channel:
-                log_embed = discord.Embed(
-                    title="👋 환영 메시지 전송됨",
-                    description=f"**멤버:** {member.mention} ({member.id})\n**채널:** {channel.mention}",
-                    color=discord.Color.blue(),
-                    timestamp=datetime.datetime.now()
-                )
-                log_embed.add_field(name="전송된 메시지", value=f"```{formatted_message[:1000]}```", inline=False)
-                await log_channel.send(embed=log_embed)
-
-        except discord.Forbidden:
-            print(f"오류: '{member.guild.name}' 서버의 '{channel.name}' 채널에 메시지를 보낼 권한이 없습니다.")
-            # 로그 채널에 오류 기록
-            if log_channel:
-                error_embed = discord.Embed(
-                    title="⚠️ 환영 메시지 전송 실패",
-                    description=f"**멤버:** {member.mention}\n**사유:** 권한 부족",
-                    color=discord.Color.red(),
-                    timestamp=datetime.datetime.now()
-                )
-                await log_channel.send(embed=error_embed)
-        except Exception as e:
-            print(f"환영 메시지 전송 중 오류: {e}")
-            # 로그 채널에 오류 기록
-            if log_channel:
-                error_embed = discord.Embed(
-                    title="⚠️ 환영 메시지 전송 실패",
-                    description=f"**멤버:** {member.mention}\n**사유:** {str(e)}",
-                    color=discord.Color.red(),
-                    timestamp=datetime.datetime.now()
-                )
-                await log_channel.send(embed=error_embed)
+            # 한꺼번에 많은 멤버를 멘션해 알림이 쏟아지지 않도록 함
+            await channel.send(text[:2000], allowed_mentions=discord.AllowedMentions.none())
+        except discord.HTTPException as e:
+            print(f"'{guild.name}' 서버의 묶음 환영 메시지 전송 실패: {e}")
+
+    if log_channel:
+        embed = discord.Embed(
+            title="🚨 입장 급증 감지",
+            description=f"**{window}초** 동안 **{len(members)}명**이 입장했습니다. 개별 환영 메시지와 로그를 묶어서 처리했습니다.",
+            color=discord.Color.orange(),
+            timestamp=datetime.datetime.now()
+        )
+        embed.add_field(name="입장한 멤버", value=_list_members(members)[:1024], inline=False)
+        if action_result:
+            embed.add_field(name="자동 조치", value=action_result, inline=False)
+        send_log(log_channel, embed=embed)
+
+async def _apply_raid_action(guild, members, raid_settings):
+    """레이드 중 입장한 멤버에게 설정된 조치를 일괄 실행하고 결과 문구를 반환합니다."""
+    action = raid_settings['action']
+    if action == "none":
+        return ""
+    reason = "입장 급증(레이드) 자동 조치"
+
+    if action == "ban":
+        # 최대 200명을 요청 한 번으로 차단
+        banned, failed = 0, 0
+        for start in range(0, len(members), 200):
+            chunk = members[start:start + 200]
+            try:
+                result = await guild.bulk_ban(chunk, reason=reason, delete_message_seconds=0)
+                banned += len(result.banned)
+                failed += len(result.failed)
+                for user in result.banned:
+                    record_audit(guild.id, "raid", user_id=user.id, detail="ban")
+            except discord.HTTPException:
+                failed += len(chunk)
+        return f"차단 {banned}명" + (f", 실패 {failed}명" if failed else "")
+
+    if action == "timeout":
+        duration = datetime.timedelta(minutes=raid_settings['timeout_duration_minutes'])
+        calls = [member.timeout(duration, reason=reason) for member in members]
+        label = f"{raid_settings['timeout_duration_minutes']}분 타임아웃"
+    else:
+        calls = [member.kick(reason=reason) for member in members]
+        label = "추방"
+
+    # 레이트 리밋은 discord.py가 처리하므로 요청을 한꺼번에 보내고 결과만 모음
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    failed = 0
+    for member, result in zip(members, results):
+        if isinstance(result, Exception):
+            failed += 1
+        else:
+            record_audit(guild.id, "raid", user_id=member.id, detail=action)
+    return f"{label} {len(members) - failed}명" + (f", 실패 {failed}명" if failed else "")
+
+async def setup(bot):
+    """멤버 관련 이벤트 핸들러를 등록합니다."""
+    bot.add_listener(on_member_join)
+
+async def teardown(bot):
+    """확장을 내리거나 다시 불러올 때 등록한 핸들러를 제거합니다."""
+    bot.remove_listener(on_member_join)
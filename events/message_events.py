@@ -1,95 +1,144 @@
+import time
 import discord
+import asyncio
 import datetime
-from utils import load_config, save_config, config_lock
-
-def setup(bot):
-    """메시지 관련 이벤트 핸들러를 등록합니다."""
-
-    @bot.event
-    async def on_message(message: discord.Message):
-        if message.author.bot or not message.guild:
+from utils import (
+    timed, load_config, add_warning, get_keyword_matcher, get_pattern_rules, describe_rule, send_log, moderation_queue, with_retries,
+    get_spam_settings, spam_detector, record_audit, normalize_text
+)
+
+@timed("event.on_message")
+async def on_message(message: discord.Message):
+    if message.author.bot or not message.guild:
+        return
+
+    guild_id = str(message.guild.id)
+    server_config = load_config().get(guild_id, {})
+
+    spam_settings = get_spam_settings(server_config)
+    matcher = get_keyword_matcher(guild_id)
+    rule_set = get_pattern_rules(guild_id)
+    if not spam_settings['enabled'] and not matcher and not rule_set:
+        return
+
+    # 메시지는 한 번만 정규화하여 도배 검사와 키워드 검색이 같은 문자열을 사용하고, 일치 위치는 원문 기준으로 돌려받음
+    normalized = normalize_text(message.content, matcher.fold_homoglyphs) if spam_settings['enabled'] or matcher else None
+
+    # 도배는 키워드 검사 전에 메모리 안에서만 확인하고, 걸리면 같은 처리 흐름으로 넘김
+    if spam_settings['enabled']:
+        spam_reason = spam_detector.check(guild_id, message.author.id, normalized[0], time.monotonic(), spam_settings)
+        if spam_reason:
+            moderation_queue.submit(guild_id, enforce_verdict, message, [], spam_reason)
             return
 
-        guild_id = str(message.guild.id)
-        server_config = load_config().get(guild_id, {})
-
-        keywords = server_config.get("censored_keywords", [])
-        if not keywords:
-            return
+    if not matcher and not rule_set:
+        return
+
+    log_channel_id = server_config.get("text_channel_id")
+    log_channel = message.guild.get_channel(log_channel_id) if log_channel_id else None
+
+    matches = matcher.scan(message.content, normalized) if matcher else []
+
+    if rule_set:
+        try:
+            matches += [(start, end, describe_rule(rule)) for start, end, rule in await rule_set.scan(message.content)]
+        except asyncio.TimeoutError:
+            # 제한 시간을 넘긴 규칙 묶음은 비활성화되어 다음 메시지부터 검사하지 않음
+            print(f"'{message.guild.name}' 서버의 패턴 규칙 검사가 제한 시간을 넘겨 비활성화되었습니다.")
+            send_log(log_channel, content="⚠️ **패턴 규칙 비활성화:** 검사 시간이 너무 오래 걸리는 패턴이 있습니다. `/검열목록`에서 패턴을 확인하고 수정해주세요.")
+
+    if not matches:
+        return
+
+    # 삭제, 로그, 경고, 처벌은 서버별 순서를 지키며 작업자가 처리하고 핸들러는 바로 반환
+    moderation_queue.submit(guild_id, enforce_verdict, message, matches)
+
+async def enforce_verdict(message: discord.Message, matches, spam_reason=None):
+    """검열(spam_reason이 있으면 도배)에 걸린 메시지를 삭제하고 로그, 경고, 처벌을 순서대로 처리합니다."""
+    guild_id = str(message.guild.id)
+    server_config = load_config().get(guild_id, {})
+    log_channel_id = server_config.get("text_channel_id")
+    log_channel = message.guild.get_channel(log_channel_id) if log_channel_id else None
+
+    # 감지된 키워드를 중복 없이 등장 순서대로 정리
+    matched_keywords = list(dict.fromkeys(keyword for _, _, keyword in matches))
+
+    try:
+        await with_retries(message.delete)
+    except discord.Forbidden:
+        send_log(log_channel, content=f"⚠️ **권한 오류:** {message.channel.mention}에서 메시지를 삭제할 수 없습니다.")
+        return
+    except discord.NotFound:
+        return
+
+    if spam_reason:
+        record_audit(guild_id, "spam", user_id=message.author.id, detail=spam_reason)
+    else:
+        record_audit(guild_id, "censor", user_id=message.author.id, detail=", ".join(matched_keywords))
+
+    if log_channel and spam_reason:
+        embed = discord.Embed(title="🔁 도배 감지됨", color=discord.Color.gold(), timestamp=datetime.datetime.now())
+        embed.description=f"**작성자:** {message.author.mention}\n**채널:** {message.channel.mention}"
+        embed.add_field(name="삭제된 메시지", value=f"```{message.content[:1000]}```" if message.content else "(내용 없음)", inline=False)
+        embed.add_field(name="감지 사유", value=spam_reason, inline=False)
+        send_log(log_channel, embed=embed)
+    elif log_channel:
+        embed = discord.Embed(title="🚫 메시지 검열됨", color=discord.Color.gold(), timestamp=datetime.datetime.now())
+        embed.description=f"**작성자:** {message.author.mention}\n**채널:** {message.channel.mention}"
+        embed.add_field(name="삭제된 메시지", value=f"```{message.content[:1000]}```", inline=False)
+        embed.add_field(name="감지된 키워드", value=", ".join(f"`{keyword}`" for keyword in matched_keywords)[:1024], inline=False)
+        matched_spans = "\n".join(f"`{message.content[start:end]}` ({start + 1}~{end}번째 글자)" for start, end, _ in matches[:10])
+        embed.add_field(name="감지 위치", value=matched_spans[:1024], inline=False)
+        send_log(log_channel, embed=embed)
+
+    punishment_config = server_config.get("punishment", {})
+    threshold = punishment_config.get("threshold", 0)
+    if punishment_config.get("type", "none") == "none" or threshold <= 0:
+        return
+
+    # 경고 추가와 임계값 확인은 한 번에 처리되며, 유효 기간이 지난 경고는 세지 않음
+    current_warnings, punish = add_warning(guild_id, message.author.id, threshold)
+
+    if punish:
+        reason = f"{'도배' if spam_reason else '검열 규칙 위반'} (경고 {threshold}회 누적)"
+        punishment_type = punishment_config.get("type")
+
+        try:
+            action_log = ""
+            if punishment_type == "timeout":
+                duration_minutes = punishment_config.get("timeout_duration_minutes", 10)
+                duration = datetime.timedelta(minutes=duration_minutes)
+                await with_retries(message.author.timeout, duration, reason=reason)
+                action_log = f"**{message.author.mention}** 님을 `{duration_minutes}`분 동안 타임아웃 처리했습니다."
+
+            elif punishment_type == "kick":
+                await with_retries(message.author.kick, reason=reason)
+                action_log = f"**{message.author.mention}** 님을 서버에서 추방했습니다."
+
+            elif punishment_type == "ban":
+                await with_retries(message.author.ban, reason=reason)
+                action_log = f"**{message.author.mention}** 님을 서버에서 차단했습니다."
+
+            if action_log:
+                record_audit(guild_id, "punish", user_id=message.author.id, detail=f"{punishment_type} · {reason}")
+            if log_channel and action_log:
+                punishment_embed = discord.Embed(title="⚔️ 자동 처벌 실행", description=action_log, color=discord.Color.dark_red())
+                punishment_embed.add_field(name="사유", value=reason)
+                send_log(log_channel, embed=punishment_embed)
+
+        except discord.Forbidden:
+            send_log(log_channel, content=f"⚠️ **권한 오류:** {message.author.mention}님에게 처벌을 실행할 수 없습니다. 봇의 역할 순위나 권한을 확인해주세요.")
+
+    else:
+        try:
+            await with_retries(message.author.send, f"**[ {message.guild.name} ]** 서버에서 {'도배가' if spam_reason else '검열 키워드 사용이'} 감지되었습니다.\n> 현재 경고 횟수: **{current_warnings}/{threshold}**\n> 횟수 초과 시 처벌이 적용될 수 있습니다.")
+        except discord.Forbidden:
+            send_log(log_channel, content=f"ℹ️ {message.author.mention}님에게 DM을 보낼 수 없어 경고를 전달하지 못했습니다.")
+
+async def setup(bot):
+    """메시지 관련 이벤트 핸들러를 등록합니다."""
+    bot.add_listener(on_message)
 
-        for keyword in keywords:
-            if keyword in message.content:
-                log_channel_id = server_config.get("text_channel_id")
-                log_channel = bot.get_channel(log_channel_id) if log_channel_id else None
-
-                try:
-                    await message.delete()
-                except discord.Forbidden:
-                    if log_channel: await log_channel.send(f"⚠️ **권한 오류:** {message.channel.mention}에서 메시지를 삭제할 수 없습니다.")
-                    return
-                except discord.NotFound:
-                    return
-
-                if log_channel:
-                    embed = discord.Embed(title="🚫 메시지 검열됨", color=discord.Color.gold(), timestamp=datetime.datetime.now())
-                    embed.description=f"**작성자:** {message.author.mention}\n**채널:** {message.channel.mention}"
-                    embed.add_field(name="삭제된 메시지", value=f"```{message.content}```", inline=False)
-                    embed.add_field(name="감지된 키워드", value=f"`{keyword}`", inline=False)
-                    await log_channel.send(embed=embed)
-
-                punishment_config = server_config.get("punishment", {})
-                if punishment_config.get("type", "none") != "none":
-                    async with config_lock:
-                        config = load_config()
-                        server_config = config.get(guild_id, {})
-                        punishment_config = server_config.get("punishment", {})
-                        threshold = punishment_config.get("threshold", 0)
-
-                        if threshold > 0:
-                            user_id = str(message.author.id)
-                            if 'warning_counts' not in server_config:
-                                server_config['warning_counts'] = {}
-
-                            current_warnings = server_config['warning_counts'].get(user_id, 0) + 1
-                            server_config['warning_counts'][user_id] = current_warnings
-
-                            save_config(config)
-
-                            if current_warnings >= threshold:
-                                server_config['warning_counts'][user_id] = 0
-                                save_config(config)
-
-                                reason = f"검열 규칙 위반 (경고 {threshold}회 누적)"
-                                punishment_type = punishment_config.get("type")
-
-                                try:
-                                    action_log = ""
-                                    if punishment_type == "timeout":
-                                        duration_minutes = punishment_config.get("timeout_duration_minutes", 10)
-                                        duration = datetime.timedelta(minutes=duration_minutes)
-                                        await message.author.timeout(duration, reason=reason)
-                                        action_log = f"**{message.author.mention}** 님을 `{duration_minutes}`분 동안 타임아웃 처리했습니다."
-
-                                    elif punishment_type == "kick":
-                                        await message.author.kick(reason=reason)
-                                        action_log = f"**{message.author.mention}** 님을 서버에서 추방했습니다."
-
-                                    elif punishment_type == "ban":
-                                        await message.author.ban(reason=reason)
-                                        action_log = f"**{message.author.mention}** 님을 서버에서 차단했습니다."
-
-                                    if log_channel and action_log:
-                                        punishment_embed = discord.Embed(title="⚔️ 자동 처벌 실행", description=action_log, color=discord.Color.dark_red())
-                                        punishment_embed.add_field(name="사유", value=reason)
-                                        await log_channel.send(embed=punishment_embed)
-
-                                except discord.Forbidden:
-                                    if log_channel: await log_channel.send(f"⚠️ **권한 오류:** {message.author.mention}님에게 처벌을 실행할 수 없습니다. 봇의 역할 순위나 권한을 확인해주세요.")
-
-                            else:
-                                try:
-                                    await message.author.send(f"**[ {message.guild.name} ]** 서버에서 검열 키워드 사용이 감지되었습니다.\n> 현재 경고 횟수: **{current_warnings}/{threshold}**\n> 횟수 초과 시 처벌이 적용될 수 있습니다.")
-                                except discord.Forbidden:
-                                    if log_channel: await log_channel.send(f"ℹ️ {message.author.mention}님에게 DM을 보낼 수 없어 경고를 전달하지 못했습니다.")
-
-                break
+async def teardown(bot):
+    """확장을 내리거나 다시 불러올 때 등록한 핸들러를 제거합니다."""
+    bot.remove_listener(on_message)
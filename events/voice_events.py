@@ -1,57 +1,89 @@
 import discord
-import datetime
-from utils import load_config, save_config, config_lock, format_duration
+from utils import timed, load_config, add_voice_time, format_duration, send_log, voice_ledger, get_tracked_voice_channels
 
-# 사용자의 음성 채널 접속 시간을 기록하는 딕셔너리
-voice_connections = {}
+async def reconcile_voice_sessions(bot):
+    """현재 음성 채널 인원과 기록된 세션을 맞춥니다.
 
-def setup(bot):
+    감시 채널에 있지만 세션이 없는 멤버는 지금부터 세션을 열고, 세션은 있지만 감시 채널에 없는 멤버는
+    봇이 마지막으로 살아 있던 시각 기준으로 한 번에 닫아 누적 시간에 반영합니다.
+    """
+    # 하트비트가 last_seen을 갱신하기 전에 이전 실행의 마지막 생존 시각을 확보
+    closed_at = voice_ledger.last_alive()
+    to_open, to_close = [], []
+
+    for guild in bot.guilds:
+        server_id = str(guild.id)
+        present = {}  # {user_id: channel_id}
+        for channel_id in get_tracked_voice_channels(server_id):
+            channel = guild.get_channel(channel_id)
+            if channel:
+                present.update((str(member.id), channel.id) for member in channel.members)
+
+        sessions = voice_ledger.guild_sessions(server_id)
+        for user_id in present.keys() - sessions.keys():
+            to_open.append((server_id, user_id, present[user_id]))
+        for user_id in sessions.keys() - present.keys():
+            to_close.append((server_id, user_id))
+
+    for (server_id, user_id), (_, duration_seconds) in voice_ledger.close_many(to_close, at=closed_at).items():
+        add_voice_time(server_id, user_id, duration_seconds, ended_at=closed_at)
+    voice_ledger.open_many(to_open)
+    voice_ledger.start_heartbeat()
+
+    if to_open or to_close:
+        print(f"음성 세션 복원: {len(to_open)}개 시작, {len(to_close)}개 마감")
+
+@timed("event.on_voice_state_update")
+async def on_voice_state_update(member, before, after):
+    # 감시 채널이 없는 서버는 미리 계산된 인덱스만 보고 바로 종료
+    tracked_channels = get_tracked_voice_channels(member.guild.id)
+    if not tracked_channels:
+        return
+
+    before_id = before.channel.id if before.channel else None
+    after_id = after.channel.id if after.channel else None
+    if before_id == after_id:
+        return  # 음소거, 화면 공유 등 채널 변화가 없는 상태 변경
+
+    is_leave = before_id in tracked_channels
+    is_join = after_id in tracked_channels
+    if not is_leave and not is_join:
+        return
+
+    server_id = str(member.guild.id)
+    log_text_channel_id = load_config().get(server_id, {}).get("text_channel_id")
+    log_channel = member.guild.get_channel(log_text_channel_id) if log_text_channel_id else None
+
+    # 감시 채널 사이의 이동은 이전 세션을 닫고 새 세션을 여는 것으로 처리
+    duration_seconds = None
+    if is_leave:
+        session = voice_ledger.close(server_id, member.id)
+        if session:
+            _, duration_seconds = session
+            add_voice_time(server_id, member.id, duration_seconds)
+    if is_join:
+        voice_ledger.open(server_id, member.id, after_id)
+
+    if not log_channel:
+        return
+
+    if is_leave and is_join:
+        embed = discord.Embed(title="🔀 음성 채널 이동", description=f"**{member.display_name}** 님이 {before.channel.mention}에서 {after.channel.mention}(으)로 이동했습니다.", color=discord.Color.blue())
+        if duration_seconds is not None:
+            embed.add_field(name="이전 채널 체류 시간", value=format_duration(duration_seconds), inline=False)
+        send_log(log_channel, embed=embed)
+    elif is_join:
+        embed = discord.Embed(title="🎙️ 음성 채널 입장", description=f"**{member.display_name}** 님이 {after.channel.mention}에 입장했습니다.", color=discord.Color.green())
+        send_log(log_channel, embed=embed)
+    elif duration_seconds is not None:
+        embed = discord.Embed(title="🚫 음성 채널 퇴장", description=f"**{member.display_name}** 님이 {before.channel.mention}에서 퇴장했습니다.", color=discord.Color.red())
+        embed.add_field(name="체류 시간", value=format_duration(duration_seconds), inline=False)
+        send_log(log_channel, embed=embed)
+
+async def setup(bot):
     """음성 채널 관련 이벤트 핸들러를 등록합니다."""
+    bot.add_listener(on_voice_state_update)
 
-    @bot.event
-    async def on_voice_state_update(member, before, after):
-        server_id = str(member.guild.id)
-        config = load_config()
-        server_config = config.get(server_id, {})
-
-        target_voice_channel_id = server_config.get("voice_channel_id")
-        if not target_voice_channel_id:
-            return
-
-        log_text_channel_id = server_config.get("text_channel_id")
-        log_channel = bot.get_channel(log_text_channel_id) if log_text_channel_id else None
-
-        is_join = not before.channel and after.channel and after.channel.id == target_voice_channel_id
-        is_leave = before.channel and not after.channel and before.channel.id == target_voice_channel_id
-
-        if is_join:
-            voice_connections[member.id] = datetime.datetime.now()
-            if log_channel:
-                embed = discord.Embed(title="🎙️ 음성 채널 입장", description=f"**{member.display_name}** 님이 입장했습니다.", color=discord.Color.green())
-                await log_channel.send(embed=embed)
-
-        elif is_leave:
-            if member.id in voice_connections:
-                join_time = voice_connections.pop(member.id)
-                duration = datetime.datetime.now() - join_time
-                duration_seconds = duration.total_seconds()
-
-                async with config_lock:
-                    config = load_config()
-                    server_config = config.get(server_id, {})
-
-                    user_id = str(member.id)
-                    if 'voice_time_tracking' not in server_config:
-                        server_config['voice_time_tracking'] = {}
-
-                    current_total_time = server_config['voice_time_tracking'].get(user_id, 0)
-                    server_config['voice_time_tracking'][user_id] = current_total_time + duration_seconds
-
-                    config[server_id] = server_config
-                    save_config(config)
-
-                if log_channel:
-                    formatted_duration = format_duration(duration_seconds)
-                    embed = discord.Embed(title="🚫 음성 채널 퇴장", description=f"**{member.display_name}** 님이 퇴장했습니다.", color=discord.Color.red())
-                    embed.add_field(name="체류 시간", value=formatted_duration, inline=False)
-                    await log_channel.send(embed=embed)
+async def teardown(bot):
+    """확장을 내리거나 다시 불러올 때 등록한 핸들러를 제거합니다."""
+    bot.remove_listener(on_voice_state_update)
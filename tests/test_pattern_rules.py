@@ -0,0 +1,73 @@
+import time
+import asyncio
+import pytest
+from utils.pattern_rules import PatternRuleSet, compile_rule, wildcard_to_regex
+
+
+def test_wildcard_to_regex():
+    assert wildcard_to_regex("바*보") == "바.*?보"
+    assert wildcard_to_regex("a**b?c.") == "a.*?b.c\\."
+
+
+@pytest.mark.parametrize("pattern", ["(?i)abc", "ab(?s)c", "x\\\\(?x)y"])
+def test_global_flags_are_rejected(pattern):
+    with pytest.raises(ValueError):
+        compile_rule("regex", pattern)
+
+
+@pytest.mark.parametrize("pattern", ["(a+)+b", "(a*)*", "(\\w+)\\1", "", "a" * 201])
+def test_dangerous_or_invalid_patterns_are_rejected(pattern):
+    with pytest.raises(ValueError):
+        compile_rule("regex", pattern)
+
+
+def test_scoped_flags_are_allowed():
+    assert compile_rule("regex", "(?i:abc)") == "(?i:abc)"
+
+
+def test_saved_bad_rule_does_not_break_the_set():
+    rule_set = PatternRuleSet([
+        {"type": "regex", "pattern": "(?i)abc"},
+        {"type": "wildcard", "pattern": "바*보"},
+    ])
+    assert [rule["pattern"] for rule in rule_set.rules] == ["바*보"]
+    assert [(start, end) for start, end, _ in rule_set.find_all("너 바아보")] == [(2, 5)]
+
+
+def test_find_all_reports_matching_rule():
+    first, second = {"type": "regex", "pattern": "spa+m"}, {"type": "wildcard", "pattern": "f?ck"}
+    rule_set = PatternRuleSet([first, second])
+    assert rule_set.find_all("SPAAM and fuck") == [(0, 5, first), (10, 14, second)]
+
+
+def test_slow_rule_times_out_without_blocking_the_loop():
+    rule_set = PatternRuleSet([{"type": "regex", "pattern": "(a|aa)+b"}])
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            await rule_set.scan("a" * 40)
+        task.cancel()
+        return time.perf_counter() - started, ticks
+
+    elapsed, ticks = asyncio.run(main())
+    assert elapsed < 2
+    assert ticks > 10
+    assert rule_set.disabled
+
+
+def test_scan_many_stops_at_the_first_timeout():
+    first = {"type": "regex", "pattern": "spa+m"}
+    rule_set = PatternRuleSet([first, {"type": "regex", "pattern": "(a|aa)+b"}])
+    results = asyncio.run(rule_set.scan_many(["spaam", "hello", "a" * 40, "spam"]))
+    assert results == [[(0, 5, first)], []]
+    assert rule_set.disabled
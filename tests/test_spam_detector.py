@@ -0,0 +1,66 @@
+import random
+from utils.spam_detector import SIMHASH_MAX_DISTANCE, SpamDetector, get_spam_settings, hamming_distance, simhash
+from utils.text_normalizer import normalize_text
+
+SETTINGS = get_spam_settings({"spam_protection": {"enabled": True}})
+
+
+def fingerprint(text):
+    return simhash(normalize_text(text)[0])
+
+
+def test_simhash_is_stable_and_64_bits():
+    value = fingerprint("오늘 저녁 같이 공부하실 분 구해요")
+    assert value == fingerprint("오늘 저녁 같이 공부하실 분 구해요")
+    assert 0 <= value < 1 << 64
+
+
+def test_near_duplicates_are_close():
+    # hash()는 프로세스마다 달라지므로 한 쌍이 아니라 여러 쌍의 비율로 확인
+    rng = random.Random(2)
+    letters = "가나다라마바사아자차카타파하abcdefghij"
+    close = 0
+    for _ in range(200):
+        original = [rng.choice(letters) for _ in range(40)]
+        edited = list(original)
+        edited[rng.randrange(40)] = rng.choice(letters)
+        close += hamming_distance(fingerprint("".join(original)), fingerprint("".join(edited))) <= SIMHASH_MAX_DISTANCE
+    assert close >= 180
+
+
+def test_unrelated_messages_are_far():
+    rng = random.Random(1)
+    letters = "가나다라마바사아자차카타파하abcdefghij"
+    for _ in range(200):
+        a = "".join(rng.choice(letters) for _ in range(40))
+        b = "".join(rng.choice(letters) for _ in range(40))
+        assert hamming_distance(fingerprint(a), fingerprint(b)) > SIMHASH_MAX_DISTANCE
+
+
+def test_flood_is_detected_once_per_burst():
+    detector = SpamDetector()
+    reasons = [detector.check("1", 1, normalize_text("ㅋ")[0], i * 0.1, SETTINGS) for i in range(SETTINGS["flood_messages"] + 1)]
+    assert reasons[:-1] == [None] * SETTINGS["flood_messages"]
+    assert reasons[-1]
+    assert detector.check("1", 1, "ㅋ", 0.8, SETTINGS) is None
+
+
+def test_repeated_message_is_detected():
+    detector = SpamDetector()
+    text = normalize_text("이 링크 들어가서 가입하면 보상 드려요")[0]
+    reasons = [detector.check("1", 1, text, i * 10.0, SETTINGS) for i in range(SETTINGS["duplicate_count"])]
+    assert reasons[-1] and not any(reasons[:-1])
+
+
+def test_short_messages_only_count_towards_flood():
+    detector = SpamDetector()
+    assert all(detector.check("1", 1, "ㅇㅇ", i * 10.0, SETTINGS) is None for i in range(10))
+
+
+def test_users_are_tracked_separately_and_bounded():
+    detector = SpamDetector(max_users=3)
+    for user in range(5):
+        detector.check("1", user, "안녕하세요", 0.0, SETTINGS)
+    assert len(detector) == 3
+    detector.reset("1")
+    assert len(detector) == 0
@@ -0,0 +1,53 @@
+import pytest
+from utils.text_normalizer import normalize_text
+from utils.keyword_matcher import KeywordMatcher
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("ＢＡＢＯ", "babo"),
+    ("b a​b o", "babo"),
+    ("ㅂㅏㅂㅗ", "바보"),
+    ("ㅂㅏ ㅂㅗ", "바보"),
+    ("ㄱㅏㄴㄷㅏ", "간다"),
+    ("ㄱㅏㅁ", "감"),
+])
+def test_normalize_text(text, expected):
+    assert normalize_text(text)[0] == expected
+
+
+@pytest.mark.parametrize("text", ["바보ㅋㅋㅋ", "바보 ㅋㅋ", "ㅂㅏㅂㅗㅋㅋ"])
+def test_trailing_consonants_are_not_attached(text):
+    assert normalize_text(text)[0].startswith("바보")
+
+
+def test_precomposed_syllable_keeps_its_form():
+    assert normalize_text("광고ㄱㄱ")[0].startswith("광고")
+    assert normalize_text("가ㅁ")[0][0] == "가"
+
+
+def test_no_final_consonant_across_whitespace():
+    assert normalize_text("ㄱㅏ ㅁ")[0][0] == "가"
+
+
+def test_positions_map_back_to_original():
+    text = "ㅂㅏ ㅂㅗ!"
+    normalized, starts, ends = normalize_text(text)
+    assert normalized == "바보i"
+    assert (starts, ends) == ([0, 3, 5], [2, 5, 6])
+
+
+@pytest.mark.parametrize("text", ["바보ㅋㅋㅋ", "광고ㄱㄱ 해요", "바보 ㅋㅋ", "ㅂ ㅏ ㅂ ㅗ", "너 바　보 야"])
+def test_keyword_matcher_finds_common_chat(text):
+    matcher = KeywordMatcher(["바보", "광고"])
+    assert matcher.scan(text)
+
+
+def test_keyword_matcher_reports_original_span():
+    matcher = KeywordMatcher(["spam", "바보"])
+    text = "이건 S P 4 M 이고 바보ㅋㅋ"
+    assert [(text[start:end], keyword) for start, end, keyword in matcher.scan(text)] == [("S P 4 M", "spam"), ("바보", "바보")]
+
+
+def test_keyword_matcher_overlapping_keywords():
+    matcher = KeywordMatcher(["he", "she", "hers"])
+    assert sorted(keyword for _, _, keyword in matcher.scan("ushers")) == ["he", "hers", "she"]
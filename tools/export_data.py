@@ -0,0 +1,59 @@
+"""음성 기록, 경고, 감사 기록을 gzip으로 압축한 CSV/JSONL 파일로 내보냅니다.
+
+사용법 (저장소 최상위 폴더에서):
+    python -m tools.export_data voice_daily --guild 서버ID --since 2024-01-01 --until 2024-03-31
+    python -m tools.export_data audit --user 사용자ID -f jsonl -o audit.jsonl.gz
+
+.env의 STORAGE_BACKEND, DATABASE_FILE, AUDIT_FILE을 그대로 사용합니다.
+"""
+import os
+import sys
+import argparse
+import datetime
+from dotenv import load_dotenv
+from utils.storage import JsonBackend, open_backend
+from utils.config_manager import CONFIG_FILE, DATABASE_FILE
+from utils.audit_journal import AuditJournal
+from utils.exporter import EXPORT_COLUMNS, EXPORT_FORMATS, export_filename, iter_audit_rows, write_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description="음성 기록, 경고, 감사 기록을 gzip으로 압축한 CSV/JSONL 파일로 내보냅니다.")
+    parser.add_argument("kind", choices=EXPORT_COLUMNS)
+    parser.add_argument("-o", "--output", help="저장할 파일 (기본: <종류>-<서버>-<시각>.<형식>.gz)")
+    parser.add_argument("-f", "--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--guild", help="이 서버의 데이터만 내보냄 (기본: 모든 서버)")
+    parser.add_argument("--user", help="이 사용자의 데이터만 내보냄")
+    parser.add_argument("--since", type=datetime.date.fromisoformat, help="시작 날짜 YYYY-MM-DD (포함)")
+    parser.add_argument("--until", type=datetime.date.fromisoformat, help="끝 날짜 YYYY-MM-DD (포함)")
+    parser.add_argument("--audit-file", help="감사 기록 파일 (기본: AUDIT_FILE 환경 변수 또는 audit.db)")
+    args = parser.parse_args()
+    load_dotenv()
+
+    output = args.output or export_filename(args.kind, args.format, args.guild or "all")
+    if args.kind == "audit":
+        rows = iter_audit_rows(AuditJournal(path=args.audit_file), args.guild, args.user, args.since, args.until)
+        backend = None
+    else:
+        backend_name = os.environ.get("STORAGE_BACKEND", "sqlite")
+        database_file = os.environ.get("DATABASE_FILE", DATABASE_FILE)
+        if backend_name == "sqlite" and not os.path.exists(database_file):
+            print(f"오류: {database_file} 파일이 없습니다.")
+            sys.exit(1)
+        if backend_name == "json":
+            # 내보내기는 읽어 둔 문서에서 하므로 먼저 읽되, 실행 중인 봇의 파일은 고치지 않음
+            backend = JsonBackend(CONFIG_FILE, read_only=True)
+            backend.load()
+        else:
+            backend = open_backend(backend_name, CONFIG_FILE, database_file)
+        rows = backend.export_rows(args.kind, args.guild, args.user, args.since, args.until)
+    try:
+        count = write_export(rows, args.kind, args.format, output)
+    finally:
+        if backend is not None:
+            backend.close()
+    print(f"{count:,}개 행을 {output}(으)로 내보냈습니다.")
+
+
+if __name__ == "__main__":
+    main()
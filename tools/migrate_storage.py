@@ -0,0 +1,24 @@
+"""기존 config.json의 설정, 경고, 음성 기록을 SQLite 데이터베이스로 옮깁니다.
+
+사용법 (저장소 최상위 폴더에서):
+    python -m tools.migrate_storage config.json mogakco.db
+
+봇은 mogakco.db가 없으면 시작할 때 자동으로 옮기므로, 미리 옮겨 두거나 다른 경로로 옮길 때 사용합니다.
+"""
+import os
+import sys
+from utils.storage import migrate_json_to_sqlite
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else "config.json"
+    target = sys.argv[2] if len(sys.argv) > 2 else "mogakco.db"
+    if os.path.exists(target):
+        print(f"오류: {target} 파일이 이미 존재합니다. 중복으로 가져오지 않도록 중단합니다.")
+        sys.exit(1)
+    count = migrate_json_to_sqlite(source, target)
+    print(f"{source}의 {count}개 서버 데이터를 {target}(으)로 옮겼습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,44 @@
-from .config_manager import load_config, save_config, config_lock, CONFIG_FILE
+from .config_manager import (
+    load_config, save_config, flush_config, persist_config, refresh_config, start_config_refresh, guild_lock, CONFIG_FILE, DATABASE_FILE, get_tracked_voice_channels,
+    get_warning_count, add_warning, reset_warnings, get_voice_times, get_voice_leaderboard, get_voice_period_ranking, add_voice_time
+)
+from .text_normalizer import normalize_text
+from .keyword_matcher import KeywordMatcher, get_keyword_matcher, invalidate_keyword_matcher
+from .pattern_rules import compile_rule, describe_rule, get_pattern_rules, invalidate_pattern_rules
+from .welcome_template import WelcomeTemplate, get_welcome_template, invalidate_welcome_template
+from .spam_detector import SpamDetector, spam_detector, get_spam_settings, simhash
+from .join_raid import RAID_ACTIONS, JoinRateTracker, join_rate_tracker, get_raid_settings
+from .moderation_queue import ModerationQueue, moderation_queue, with_retries
+from .history_scan import HistoryScan, active_scans, get_scan_cursor, resume_or_start
+from .audit_journal import AUDIT_ACTIONS, AUDIT_COUNT_CAP, AuditJournal, audit_journal, record_audit
+from .exporter import EXPORT_COLUMNS, export_guild_data, export_filename, write_export
+from .log_dispatcher import LogDispatcher, log_dispatcher, send_log
+from .voice_ledger import VoiceLedger, voice_ledger
+from .voice_activity import PERIODS
+from .sharding import ShardConfig, get_shard_config
+from .command_sync import tree_hash, sync_command_tree
+from .startup_report import StartupReport
+from .metrics import Metrics, metrics, timed, start_metrics_server, stop_metrics_server
 from .formatters import format_duration
 
-__all__ = ['load_config', 'save_config', 'config_lock', 'CONFIG_FILE', 'format_duration']
+__all__ = [
+    'load_config', 'save_config', 'flush_config', 'persist_config', 'refresh_config', 'start_config_refresh', 'guild_lock', 'CONFIG_FILE', 'DATABASE_FILE', 'get_tracked_voice_channels',
+    'get_warning_count', 'add_warning', 'reset_warnings', 'get_voice_times', 'get_voice_leaderboard', 'get_voice_period_ranking', 'add_voice_time',
+    'normalize_text', 'KeywordMatcher', 'get_keyword_matcher', 'invalidate_keyword_matcher',
+    'compile_rule', 'describe_rule', 'get_pattern_rules', 'invalidate_pattern_rules',
+    'WelcomeTemplate', 'get_welcome_template', 'invalidate_welcome_template',
+    'SpamDetector', 'spam_detector', 'get_spam_settings', 'simhash',
+    'RAID_ACTIONS', 'JoinRateTracker', 'join_rate_tracker', 'get_raid_settings',
+    'ModerationQueue', 'moderation_queue', 'with_retries',
+    'HistoryScan', 'active_scans', 'get_scan_cursor', 'resume_or_start',
+    'AUDIT_ACTIONS', 'AUDIT_COUNT_CAP', 'AuditJournal', 'audit_journal', 'record_audit',
+    'EXPORT_COLUMNS', 'export_guild_data', 'export_filename', 'write_export',
+    'LogDispatcher', 'log_dispatcher', 'send_log',
+    'VoiceLedger', 'voice_ledger',
+    'PERIODS',
+    'ShardConfig', 'get_shard_config',
+    'tree_hash', 'sync_command_tree',
+    'StartupReport',
+    'Metrics', 'metrics', 'timed', 'start_metrics_server', 'stop_metrics_server',
+    'format_duration'
+]
@@ -0,0 +1,275 @@
+import os
+import glob
+import time
+import asyncio
+import sqlite3
+import datetime
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .sharding import get_shard_config
+from .metrics import metrics
+
+AUDIT_FILE = "audit.db"
+AUDIT_MAX_MB = 256     # 현재 파일이 이 크기를 넘으면 보관 파일로 돌리고 새 파일에 기록
+AUDIT_KEEP_ARCHIVES = 4  # 남겨두는 보관 파일 수 (오래된 것부터 삭제). 조회할 때 함께 검색함
+AUDIT_FLUSH_DELAY = 1.0  # 첫 기록 후 함께 쓸 기록을 모으는 시간(초)
+AUDIT_COUNT_CAP = 10000  # 조회 화면에 표시할 전체 개수를 세는 상한
+
+# 기록 종류와 표시 이름
+AUDIT_ACTIONS = {
+    "censor": "검열",
+    "spam": "도배",
+    "punish": "처벌",
+    "warning_reset": "경고 초기화",
+    "raid": "레이드 조치",
+}
+
+
+class AuditJournal:
+    """검열, 처벌, 경고 초기화 기록을 추가 전용 SQLite 파일에 남기고 서버·사용자·시각 순으로 조회합니다.
+
+    기록은 메모리 큐에 넣고 바로 반환하며, AUDIT_FLUSH_DELAY 동안 모인 기록을 전용 스레드가 한 트랜잭션으로 씁니다.
+    파일이 AUDIT_MAX_MB를 넘으면 시각이 붙은 보관 파일로 이름을 바꾸고, 조회할 때는 보관 파일도 붙여(ATTACH) 함께 검색합니다.
+    샤드를 여러 프로세스가 나눠 맡으면 프로세스마다 별도의 파일을 씁니다.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS audit_log (
+            id       INTEGER PRIMARY KEY,
+            at       REAL NOT NULL,
+            guild_id TEXT NOT NULL,
+            user_id  TEXT,
+            actor_id TEXT,
+            action   TEXT NOT NULL,
+            detail   TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS idx_audit_user ON audit_log (guild_id, user_id, at);
+        CREATE INDEX IF NOT EXISTS idx_audit_guild ON audit_log (guild_id, at);
+        CREATE TRIGGER IF NOT EXISTS audit_log_no_update BEFORE UPDATE ON audit_log
+            BEGIN SELECT RAISE(ABORT, 'audit_log is append-only'); END;
+        CREATE TRIGGER IF NOT EXISTS audit_log_no_delete BEFORE DELETE ON audit_log
+            BEGIN SELECT RAISE(ABORT, 'audit_log is append-only'); END;
+    """
+
+    def __init__(self, path=None, max_bytes=None, keep_archives=AUDIT_KEEP_ARCHIVES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.keep_archives = keep_archives
+        self._conn = None
+        self._archives = []  # 붙여 둔 보관 파일의 스키마 이름 (최신 순)
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._flush_scheduled = False
+        self._closed = False
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit-journal")
+
+    # -------------------- 쓰기 전용 스레드에서만 호출 --------------------
+
+    def _resolve_path(self):
+        # .env 로드 이후에 읽도록 첫 사용 시점에 경로와 크기를 정함
+        if self.path is None:
+            self.path = get_shard_config().scoped_path(os.environ.get("AUDIT_FILE", AUDIT_FILE))
+        if self.max_bytes is None:
+            self.max_bytes = int(float(os.environ.get("AUDIT_MAX_MB", AUDIT_MAX_MB)) * 1024 * 1024)
+
+    def _open(self):
+        if self._conn is not None:
+            return
+        self._resolve_path()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+        self._archives = []
+        for index, archive in enumerate(self._archive_paths()):
+            schema = f"archive{index}"
+            self._conn.execute(f"ATTACH DATABASE ? AS {schema}", (archive,))
+            self._archives.append(schema)
+
+    def _archive_paths(self):
+        """보관 파일 경로를 최신 순으로 반환합니다."""
+        base, ext = os.path.splitext(self.path)
+        return sorted(glob.glob(f"{glob.escape(base)}-*{ext}"), reverse=True)
+
+    def _rotate(self):
+        """현재 파일을 보관 파일로 돌리고, 보관 파일이 너무 많으면 오래된 것부터 지웁니다."""
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._conn.close()
+        self._conn = None
+        base, ext = os.path.splitext(self.path)
+        _remove_with_sidecars(self.path, keep_main=True)
+        os.replace(self.path, f"{base}-{datetime.datetime.now():%Y%m%d%H%M%S%f}{ext}")
+        for archive in self._archive_paths()[self.keep_archives:]:
+            _remove_with_sidecars(archive)
+        self._open()
+
+    def _flush(self):
+        with self._lock:
+            rows = list(self._pending)
+            self._pending.clear()
+            self._flush_scheduled = False
+        if not rows:
+            return
+        try:
+            self._open()
+            with metrics.timer("audit.write"), self._conn:
+                self._conn.executemany(
+                    "INSERT INTO audit_log (at, guild_id, user_id, actor_id, action, detail) VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+            metrics.increment("audit.rows", len(rows))
+            # WAL에 쌓인 페이지까지 포함한 크기로 판단
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+            if page_count * page_size > self.max_bytes:
+                self._rotate()
+        except (sqlite3.Error, OSError) as e:
+            print(f"감사 기록 저장 실패 ({len(rows)}건): {e}")
+
+    def _where(self, guild_id, user_id):
+        where = "guild_id = ?" + (" AND user_id = ?" if user_id is not None else "")
+        return where, (guild_id,) + ((user_id,) if user_id is not None else ())
+
+    def _query(self, guild_id, user_id, limit, before):
+        self._flush()  # 아직 쓰지 않은 기록도 조회 결과에 포함
+        self._open()
+        where, params = self._where(guild_id, user_id)
+        if before is not None:
+            # 이전 페이지의 마지막 기록보다 오래된 것부터 읽으므로 페이지가 뒤로 가도 읽는 행 수가 늘지 않음
+            where += " AND (at, id) < (?, ?)"
+            params += tuple(before)
+        schemas = ["main"] + self._archives
+
+        # 각 파일에서 인덱스 순서로 필요한 만큼만 읽은 뒤 합쳐 정렬 (다음 페이지가 있는지 보려고 하나 더 읽음)
+        union = " UNION ALL ".join(
+            f"SELECT * FROM (SELECT at, id, user_id, actor_id, action, detail FROM {schema}.audit_log WHERE {where} ORDER BY at DESC, id DESC LIMIT ?)"
+            for schema in schemas
+        )
+        rows = self._conn.execute(
+            f"{union} ORDER BY at DESC, id DESC LIMIT ?",
+            (params + (limit + 1,)) * len(schemas) + (limit + 1,)
+        ).fetchall()
+        next_cursor = rows[limit - 1][:2] if len(rows) > limit else None
+        return [(at, user, actor, action, detail) for at, _, user, actor, action, detail in rows[:limit]], next_cursor
+
+    def _count(self, guild_id, user_id, cap):
+        self._flush()
+        self._open()
+        where, params = self._where(guild_id, user_id)
+        total = 0
+        for schema in ["main"] + self._archives:
+            total += self._conn.execute(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM {schema}.audit_log WHERE {where} LIMIT ?)", params + (cap - total,)
+            ).fetchone()[0]
+            if total >= cap:
+                break
+        return total
+
+    # -------------------- 이벤트 루프에서 호출 --------------------
+
+    def record(self, guild_id, action, user_id=None, actor_id=None, detail="", at=None):
+        """기록을 큐에 넣고 바로 반환합니다. 실제 쓰기는 전용 스레드에서 모아서 처리합니다."""
+        row = (
+            at if at is not None else time.time(), str(guild_id),
+            str(user_id) if user_id is not None else None,
+            str(actor_id) if actor_id is not None else None,
+            action, detail
+        )
+        with self._lock:
+            self._pending.append(row)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        try:
+            asyncio.get_running_loop().call_later(AUDIT_FLUSH_DELAY, self._submit_flush)
+        except RuntimeError:
+            self._submit_flush()  # 이벤트 루프 밖(스크립트 등)에서는 바로 기록
+
+    def _submit_flush(self):
+        if not self._closed:
+            self._writer.submit(self._flush)
+
+    async def query(self, guild_id, user_id=None, limit=10, before=None):
+        """서버(user_id를 주면 해당 사용자)의 기록을 최신순으로 limit개 읽어 ([(시각, user_id, actor_id, 종류, 내용)], 다음 페이지 위치)로 반환합니다.
+
+        다음 페이지는 반환된 위치를 before로 넘겨 읽으며, 더 읽을 기록이 없으면 위치는 None입니다.
+        대기 중인 기록을 먼저 쓴 뒤 같은 스레드에서 조회하므로 방금 남긴 기록도 포함됩니다.
+        """
+        loop = asyncio.get_running_loop()
+        user_id = str(user_id) if user_id is not None else None
+        return await loop.run_in_executor(self._writer, self._query, str(guild_id), user_id, limit, before)
+
+    async def count(self, guild_id, user_id=None, cap=AUDIT_COUNT_CAP):
+        """서버(user_id를 주면 해당 사용자)의 기록 수를 반환합니다. cap개에서 세기를 멈추므로 결과가 cap이면 그 이상일 수 있습니다."""
+        loop = asyncio.get_running_loop()
+        user_id = str(user_id) if user_id is not None else None
+        return await loop.run_in_executor(self._writer, self._count, str(guild_id), user_id, cap)
+
+    def export_rows(self, guild_id=None, user_id=None, start_at=None, end_at=None, chunk_size=1000):
+        """기록을 오래된 순으로 (서버, 사용자, 처리자, 종류, 내용, 시각)씩 내보냅니다. 시각은 start_at 이상 end_at 미만입니다.
+
+        보관 파일부터 현재 파일까지 차례로 각자의 읽기 전용 연결에서 chunk_size개씩 읽으므로 쓰기 스레드를 막지 않고,
+        기록이 많아도 메모리 사용량이 일정합니다. 아직 쓰지 않은 기록은 포함되지 않으므로 필요하면 먼저 flush()를 호출하세요.
+        """
+        self._resolve_path()
+        conditions, params = [], []
+        for column, value in (("guild_id", guild_id), ("user_id", user_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(str(value))
+        if start_at is not None:
+            conditions.append("at >= ?")
+            params.append(start_at)
+        if end_at is not None:
+            conditions.append("at < ?")
+            params.append(end_at)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        query = f"SELECT guild_id, user_id, actor_id, action, detail, at FROM audit_log{where} ORDER BY at"
+
+        paths = self._archive_paths()[::-1] + [self.path]
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            conn = sqlite3.connect(path)
+            try:
+                conn.execute("PRAGMA query_only = ON")
+                cursor = conn.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield from rows
+            except sqlite3.Error as e:
+                print(f"감사 기록 내보내기 실패 ({path}): {e}")
+            finally:
+                conn.close()
+
+    async def flush(self):
+        """대기 중인 기록을 지금 씁니다."""
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._flush)
+
+    def shutdown(self):
+        """남은 기록을 모두 쓰고 파일을 닫습니다. 봇 종료 시 호출합니다."""
+        if self._closed:
+            return
+        self._closed = True
+        self._writer.submit(self._flush)
+        self._writer.shutdown(wait=True)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _remove_with_sidecars(path, keep_main=False):
+    """SQLite 파일과 함께 생기는 -wal, -shm 파일을 지웁니다. keep_main이면 본 파일은 남깁니다."""
+    for suffix in ("-wal", "-shm") if keep_main else ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+audit_journal = AuditJournal()
+
+def record_audit(guild_id, action, user_id=None, actor_id=None, detail=""):
+    """검열/처벌 기록을 감사 기록에 남깁니다. action은 AUDIT_ACTIONS의 키입니다."""
+    audit_journal.record(guild_id, action, user_id=user_id, actor_id=actor_id, detail=detail)
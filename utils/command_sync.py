@@ -0,0 +1,39 @@
+import os
+import json
+import hashlib
+
+COMMAND_HASH_FILE = ".command_tree.sha256"
+
+
+def tree_hash(tree, application_id=None):
+    """등록된 전역 슬래시 명령어 정의(이름, 설명, 옵션, 권한 등)로 만든 해시를 반환합니다."""
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands()), key=lambda item: (item.get("type", 1), item["name"]))
+    data = json.dumps({"application_id": application_id, "commands": payload}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+def _read_hash(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _write_hash(path, value):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(value)
+    os.replace(temp_path, path)
+
+async def sync_command_tree(bot, force=False, path=COMMAND_HASH_FILE):
+    """명령어 정의가 마지막 동기화 이후 바뀌었을 때만 전역 명령어를 동기화합니다.
+
+    동기화한 명령어 수를 반환하고, 바뀐 것이 없어 건너뛰면 None을 반환합니다.
+    해시는 동기화가 성공한 뒤에만 기록하므로 실패하면 다음 실행에서 다시 시도합니다.
+    """
+    current = tree_hash(bot.tree, bot.application_id)
+    if not force and _read_hash(path) == current:
+        return None
+
+    synced = await bot.tree.sync()
+    _write_hash(path, current)
+    return len(synced)
@@ -1,21 +1,365 @@
 import os
-import json
+import copy
+import time
+import heapq
+import datetime
 import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from .storage import StorageBatch, open_backend
+from .leaderboard import Leaderboard, LEADERBOARD_SIZE
+from .voice_activity import BUCKET_DAYS, DailyBuckets, split_by_day, period_start_day
+from .warning_store import WarningHistory, decay_cutoff
+from .sharding import get_shard_config
+from .metrics import metrics
 
 CONFIG_FILE = "config.json"
-config_lock = asyncio.Lock()
+DATABASE_FILE = "mogakco.db"
+SAVE_DELAY = 2.0  # 변경 후 저장소에 기록하기까지 모아두는 시간(초)
+REFRESH_INTERVAL = 5.0  # 샤드를 나눠 맡을 때 다른 프로세스의 설정 변경을 확인하는 주기(초)
+
+# 프로세스 전체에서 공유하는 캐시 (저장소에서 처음 한 번만 읽음)
+_backend = None
+_settings = None     # {guild_id: 설정 dict}
+_warnings = {}       # {guild_id: {user_id: WarningHistory}}
+_voice_times = {}    # {guild_id: {user_id: 누적 체류 시간(초)}}
+_leaderboards = {}   # {guild_id: Leaderboard} 처음 조회할 때 만들고 이후 증분 갱신
+_voice_daily = {}    # {guild_id: {user_id: DailyBuckets}} 최근 BUCKET_DAYS일의 일별 체류 시간
+_voice_channel_index = {}  # {guild_id: frozenset(감시 음성 채널 ID)} 설정이 저장될 때 다시 계산
+
+# 다음 저장 때 기록할 항목
+_dirty_settings = set()
+_dirty_warnings = set()
+_dirty_voice = set()
+_dirty_voice_daily = set()
+_flush_handle = None
+_refresh_task = None
+_settings_listeners = []  # 설정이 다른 프로세스에서 바뀌었을 때 호출할 함수(guild_id)
+
+# 저장소 쓰기는 이 스레드 하나에서 순서대로 처리하여 이벤트 루프를 막지 않음
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="config-writer")
+
+def _ensure_loaded():
+    global _backend, _settings, _warnings, _voice_times
+    if _settings is not None:
+        return
+    # .env 로드 이후에 읽도록 import 시점이 아닌 첫 사용 시점에 환경 변수를 확인
+    backend_name = os.environ.get("STORAGE_BACKEND", "sqlite")
+    database_file = os.environ.get("DATABASE_FILE", DATABASE_FILE)
+    shard_config = get_shard_config()
+    backend = open_backend(backend_name, CONFIG_FILE, database_file)
+    if shard_config.is_partial and not backend.shared:
+        backend.close()
+        raise RuntimeError(f"'{backend_name}' 저장소는 여러 프로세스가 함께 쓸 수 없습니다. SHARD_IDS로 샤드를 나눠 실행하려면 STORAGE_BACKEND=sqlite를 사용하세요.")
+    _backend = backend
+
+    # 샤드를 나눠 맡으면 이 프로세스가 맡은 서버의 데이터만 메모리에 올림
+    with metrics.timer("storage.load"):
+        settings, warning_times, voice_times = _backend.load()
+    _settings = {guild_id: data for guild_id, data in settings.items() if shard_config.owns(guild_id)}
+    _voice_times = {guild_id: users for guild_id, users in voice_times.items() if shard_config.owns(guild_id)}
+    _warnings = {
+        guild_id: {user_id: WarningHistory(times) for user_id, times in users.items()}
+        for guild_id, users in warning_times.items() if shard_config.owns(guild_id)
+    }
+
+    since_day = datetime.date.today().toordinal() - BUCKET_DAYS + 1
+    for guild_id, users in _backend.load_voice_daily(since_day).items():
+        if not shard_config.owns(guild_id):
+            continue
+        for user_id, days in users.items():
+            buckets = _voice_daily.setdefault(guild_id, {}).setdefault(user_id, DailyBuckets())
+            for day, seconds in days.items():
+                buckets.add(day, seconds)
+
+def _schedule_flush():
+    global _flush_handle
+    if _flush_handle is not None:
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # 이벤트 루프 밖(스크립트 등)에서는 바로 저장
+        flush_config()
+        return
+    _flush_handle = loop.call_later(SAVE_DELAY, _flush_in_background)
+
+# 서버(와 설정 키)별 잠금. 사용 중인 잠금만 남고 나머지는 자동으로 정리됨
+_guild_locks = weakref.WeakValueDictionary()
+
+def guild_lock(guild_id, key=None):
+    """서버별(key를 주면 서버 안의 항목별) asyncio.Lock을 반환합니다.
+
+    잠금 안에서는 설정을 읽고 고치는 동작만 하고, Discord API 호출 같은 네트워크 대기는 잠금 밖에서 하세요.
+    """
+    lock_key = (str(guild_id), key)
+    lock = _guild_locks.get(lock_key)
+    if lock is None:
+        lock = _guild_locks[lock_key] = asyncio.Lock()
+    return lock
 
 def load_config():
-    """설정 파일을 로드합니다."""
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-    return {}
-
-def save_config(config):
-    """설정 파일을 저장합니다."""
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=4, ensure_ascii=False)
+    """서버별 설정을 반환합니다. 저장소는 처음 한 번만 읽고, 이후에는 메모리에 있는 설정을 복사 없이 그대로 돌려줍니다."""
+    _ensure_loaded()
+    return _settings
+
+def save_config(config, guild_id=None):
+    """설정 변경을 기록합니다. guild_id를 주면 해당 서버의 설정만 저장 대상이 됩니다."""
+    global _settings
+    _ensure_loaded()
+    if config is not _settings:
+        _settings = config
+        guild_id = None
+
+    if guild_id is None:
+        _dirty_settings.update(_settings.keys())
+        _voice_channel_index.clear()
+    else:
+        _dirty_settings.add(str(guild_id))
+        _voice_channel_index.pop(str(guild_id), None)
+    _schedule_flush()
+
+def add_settings_listener(callback):
+    """다른 프로세스가 서버 설정을 바꿔 메모리의 설정을 교체했을 때 callback(guild_id)를 호출하도록 등록합니다."""
+    _settings_listeners.append(callback)
+
+def _apply_changed_settings(changed):
+    """다른 프로세스가 저장한 설정을 메모리에 반영합니다. 아직 저장하지 않은 변경이 있는 서버는 건너뜁니다."""
+    shard_config = get_shard_config()
+    applied = 0
+    for guild_id, data in changed.items():
+        if guild_id in _dirty_settings or not shard_config.owns(guild_id) or _settings.get(guild_id) == data:
+            continue
+        _settings[guild_id] = data
+        _voice_channel_index.pop(guild_id, None)
+        for callback in _settings_listeners:
+            callback(guild_id)
+        applied += 1
+    return applied
+
+async def refresh_config():
+    """다른 프로세스가 저장소에 기록한 설정 변경을 가져와 반영하고, 반영한 서버 수를 반환합니다."""
+    _ensure_loaded()
+    # 쓰기 스레드에서 읽어 이 프로세스의 기록과 순서가 섞이지 않도록 함
+    with metrics.timer("storage.refresh"):
+        changed = await asyncio.get_running_loop().run_in_executor(_writer, _backend.changed_settings)
+    return _apply_changed_settings(changed)
+
+def start_config_refresh(interval=REFRESH_INTERVAL):
+    """샤드를 다른 프로세스와 나눠 맡을 때 주기적으로 설정 변경을 가져오는 작업을 시작합니다."""
+    global _refresh_task
+    _ensure_loaded()
+    if not get_shard_config().is_partial or not _backend.shared:
+        return
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_loop(interval))
+
+async def _refresh_loop(interval):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_config()
+        except Exception as e:
+            print(f"설정 새로고침 실패: {e}")
+
+def get_tracked_voice_channels(guild_id):
+    """서버에서 감시 중인 음성 채널 ID 집합(frozenset)을 반환합니다. 설정이 바뀌기 전까지는 미리 계산한 값을 씁니다."""
+    guild_id = str(guild_id)
+    channels = _voice_channel_index.get(guild_id)
+    if channels is None:
+        server_config = load_config().get(guild_id, {})
+        channel_ids = server_config.get("voice_channel_ids")
+        if channel_ids is None and server_config.get("voice_channel_id"):
+            channel_ids = [server_config["voice_channel_id"]]  # 이전 버전의 단일 채널 설정
+        channels = _voice_channel_index[guild_id] = frozenset(channel_ids or ())
+    return channels
+
+def _warning_history(guild_id, user_id, now):
+    """만료된 경고를 정리한 사용자의 경고 기록을 반환합니다. 기록이 없으면 None입니다."""
+    history = _warnings.get(guild_id, {}).get(user_id)
+    if history is None:
+        return None
+    decay_days = _settings.get(guild_id, {}).get("punishment", {}).get("warning_decay_days", 0)
+    if history.prune(decay_cutoff(decay_days, now)):
+        if not history:
+            del _warnings[guild_id][user_id]
+        _dirty_warnings.add((guild_id, user_id))
+        _schedule_flush()
+    return history
+
+def get_warning_count(guild_id, user_id):
+    """사용자의 유효한(만료되지 않은) 경고 횟수를 반환합니다."""
+    _ensure_loaded()
+    history = _warning_history(str(guild_id), str(user_id), time.time())
+    return len(history) if history else 0
+
+def add_warning(guild_id, user_id, threshold=0):
+    """경고를 하나 더하고 (유효한 경고 횟수, 임계값 도달 여부)를 반환합니다.
+
+    임계값(threshold)에 도달하면 경고 기록을 비웁니다. 중간에 await가 없으므로 잠금 없이도
+    같은 사용자의 경고가 동시에 들어와 한 번만 세지거나 처벌이 두 번 실행되는 일이 없습니다.
+    """
+    _ensure_loaded()
+    guild_id, user_id = str(guild_id), str(user_id)
+    now = time.time()
+    history = _warning_history(guild_id, user_id, now)
+    if history is None:
+        history = _warnings.setdefault(guild_id, {})[user_id] = WarningHistory()
+    count = history.add(now)
+
+    reached = threshold > 0 and count >= threshold
+    if reached:
+        del _warnings[guild_id][user_id]
+    _dirty_warnings.add((guild_id, user_id))
+    _schedule_flush()
+    return count, reached
+
+def reset_warnings(guild_id, user_id):
+    """사용자의 경고 기록을 모두 지우고, 지우기 전의 유효한 경고 횟수를 반환합니다."""
+    count = get_warning_count(guild_id, user_id)
+    guild_id, user_id = str(guild_id), str(user_id)
+    if _warnings.get(guild_id, {}).pop(user_id, None) is not None:
+        _dirty_warnings.add((guild_id, user_id))
+        _schedule_flush()
+    return count
+
+def get_voice_times(guild_id):
+    """서버의 {user_id: 누적 체류 시간(초)}을 반환합니다. 반환된 dict는 수정하지 마세요."""
+    _ensure_loaded()
+    return _voice_times.get(str(guild_id), {})
+
+def get_voice_leaderboard(guild_id):
+    """서버의 누적 체류 시간 상위 사용자를 [(user_id, 초)] 형태로 반환합니다."""
+    _ensure_loaded()
+    guild_id = str(guild_id)
+    leaderboard = _leaderboards.get(guild_id)
+    if leaderboard is None:
+        leaderboard = _leaderboards[guild_id] = Leaderboard.from_totals(_voice_times.get(guild_id, {}))
+    return leaderboard.top()
+
+def get_voice_period_ranking(guild_id, period, limit=LEADERBOARD_SIZE):
+    """기간('all', 'day', 'week', 'month')별 체류 시간 상위 사용자를 [(user_id, 초)]로 반환합니다.
+
+    'all'은 누적 순위표를, 나머지는 일별 기록을 사용하며 사용자마다 최대 BUCKET_DAYS칸만 더합니다.
+    """
+    if period == "all":
+        return get_voice_leaderboard(guild_id)[:limit]
+
+    _ensure_loaded()
+    start_day = period_start_day(period)
+    end_day = datetime.date.today().toordinal()
+    totals = ((user_id, buckets.total(start_day, end_day)) for user_id, buckets in _voice_daily.get(str(guild_id), {}).items())
+    return [entry for entry in heapq.nlargest(limit, totals, key=lambda item: item[1]) if entry[1] > 0]
+
+def add_voice_time(guild_id, user_id, seconds, ended_at=None):
+    """사용자의 누적 체류 시간에 seconds를 더하고 새 누적 시간을 반환합니다.
+
+    ended_at(기본: 지금)에 끝난 세션으로 보고 날짜별 기록에도 나눠서 더합니다.
+    """
+    _ensure_loaded()
+    guild_id, user_id = str(guild_id), str(user_id)
+    ended_at = ended_at or time.time()
+    buckets = _voice_daily.setdefault(guild_id, {}).setdefault(user_id, DailyBuckets())
+    for day, day_seconds in split_by_day(ended_at - seconds, ended_at).items():
+        if buckets.add(day, day_seconds) is not None:
+            _dirty_voice_daily.add((guild_id, user_id, day))
+
+    guild_times = _voice_times.setdefault(guild_id, {})
+    total = guild_times.get(user_id, 0) + seconds
+    guild_times[user_id] = total
+    if guild_id in _leaderboards:
+        _leaderboards[guild_id].update(user_id, total)
+    _dirty_voice.add((guild_id, user_id))
+    _schedule_flush()
+    return total
+
+def _take_batch():
+    """저장할 변경 사항을 모아 StorageBatch로 만들고 변경 표시를 지웁니다.
+
+    설정 dict는 복사해서 넘기므로, 쓰기 스레드가 기록하는 동안 이벤트 루프에서 설정을 바꿔도 안전합니다.
+    """
+    global _flush_handle
+    if _flush_handle is not None:
+        _flush_handle.cancel()
+        _flush_handle = None
+
+    batch = StorageBatch()
+    if _settings is None:
+        return batch
+
+    for guild_id in _dirty_settings:
+        guild_settings = _settings.get(guild_id)
+        batch.settings[guild_id] = copy.deepcopy(guild_settings) if guild_settings is not None else None
+    for guild_id, user_id in _dirty_warnings:
+        history = _warnings.get(guild_id, {}).get(user_id)
+        batch.warnings[(guild_id, user_id)] = history.to_list() if history else None
+    for guild_id, user_id in _dirty_voice:
+        batch.voice_times[(guild_id, user_id)] = _voice_times[guild_id][user_id]
+    for guild_id, user_id, day in _dirty_voice_daily:
+        buckets = _voice_daily[guild_id][user_id]
+        batch.voice_daily[(guild_id, user_id, day)] = buckets.total(day, day)
+
+    _dirty_settings.clear()
+    _dirty_warnings.clear()
+    _dirty_voice.clear()
+    _dirty_voice_daily.clear()
+    return batch
+
+def _requeue(batch):
+    """기록에 실패한 항목을 다시 변경 표시하여 다음 저장 때 재시도합니다."""
+    _dirty_settings.update(batch.settings)
+    _dirty_warnings.update(batch.warnings)
+    _dirty_voice.update(batch.voice_times)
+    _dirty_voice_daily.update(batch.voice_daily)
+    _schedule_flush()
+
+def _write_batch(batch):
+    with metrics.timer("storage.write_batch"):
+        _backend.write_batch(batch)
+    metrics.increment("storage.batches")
+    metrics.increment("storage.rows", len(batch.settings) + len(batch.warnings) + len(batch.voice_times) + len(batch.voice_daily))
+
+def _submit(batch):
+    """쓰기 스레드에 batch 기록을 맡기고 concurrent.futures.Future를 반환합니다."""
+    future = _writer.submit(_write_batch, batch)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return future
+
+    def on_done(done):
+        error = done.exception()
+        if error is not None:
+            print(f"설정 저장 실패 (다시 시도합니다): {error}")
+            loop.call_soon_threadsafe(_requeue, batch)
+
+    future.add_done_callback(on_done)
+    return future
+
+def _flush_in_background():
+    global _flush_handle
+    _flush_handle = None
+    batch = _take_batch()
+    if batch:
+        _submit(batch)
+
+def export_storage_rows(kind, guild_id=None, user_id=None, start=None, end=None):
+    """저장소의 음성 기록/경고 행을 하나씩 내보냅니다. 인자는 StorageBackend.export_rows()와 같습니다.
+
+    저장소에서 직접 읽으므로 아직 저장되지 않은 변경까지 포함하려면 먼저 persist_config()를 호출하세요.
+    """
+    _ensure_loaded()
+    return _backend.export_rows(kind, guild_id, user_id, start, end)
+
+async def persist_config():
+    """저장되지 않은 변경을 바로 기록하고, 앞서 요청된 기록까지 모두 디스크에 반영될 때까지 기다립니다."""
+    _ensure_loaded()
+    # 쓰기 스레드는 하나이므로 이 작업이 끝나면 이전 기록도 모두 끝난 상태
+    await asyncio.wrap_future(_submit(_take_batch()))
+
+def flush_config():
+    """저장되지 않은 변경을 즉시 기록하고 완료될 때까지 기다립니다. 봇 종료 시 호출합니다."""
+    if _settings is None:
+        return
+    _submit(_take_batch()).result()
@@ -0,0 +1,75 @@
+import os
+import csv
+import gzip
+import json
+import asyncio
+import datetime
+import tempfile
+from .config_manager import persist_config, export_storage_rows
+from .audit_journal import audit_journal
+
+# 내보내기 종류별 열 이름
+EXPORT_COLUMNS = {
+    "voice_daily": ("guild_id", "user_id", "date", "seconds"),
+    "voice_totals": ("guild_id", "user_id", "total_seconds"),
+    "warnings": ("guild_id", "user_id", "warned_at"),
+    "audit": ("guild_id", "user_id", "actor_id", "action", "detail", "at"),
+}
+EXPORT_FORMATS = ("csv", "jsonl")
+
+
+def iter_audit_rows(journal, guild_id=None, user_id=None, start=None, end=None):
+    """감사 기록을 내보내기 행으로 바꿉니다. start와 end(datetime.date)는 해당 날짜를 포함합니다."""
+    start_at = datetime.datetime.combine(start, datetime.time()).timestamp() if start else None
+    end_at = datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time()).timestamp() if end else None
+    for *row, at in journal.export_rows(guild_id, user_id, start_at, end_at):
+        yield (*row, datetime.datetime.fromtimestamp(at).isoformat(timespec='seconds'))
+
+def write_export(rows, kind, fmt, path):
+    """행을 하나씩 gzip으로 압축한 CSV/JSONL 파일에 씁니다. 쓴 행 수를 반환합니다.
+
+    행을 모아두지 않고 바로 쓰므로 데이터가 많아도 메모리 사용량이 늘지 않습니다.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"알 수 없는 내보내기 형식입니다: {fmt}")
+    columns = EXPORT_COLUMNS[kind]
+    count = 0
+    with gzip.open(path, 'wt', encoding='utf-8', newline='') as f:
+        if fmt == "csv":
+            f.write("\ufeff")  # 엑셀에서 한글이 깨지지 않도록 BOM을 붙임
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+                count += 1
+    return count
+
+def export_filename(kind, fmt, guild_id):
+    return f"{kind}-{guild_id}-{datetime.datetime.now():%Y%m%d-%H%M%S}.{fmt}.gz"
+
+async def export_guild_data(kind, fmt, guild_id, user_id=None, start=None, end=None):
+    """서버 데이터를 임시 파일로 내보내고 (파일 경로, 행 수)를 반환합니다. 다 쓴 파일은 호출한 쪽에서 지워야 합니다.
+
+    저장되지 않은 변경을 먼저 기록한 뒤, 파일 쓰기는 별도 스레드에서 진행하여 이벤트 루프를 막지 않습니다.
+    """
+    guild_id = str(guild_id)
+    user_id = str(user_id) if user_id is not None else None
+    if kind == "audit":
+        await audit_journal.flush()
+        rows = iter_audit_rows(audit_journal, guild_id, user_id, start, end)
+    else:
+        await persist_config()
+        rows = export_storage_rows(kind, guild_id, user_id, start, end)
+
+    fd, path = tempfile.mkstemp(suffix=f".{fmt}.gz", prefix="export-")
+    os.close(fd)
+    try:
+        count = await asyncio.to_thread(write_export, rows, kind, fmt, path)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, count
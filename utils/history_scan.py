@@ -0,0 +1,159 @@
+import time
+import datetime
+import discord
+from .config_manager import load_config, save_config, guild_lock
+from .keyword_matcher import get_keyword_matcher
+from .pattern_rules import get_pattern_rules
+from .moderation_queue import with_retries
+from .audit_journal import record_audit
+
+PAGE_SIZE = 100              # 한 번에 검사하고 지우는 메시지 수 (delete_messages 한 번의 최대 개수와 같음)
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=5)  # 이보다 오래된 메시지는 한 번에 지울 수 없음
+PROGRESS_INTERVAL = 3.0      # 진행 상황을 알리는 최소 간격(초)
+
+# 채널별로 진행 중인 검사 (같은 채널을 동시에 두 번 검사하지 않음)
+active_scans = {}  # {channel_id: HistoryScan}
+
+
+class HistoryScan:
+    """채널의 지난 메시지를 최신순으로 100개씩 읽어 검열 규칙에 걸린 메시지를 지웁니다.
+
+    14일이 안 된 메시지는 delete_messages()로 한 번에 최대 100개씩, 그보다 오래된 메시지는 하나씩 지웁니다.
+    페이지를 마칠 때마다 마지막으로 본 메시지 ID를 서버 설정에 저장하므로 중지하거나 봇이 재시작되어도 이어서 검사할 수 있습니다.
+    """
+
+    def __init__(self, channel, until, before=None, scanned=0, deleted=0):
+        self.channel = channel
+        self.guild_id = str(channel.guild.id)
+        self.until = until      # 이 시각 이후의 메시지만 검사
+        self.before = before    # 이 메시지 ID보다 이전 메시지부터 검사 (이어서 검사할 때)
+        self.scanned = scanned
+        self.deleted = deleted
+        self.bulk_calls = 0
+        self.single_deletes = 0
+        self.failed = 0
+        self.pages = 0
+        self.cancelled = False
+        self.finished = False
+        self.started_at = time.perf_counter()
+        self._resumed_scanned = scanned
+
+    def cancel(self):
+        """현재 페이지를 마친 뒤 검사를 멈춥니다. 진행 위치는 저장되어 다음에 이어서 검사할 수 있습니다."""
+        self.cancelled = True
+
+    def rate(self):
+        """이번 실행에서 초당 검사한 메시지 수를 반환합니다."""
+        elapsed = time.perf_counter() - self.started_at
+        return (self.scanned - self._resumed_scanned) / elapsed if elapsed > 0 else 0.0
+
+    async def run(self, on_progress=None):
+        """검사를 끝까지(또는 취소될 때까지) 진행합니다. on_progress(scan)는 PROGRESS_INTERVAL마다 호출됩니다."""
+        matcher = get_keyword_matcher(self.guild_id)
+        rule_set = get_pattern_rules(self.guild_id) or None
+        before = discord.Object(id=self.before) if self.before else None
+        last_progress = time.perf_counter()
+
+        page = []
+        # history()는 내부적으로 요청 한 번에 100개씩 가져오므로 같은 크기의 페이지로 모아 처리
+        async for message in self.channel.history(limit=None, before=before, after=self.until, oldest_first=False):
+            page.append(message)
+            if len(page) < PAGE_SIZE:
+                continue
+            rule_set = await self._process_page(page, matcher, rule_set)
+            page = []
+            if on_progress and time.perf_counter() - last_progress >= PROGRESS_INTERVAL:
+                last_progress = time.perf_counter()
+                await on_progress(self)
+            if self.cancelled:
+                return
+        if page:
+            await self._process_page(page, matcher, rule_set)
+        self.finished = True
+        await clear_scan_cursor(self.guild_id, self.channel.id)
+
+    async def _process_page(self, page, matcher, rule_set):
+        """페이지의 메시지를 검사해 걸린 메시지를 지우고, 다음 페이지에 쓸 규칙 묶음을 반환합니다.
+
+        패턴 규칙은 키워드에 걸리지 않은 메시지만 모아 한 번에 검사하며, 제한 시간을 넘기면 None을 반환해 이후 페이지에서는 검사하지 않습니다.
+        """
+        candidates = [message for message in page if not message.author.bot and message.content]
+        hits, unmatched = [], []
+        for message in candidates:
+            (hits if matcher and matcher.scan(message.content) else unmatched).append(message)
+
+        if rule_set and unmatched:
+            results = await rule_set.scan_many(message.content for message in unmatched)
+            hits += [message for message, found in zip(unmatched, results) if found]
+            if rule_set.disabled:
+                rule_set = None
+
+        await self._delete(hits)
+        self.scanned += len(page)
+        self.pages += 1
+        self.before = page[-1].id
+        await save_scan_cursor(self)
+        return rule_set
+
+    async def _delete(self, messages):
+        bulk_limit = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        recent = [message for message in messages if message.created_at > bulk_limit]
+        old = [message for message in messages if message.created_at <= bulk_limit]
+
+        if len(recent) == 1:
+            old.append(recent.pop())  # 하나뿐이면 일반 삭제 API를 사용
+        if recent:
+            try:
+                await with_retries(self.channel.delete_messages, recent, reason="검열 규칙 위반 (지난 메시지 검사)")
+                self.bulk_calls += 1
+                self.deleted += len(recent)
+                for message in recent:
+                    record_audit(self.guild_id, "censor", user_id=message.author.id, detail="지난 메시지 검사")
+            except discord.NotFound:
+                # 그사이 지워진 메시지가 섞여 있으면 하나씩 다시 시도
+                old.extend(recent)
+        for message in old:
+            try:
+                await with_retries(message.delete)
+                self.single_deletes += 1
+                self.deleted += 1
+                record_audit(self.guild_id, "censor", user_id=message.author.id, detail="지난 메시지 검사")
+            except discord.NotFound:
+                pass
+            except discord.HTTPException:
+                self.failed += 1
+
+
+def get_scan_cursor(guild_id, channel_id):
+    """채널의 저장된 검사 진행 위치를 반환합니다. 없으면 None입니다."""
+    return load_config().get(str(guild_id), {}).get('history_scans', {}).get(str(channel_id))
+
+async def save_scan_cursor(scan):
+    async with guild_lock(scan.guild_id, 'history_scans'):
+        config = load_config()
+        scans = config.setdefault(scan.guild_id, {}).setdefault('history_scans', {})
+        scans[str(scan.channel.id)] = {
+            "before": scan.before,
+            "until": scan.until.timestamp(),
+            "scanned": scan.scanned,
+            "deleted": scan.deleted,
+        }
+        save_config(config, scan.guild_id)
+
+async def clear_scan_cursor(guild_id, channel_id):
+    guild_id = str(guild_id)
+    async with guild_lock(guild_id, 'history_scans'):
+        config = load_config()
+        scans = config.get(guild_id, {}).get('history_scans', {})
+        if scans.pop(str(channel_id), None) is not None:
+            if not scans:
+                del config[guild_id]['history_scans']
+            save_config(config, guild_id)
+
+def resume_or_start(channel, days, restart=False):
+    """저장된 진행 위치가 있으면 이어서, 없거나 restart면 days일 전까지 새로 검사하는 HistoryScan을 만듭니다."""
+    cursor = None if restart else get_scan_cursor(channel.guild.id, channel.id)
+    if cursor:
+        until = datetime.datetime.fromtimestamp(cursor["until"], tz=datetime.timezone.utc)
+        return HistoryScan(channel, until, cursor.get("before"), cursor.get("scanned", 0), cursor.get("deleted", 0))
+    return HistoryScan(channel, discord.utils.utcnow() - datetime.timedelta(days=days))
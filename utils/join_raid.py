@@ -0,0 +1,59 @@
+from collections import deque
+
+# raid_protection 설정의 기본값
+DEFAULT_RAID_THRESHOLD = 10       # 이 인원 이상이
+DEFAULT_RAID_WINDOW_SECONDS = 10  # 이 시간(초) 안에 들어오면 레이드로 봄
+RAID_ACTIONS = ("none", "timeout", "kick", "ban")
+
+
+def get_raid_settings(server_config):
+    """서버 설정에서 레이드 감지 설정을 기본값을 채워 반환합니다."""
+    raid_config = server_config.get('raid_protection', {})
+    return {
+        "enabled": raid_config.get('enabled', False),
+        "threshold": max(2, raid_config.get('threshold', DEFAULT_RAID_THRESHOLD)),
+        "window_seconds": max(1, raid_config.get('window_seconds', DEFAULT_RAID_WINDOW_SECONDS)),
+        "action": raid_config.get('action', "none"),
+        "timeout_duration_minutes": raid_config.get('timeout_duration_minutes', 60),
+    }
+
+
+class JoinRateTracker:
+    """서버별 최근 입장 시각을 슬라이딩 윈도우로 세어 레이드(입장 급증) 여부를 판단합니다.
+
+    서버마다 최근 threshold개의 입장 시각만 보관하므로, 가장 오래된 시각이 윈도우 안에 있으면 임계값을 넘은 것입니다.
+    레이드로 판단되면 입장이 잦아들어 한 윈도우 동안 임계값 아래로 내려갈 때까지 레이드 상태를 유지합니다.
+    """
+
+    def __init__(self):
+        self._joins = {}       # {guild_id: deque[입장 시각]}
+        self._raid_until = {}  # {guild_id: 레이드 상태가 끝나는 시각}
+
+    def record(self, guild_id, now, threshold, window):
+        """입장을 기록하고, 이 입장이 레이드 중에 일어났으면 True를 반환합니다."""
+        joins = self._joins.get(guild_id)
+        if joins is None or joins.maxlen != threshold:
+            joins = self._joins[guild_id] = deque(joins or (), maxlen=threshold)
+        joins.append(now)
+
+        if len(joins) == threshold and joins[0] > now - window:
+            self._raid_until[guild_id] = now + window
+        return self.in_raid(guild_id, now)
+
+    def in_raid(self, guild_id, now):
+        """서버가 지금 레이드 상태인지 반환합니다."""
+        raid_until = self._raid_until.get(guild_id)
+        if raid_until is None:
+            return False
+        if raid_until <= now:
+            del self._raid_until[guild_id]
+            return False
+        return True
+
+    def reset(self, guild_id):
+        """서버의 입장 기록과 레이드 상태를 지웁니다. 설정을 바꿨을 때 호출합니다."""
+        self._joins.pop(guild_id, None)
+        self._raid_until.pop(guild_id, None)
+
+
+join_rate_tracker = JoinRateTracker()
@@ -0,0 +1,95 @@
+from collections import deque
+from .config_manager import load_config, add_settings_listener
+from .text_normalizer import normalize_text
+
+
+class KeywordMatcher:
+    """여러 검열 키워드를 메시지 한 번 순회로 모두 찾는 Aho-Corasick 오토마톤입니다.
+
+    키워드는 normalize_text로 정규화한 형태로 등록되므로 띄어쓰기, 전각 문자, 풀어 쓴 자모 등으로 우회한 메시지도 찾습니다.
+    """
+
+    def __init__(self, keywords, fold_homoglyphs=True):
+        self.fold_homoglyphs = fold_homoglyphs
+        self.keywords = []  # 원래 키워드 (로그 표시용)
+        patterns = []       # 정규화된 키워드 (오토마톤에 등록)
+        for keyword in keywords:
+            pattern = normalize_text(keyword, fold_homoglyphs)[0]
+            if pattern and pattern not in patterns:
+                self.keywords.append(keyword)
+                patterns.append(pattern)
+        self._lengths = [len(pattern) for pattern in patterns]
+
+        self._goto = [{}]    # 상태별 전이 {문자: 다음 상태}
+        self._fail = [0]     # 실패 링크
+        self._output = [()]  # 상태에 도달했을 때 끝나는 키워드 번호들
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (index,)
+
+        # BFS로 실패 링크를 만들고, 실패 링크 쪽의 출력도 미리 합쳐 둠
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def __bool__(self):
+        return bool(self.keywords)
+
+    def find_all(self, text):
+        """이미 정규화된 text에서 (시작 위치, 끝 위치, 키워드) 목록을 반환합니다. 겹치는 일치도 모두 포함합니다."""
+        goto, fail, output, keywords, lengths = self._goto, self._fail, self._output, self.keywords, self._lengths
+        matches = []
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in output[state]:
+                matches.append((position + 1 - lengths[index], position + 1, keywords[index]))
+        return matches
+
+    def scan(self, text, normalized=None):
+        """원문을 한 번 정규화한 뒤 검색하고, 일치 위치를 원문 기준 (시작, 끝, 키워드)로 돌려줍니다.
+
+        normalized에 normalize_text(text, self.fold_homoglyphs)의 결과를 주면 다시 정규화하지 않습니다.
+        """
+        normalized, starts, ends = normalized or normalize_text(text, self.fold_homoglyphs)
+        return [(starts[start], ends[end - 1], keyword) for start, end, keyword in self.find_all(normalized)]
+
+
+# 서버별로 컴파일된 오토마톤 캐시 (키워드가 추가/삭제될 때만 다시 만듦)
+_matchers = {}
+
+def get_keyword_matcher(guild_id):
+    """서버의 검열 키워드로 만든 KeywordMatcher를 반환합니다."""
+    guild_id = str(guild_id)
+    matcher = _matchers.get(guild_id)
+    if matcher is None:
+        server_config = load_config().get(guild_id, {})
+        keywords = server_config.get("censored_keywords", [])
+        matcher = _matchers[guild_id] = KeywordMatcher(keywords, server_config.get("fold_homoglyphs", True))
+    return matcher
+
+def invalidate_keyword_matcher(guild_id):
+    """키워드 목록이나 정규화 옵션이 바뀌었을 때 호출하여 다음 메시지에서 오토마톤을 다시 만들도록 합니다."""
+    _matchers.pop(str(guild_id), None)
+
+# 다른 프로세스(샤드)에서 설정이 바뀌어도 다시 만들도록 등록
+add_settings_listener(invalidate_keyword_matcher)
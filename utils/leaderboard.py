@@ -0,0 +1,36 @@
+import heapq
+
+LEADERBOARD_SIZE = 10
+
+
+class Leaderboard:
+    """점수가 늘어나기만 하는 항목(누적 체류 시간 등)의 상위 N명을 증분으로 유지합니다.
+
+    점수가 줄어들지 않으므로, 상위권 밖의 사용자는 자신의 점수가 갱신될 때만 순위에 들어올 수 있습니다.
+    """
+
+    def __init__(self, size=LEADERBOARD_SIZE):
+        self.size = size
+        self._entries = []  # [(user_id, 점수)] 점수 내림차순
+
+    @classmethod
+    def from_totals(cls, totals, size=LEADERBOARD_SIZE):
+        """{user_id: 점수} 전체에서 상위 N명으로 순위표를 만듭니다."""
+        leaderboard = cls(size)
+        leaderboard._entries = heapq.nlargest(size, totals.items(), key=lambda item: item[1])
+        return leaderboard
+
+    def update(self, user_id, score):
+        """사용자의 점수가 score로 늘어났음을 반영합니다."""
+        entries = self._entries
+        if len(entries) >= self.size and score <= entries[-1][1] and all(uid != user_id for uid, _ in entries):
+            return
+
+        entries = [entry for entry in entries if entry[0] != user_id]
+        entries.append((user_id, score))
+        entries.sort(key=lambda item: item[1], reverse=True)
+        self._entries = entries[:self.size]
+
+    def top(self):
+        """[(user_id, 점수)]를 점수 내림차순으로 반환합니다."""
+        return list(self._entries)
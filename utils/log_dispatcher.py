@@ -0,0 +1,112 @@
+import asyncio
+from collections import deque
+import discord
+
+LOG_BATCH_WINDOW = 1.5       # 첫 로그가 들어온 뒤 함께 묶을 로그를 기다리는 시간(초)
+MAX_EMBEDS_PER_MESSAGE = 10  # Discord 메시지 하나에 넣을 수 있는 임베드 수
+MAX_EMBED_CHARS = 6000       # Discord 메시지 하나의 임베드 전체 글자 수 제한
+MAX_QUEUE_SIZE = 200         # 채널별로 대기할 수 있는 최대 로그 수
+
+
+class LogDispatcher:
+    """로그 채널별 큐에 임베드를 모았다가 짧은 시간 안에 들어온 로그를 한 메시지(최대 10개)로 묶어 보냅니다.
+
+    큐가 가득 차면 새 로그는 버리고, 버린 개수를 다음 메시지에 요약해서 알립니다.
+    """
+
+    def __init__(self, window=LOG_BATCH_WINDOW, max_queue_size=MAX_QUEUE_SIZE):
+        self.window = window
+        self.max_queue_size = max_queue_size
+        self._queues = {}    # {channel_id: deque[Embed]}
+        self._channels = {}  # {channel_id: 채널}
+        self._workers = {}   # {channel_id: asyncio.Task}
+        self._dropped = {}   # {channel_id: 버린 로그 수}
+
+    def send(self, channel, embed=None, content=None):
+        """로그를 채널 큐에 넣고 바로 반환합니다. channel이 None이면 아무것도 하지 않습니다."""
+        if channel is None:
+            return
+        if embed is None:
+            embed = discord.Embed(description=content, color=discord.Color.light_grey())
+
+        queue = self._queues.get(channel.id)
+        if queue is None:
+            queue = self._queues[channel.id] = deque()
+        self._channels[channel.id] = channel
+
+        if len(queue) >= self.max_queue_size:
+            self._dropped[channel.id] = self._dropped.get(channel.id, 0) + 1
+        else:
+            queue.append(embed)
+
+        if channel.id not in self._workers:
+            self._workers[channel.id] = asyncio.create_task(self._run(channel.id))
+
+    def pending(self, channel_id):
+        """채널에 전송 대기 중인 로그 수를 반환합니다."""
+        return len(self._queues.get(channel_id, ())) + self._dropped.get(channel_id, 0)
+
+    def _take_batch(self, channel_id):
+        """큐에서 한 메시지에 담을 수 있는 만큼 임베드를 꺼냅니다."""
+        queue = self._queues[channel_id]
+        embeds, total_chars = [], 0
+
+        dropped = self._dropped.pop(channel_id, 0)
+        if dropped:
+            summary = discord.Embed(description=f"⚠️ 로그가 너무 많아 {dropped}건을 생략했습니다.", color=discord.Color.dark_grey())
+            embeds.append(summary)
+            total_chars += len(summary)
+
+        while queue and len(embeds) < MAX_EMBEDS_PER_MESSAGE:
+            # 글자 수 제한을 넘기는 임베드는 다음 메시지로 미룸
+            if embeds and total_chars + len(queue[0]) > MAX_EMBED_CHARS:
+                break
+            embed = queue.popleft()
+            embeds.append(embed)
+            total_chars += len(embed)
+        return embeds
+
+    async def _send_batch(self, channel_id):
+        embeds = self._take_batch(channel_id)
+        if not embeds:
+            return
+        channel = self._channels[channel_id]
+        try:
+            # 레이트 리밋에 걸리면 discord.py가 기다리므로, 그동안 들어온 로그는 다음 묶음으로 합쳐짐
+            await channel.send(embeds=embeds)
+        except discord.HTTPException as e:
+            if e.status != 400 or len(embeds) == 1:
+                print(f"로그 채널({channel_id}) 전송 실패: {e}")
+                return
+            # 형식이 잘못된 임베드 하나 때문에 묶음 전체가 버려지지 않도록 하나씩 다시 보냄
+            for embed in embeds:
+                try:
+                    await channel.send(embed=embed)
+                except discord.HTTPException as e:
+                    print(f"로그 채널({channel_id}) 전송 실패: {e}")
+
+    async def _run(self, channel_id):
+        try:
+            while self.pending(channel_id):
+                await asyncio.sleep(self.window)
+                await self._send_batch(channel_id)
+        finally:
+            self._workers.pop(channel_id, None)
+
+    async def close(self):
+        """대기 중인 로그를 기다리지 않고 모두 전송합니다. 봇 종료 전에 호출합니다."""
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        for channel_id in list(self._queues):
+            while self.pending(channel_id):
+                await self._send_batch(channel_id)
+
+
+log_dispatcher = LogDispatcher()
+
+def send_log(channel, embed=None, content=None):
+    """로그 채널로 임베드나 문구를 보냅니다. 실제 전송은 LogDispatcher가 묶어서 처리합니다."""
+    log_dispatcher.send(channel, embed=embed, content=content)
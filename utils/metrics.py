@@ -0,0 +1,164 @@
+import time
+import bisect
+import functools
+import threading
+from contextlib import nullcontext
+
+# 지연 시간 히스토그램 구간(초). Prometheus 기본 구간을 봇 핸들러 규모에 맞게 줄임
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+_NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    """고정 구간 지연 시간 히스토그램입니다. 값 하나를 기록하는 데 이진 탐색 한 번이면 됩니다."""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """q 분위수가 속한 구간의 상한을 반환합니다. 실제 최댓값보다 크게 보고하지는 않습니다."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(LATENCY_BUCKETS[index], self.max) if index < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+
+class Metrics:
+    """이벤트 핸들러와 저장소 작업의 지연 시간 히스토그램과 카운터를 모읍니다.
+
+    꺼져 있으면 timer()는 미리 만든 빈 컨텍스트 매니저를, @timed는 원래 함수 호출만 하므로 비용이 거의 없습니다.
+    쓰기 전용 스레드에서도 기록하므로 갱신은 잠금 안에서 합니다.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started_at = time.time()
+        self.histograms = {}  # {이름: Histogram}
+        self.counters = {}    # {이름: 값}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def timer(self, name):
+        """with 블록의 실행 시간을 name 히스토그램에 기록하는 컨텍스트 매니저를 반환합니다."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def snapshot(self):
+        """[(이름, 횟수, 평균, p50, p99, 최댓값)]을 이름순으로 반환합니다. 시간 단위는 초입니다."""
+        with self._lock:
+            return [
+                (name, h.count, h.total / h.count if h.count else 0.0, h.quantile(0.5), h.quantile(0.99), h.max)
+                for name, h in sorted(self.histograms.items())
+            ]
+
+    def render_prometheus(self, prefix="mogakco"):
+        """Prometheus 텍스트 형식으로 모든 지표를 반환합니다."""
+        lines = [
+            f"# TYPE {prefix}_latency_seconds histogram",
+        ]
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS + ("+Inf",), h.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{prefix}_latency_seconds_bucket{{name="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_latency_seconds_sum{{name="{name}"}} {h.total}')
+                lines.append(f'{prefix}_latency_seconds_count{{name="{name}"}} {h.count}')
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{prefix}_events_total{{name="{name}"}} {value}')
+        lines.append(f"# TYPE {prefix}_uptime_seconds gauge")
+        lines.append(f"{prefix}_uptime_seconds {time.time() - self.started_at}")
+        return "\n".join(lines) + "\n"
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+# 켜고 끄기는 .env 로드 이후 METRICS_ENABLED 값으로 정함 (bot_new.py 참고)
+metrics = Metrics()
+
+def timed(name):
+    """코루틴 함수의 실행 시간을 name 히스토그램에 기록하는 데코레이터입니다. 함수 이름은 그대로 유지됩니다."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return await func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                metrics.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+_server_runner = None
+
+async def start_metrics_server(port, host="127.0.0.1"):
+    """Prometheus가 수집할 수 있도록 http://host:port/metrics 를 엽니다. 기본으로 로컬에서만 접근할 수 있습니다."""
+    global _server_runner
+    from aiohttp import web  # discord.py가 이미 의존하는 패키지
+
+    async def handle_metrics(request):
+        return web.Response(text=metrics.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    _server_runner = runner
+
+async def stop_metrics_server():
+    """start_metrics_server()로 연 서버를 닫습니다. 열려 있지 않으면 아무것도 하지 않습니다."""
+    global _server_runner
+    if _server_runner is not None:
+        await _server_runner.cleanup()
+        _server_runner = None
@@ -0,0 +1,113 @@
+import time
+import asyncio
+from collections import deque
+import aiohttp
+import discord
+from .metrics import metrics
+
+MODERATION_WORKERS = 4        # 동시에 처리하는 서버 수
+MAX_PENDING_PER_GUILD = 500   # 서버별로 대기할 수 있는 최대 작업 수
+JOBS_PER_TURN = 10            # 한 서버를 연속으로 처리하는 작업 수 (다른 서버가 오래 기다리지 않도록)
+MAX_ATTEMPTS = 3              # 일시적인 오류일 때 API 호출을 시도하는 최대 횟수
+RETRY_BASE_DELAY = 1.0        # 재시도 전 대기 시간(초). 시도할 때마다 두 배로 늘어남
+CLOSE_TIMEOUT = 10.0          # 종료할 때 남은 작업을 기다리는 최대 시간(초)
+
+# 다시 시도하면 성공할 수 있는 오류 (Discord 서버 오류, 연결 끊김, 시간 초과)
+RETRYABLE_ERRORS = (discord.DiscordServerError, aiohttp.ClientError, asyncio.TimeoutError)
+
+
+async def with_retries(func, *args, **kwargs):
+    """func(*args, **kwargs)를 실행하고, 일시적인 오류면 잠시 기다렸다가 다시 시도합니다.
+
+    권한 부족(Forbidden)이나 대상 없음(NotFound)처럼 다시 해도 같은 결과인 오류는 바로 전달합니다.
+    레이트 리밋(429)은 discord.py가 직접 기다리므로 여기서 다루지 않습니다.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return await func(*args, **kwargs)
+        except RETRYABLE_ERRORS:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            metrics.increment("moderation.retries")
+            await asyncio.sleep(RETRY_BASE_DELAY * 2 ** attempt)
+
+
+class ModerationQueue:
+    """검열 판정(메시지 삭제, 로그, 경고, 처벌)을 서버별 큐에 넣고 정해진 수의 작업자가 처리합니다.
+
+    한 서버의 작업은 한 번에 한 작업자만 맡으므로 들어온 순서대로 실행되고, 서로 다른 서버는 동시에 처리됩니다.
+    이벤트 핸들러는 submit()으로 작업을 넣고 바로 반환하므로 Discord API가 느려도 메시지 처리 지연이 늘지 않습니다.
+    """
+
+    def __init__(self, workers=MODERATION_WORKERS, max_pending=MAX_PENDING_PER_GUILD):
+        self.worker_count = workers
+        self.max_pending = max_pending
+        self._queues = {}    # {guild_id: deque[(넣은 시각, 코루틴 함수, 인자)]} 작업이 남은 서버만 있음
+        self._ready = asyncio.Queue()  # 처리할 차례를 기다리는 서버 ID (서버마다 최대 하나)
+        self._workers = []
+
+    def submit(self, guild_id, handler, *args):
+        """handler(*args) 작업을 서버 큐 끝에 넣고 바로 반환합니다. 큐가 가득 차면 False를 반환합니다."""
+        queue = self._queues.get(guild_id)
+        if queue is None:
+            queue = self._queues[guild_id] = deque()
+            self._ready.put_nowait(guild_id)
+            self._ensure_workers()
+        elif len(queue) >= self.max_pending:
+            metrics.increment("moderation.dropped")
+            return False
+        queue.append((time.perf_counter(), handler, args))
+        return True
+
+    def pending(self, guild_id=None):
+        """대기 중인 작업 수를 반환합니다. guild_id를 주지 않으면 전체 작업 수입니다."""
+        if guild_id is not None:
+            return len(self._queues.get(guild_id, ()))
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _ensure_workers(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._run()) for _ in range(self.worker_count)]
+
+    async def _run(self):
+        while True:
+            guild_id = await self._ready.get()
+            try:
+                queue = self._queues[guild_id]
+                for _ in range(JOBS_PER_TURN):
+                    if not queue:
+                        break
+                    submitted_at, handler, args = queue.popleft()
+                    metrics.observe("moderation.queue_delay", time.perf_counter() - submitted_at)
+                    try:
+                        with metrics.timer("moderation.job"):
+                            await handler(*args)
+                    except Exception as e:
+                        metrics.increment("moderation.failed")
+                        print(f"검열 작업 처리 중 오류 (서버 {guild_id}): {e}")
+
+                # 남은 작업이 있으면 다른 서버 뒤로 다시 줄을 섬
+                if queue:
+                    self._ready.put_nowait(guild_id)
+                else:
+                    del self._queues[guild_id]
+            finally:
+                self._ready.task_done()
+
+    async def close(self, timeout=CLOSE_TIMEOUT):
+        """남은 작업을 최대 timeout초 동안 처리한 뒤 작업자를 멈춥니다. 봇 종료 전에 호출합니다."""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._ready.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"종료 시간이 지나 검열 작업 {self.pending()}건을 처리하지 못했습니다.")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queues.clear()
+        self._ready = asyncio.Queue()
+
+
+moderation_queue = ModerationQueue()
@@ -0,0 +1,132 @@
+import re
+import asyncio
+import regex
+from concurrent.futures import ThreadPoolExecutor
+from .config_manager import load_config, add_settings_listener
+
+RULE_TYPES = {"wildcard": "와일드카드", "regex": "정규식"}
+MAX_PATTERN_LENGTH = 200
+MATCH_TIMEOUT = 0.5  # 한 메시지의 패턴 검사 제한 시간(초)
+
+# 패턴 검사는 GIL을 놓고 실행되는 regex 모듈로 전용 스레드에서 돌리고, 제한 시간을 넘기면 regex가 검사를 중단함
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pattern-rules")
+
+# 백트래킹 폭발을 일으키는 대표적인 구조: (a+)+, (a*)* 같은 반복 안의 반복
+# (a|aa)+ 같은 경우는 잡지 못하므로 추가할 때 미리 거르는 용도이며, 실제 상한은 MATCH_TIMEOUT
+_NESTED_QUANTIFIER = re.compile(r"\((?:[^()\\]|\\.)*(?:[+*]|\{\d*,\d*\})(?:[^()\\]|\\.)*\)\s*(?:[+*]|\{\d*,?\d*\})")
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P[<=]")
+# (?i)처럼 패턴 전체에 적용되는 플래그 (여러 규칙을 하나로 합치면 다른 규칙에도 적용되거나 오류가 남)
+_GLOBAL_FLAGS = re.compile(r"(?<!\\)\(\?[aiLmsux]+\)")
+
+
+def wildcard_to_regex(pattern):
+    """와일드카드 패턴(* = 아무 글자들, ? = 한 글자)을 정규식으로 바꿉니다."""
+    pattern = re.sub(r"\*+", "*", pattern)
+    return "".join(".*?" if ch == "*" else "." if ch == "?" else re.escape(ch) for ch in pattern)
+
+
+def compile_rule(rule_type, pattern):
+    """규칙을 검사하고 정규식 문자열을 반환합니다. 위험하거나 잘못된 패턴이면 ValueError를 발생시킵니다."""
+    if rule_type not in RULE_TYPES:
+        raise ValueError(f"알 수 없는 규칙 종류입니다: {rule_type}")
+    if not pattern or len(pattern) > MAX_PATTERN_LENGTH:
+        raise ValueError(f"패턴은 1~{MAX_PATTERN_LENGTH}자로 입력해주세요.")
+
+    if rule_type == "wildcard":
+        source = wildcard_to_regex(pattern)
+    else:
+        source = pattern
+        if _BACKREFERENCE.search(source):
+            raise ValueError("역참조와 이름 있는 그룹은 사용할 수 없습니다.")
+        if _NESTED_QUANTIFIER.search(source):
+            raise ValueError("반복 안에 반복이 들어간 패턴은 검사 시간이 폭발할 수 있어 사용할 수 없습니다.")
+        if _GLOBAL_FLAGS.search(source):
+            raise ValueError("(?i) 같은 전체 플래그는 사용할 수 없습니다. 필요하면 (?i:...)처럼 범위를 지정해주세요.")
+
+    try:
+        # 합쳐질 때와 같은 형태로 컴파일해 봄
+        regex.compile(f"(?P<r0>{source})", regex.VERSION0)
+        re.compile(f"(?P<r0>{source})")
+    except (regex.error, re.error) as e:
+        raise ValueError(f"패턴 형식 오류: {e}")
+    return source
+
+
+class PatternRuleSet:
+    """서버의 모든 패턴 규칙을 이름 있는 그룹의 단일 정규식으로 합친 것입니다."""
+
+    def __init__(self, rules):
+        self.rules = []
+        sources = []
+        for rule in rules:
+            try:
+                source = compile_rule(rule.get("type"), rule.get("pattern"))
+            except ValueError:
+                continue
+            sources.append(f"(?P<r{len(self.rules)}>{source})")
+            self.rules.append(rule)
+        self._regex = regex.compile("|".join(sources), regex.IGNORECASE | regex.VERSION0) if sources else None
+        self.disabled = False
+
+    def __bool__(self):
+        return self._regex is not None and not self.disabled
+
+    def find_all(self, text):
+        """(시작 위치, 끝 위치, 규칙) 목록을 반환합니다. 검사가 MATCH_TIMEOUT을 넘기면 TimeoutError를 발생시킵니다."""
+        return [
+            (match.start(), match.end(), self.rules[int(match.lastgroup[1:])])
+            for match in self._regex.finditer(text, concurrent=True, timeout=MATCH_TIMEOUT)
+            if match.end() > match.start()
+        ]
+
+    async def scan(self, text):
+        """전용 스레드에서 검사합니다. 제한 시간을 넘기면 이 규칙 묶음을 비활성화하고 asyncio.TimeoutError를 발생시킵니다."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(_executor, self.find_all, text)
+        except TimeoutError:
+            self.disabled = True
+            raise asyncio.TimeoutError from None
+
+    def _find_many(self, texts):
+        results = []
+        for text in texts:
+            try:
+                results.append(self.find_all(text))
+            except TimeoutError:
+                self.disabled = True
+                break
+        return results
+
+    async def scan_many(self, texts):
+        """여러 메시지를 전용 스레드에서 한 번에 검사하고 메시지별 find_all() 결과 목록을 반환합니다.
+
+        한 메시지라도 제한 시간을 넘기면 이 규칙 묶음을 비활성화하고 그 전까지 검사한 메시지의 결과만 반환합니다.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, self._find_many, list(texts))
+
+
+def describe_rule(rule):
+    """규칙을 목록 표시용 문자열로 바꿉니다."""
+    return f"[{RULE_TYPES.get(rule.get('type'), rule.get('type'))}] {rule.get('pattern')}"
+
+
+# 서버별로 컴파일된 규칙 캐시 (규칙이 추가/삭제될 때만 다시 만듦)
+_rule_sets = {}
+
+def get_pattern_rules(guild_id):
+    """서버의 패턴 규칙으로 만든 PatternRuleSet을 반환합니다."""
+    guild_id = str(guild_id)
+    rule_set = _rule_sets.get(guild_id)
+    if rule_set is None:
+        rules = load_config().get(guild_id, {}).get("censored_patterns", [])
+        rule_set = _rule_sets[guild_id] = PatternRuleSet(rules)
+    return rule_set
+
+def invalidate_pattern_rules(guild_id):
+    """패턴 규칙이 바뀌었을 때 호출하여 다음 메시지에서 정규식을 다시 만들도록 합니다."""
+    _rule_sets.pop(str(guild_id), None)
+
+# 다른 프로세스(샤드)에서 설정이 바뀌어도 다시 만들도록 등록
+add_settings_listener(invalidate_pattern_rules)
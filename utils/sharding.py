@@ -0,0 +1,102 @@
+import os
+
+
+def shard_for_guild(guild_id, shard_count):
+    """Discord 규칙에 따라 서버가 속한 샤드 번호를 반환합니다."""
+    return (int(guild_id) >> 22) % shard_count
+
+def parse_shard_ids(value):
+    """'0,1,2' 또는 '0-3' 형식의 샤드 번호 목록을 정렬된 리스트로 바꿉니다."""
+    shard_ids = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            shard_ids.update(range(int(start), int(end) + 1))
+        else:
+            shard_ids.add(int(part))
+    return sorted(shard_ids)
+
+
+class ShardConfig:
+    """이 프로세스가 맡은 샤드 구성입니다.
+
+    shard_count가 None이면 Discord가 권장하는 샤드 수를 한 프로세스에서 모두 실행하고,
+    shard_ids를 주면 전체 shard_count개 중 해당 샤드만 실행합니다(나머지는 다른 프로세스가 맡음).
+    """
+
+    def __init__(self, shard_count=None, shard_ids=None):
+        if shard_ids is not None and shard_count is None:
+            raise ValueError("SHARD_IDS를 쓰려면 SHARD_COUNT도 설정해야 합니다.")
+        if shard_count is not None and shard_count <= 0:
+            raise ValueError("SHARD_COUNT는 1 이상이어야 합니다.")
+        if shard_ids is not None:
+            if not shard_ids:
+                raise ValueError("SHARD_IDS가 비어 있습니다.")
+            out_of_range = [shard_id for shard_id in shard_ids if not 0 <= shard_id < shard_count]
+            if out_of_range:
+                raise ValueError(f"SHARD_IDS의 {out_of_range}번 샤드가 SHARD_COUNT({shard_count}) 범위를 벗어났습니다.")
+        self.shard_count = shard_count
+        self.shard_ids = shard_ids
+        self._owned = frozenset(shard_ids) if shard_ids is not None else None
+
+    @classmethod
+    def from_env(cls):
+        """SHARD_COUNT, SHARD_IDS 환경 변수로 구성을 만듭니다."""
+        shard_count = os.environ.get("SHARD_COUNT")
+        shard_ids = os.environ.get("SHARD_IDS")
+        return cls(
+            int(shard_count) if shard_count else None,
+            parse_shard_ids(shard_ids) if shard_ids else None
+        )
+
+    @property
+    def is_partial(self):
+        """다른 프로세스와 샤드를 나눠 맡고 있으면 True입니다."""
+        return self._owned is not None and len(self._owned) < self.shard_count
+
+    @property
+    def is_primary(self):
+        """0번 샤드를 맡은 프로세스(전역 작업을 대표로 처리)이면 True입니다."""
+        return self._owned is None or 0 in self._owned
+
+    def owns(self, guild_id):
+        """서버가 이 프로세스의 샤드에 속하면 True입니다."""
+        if not self.is_partial:
+            return True
+        return shard_for_guild(guild_id, self.shard_count) in self._owned
+
+    def scoped_path(self, path):
+        """프로세스마다 따로 가져야 하는 파일 경로를 반환합니다. 샤드를 나눠 맡지 않으면 그대로 반환합니다."""
+        if not self.is_partial:
+            return path
+        base, ext = os.path.splitext(path)
+        return f"{base}.shards-{self.shard_ids[0]}-{self.shard_ids[-1]}{ext}"
+
+    def bot_options(self):
+        """AutoShardedBot 생성자에 넘길 인자를 반환합니다."""
+        options = {}
+        if self.shard_count is not None:
+            options["shard_count"] = self.shard_count
+        if self.shard_ids is not None:
+            options["shard_ids"] = self.shard_ids
+        return options
+
+    def describe(self):
+        if self.shard_count is None:
+            return "자동 샤드 수"
+        if self.shard_ids is None:
+            return f"전체 {self.shard_count}개 샤드"
+        return f"{self.shard_count}개 중 {', '.join(map(str, self.shard_ids))}번 샤드"
+
+
+_shard_config = None
+
+def get_shard_config():
+    """환경 변수로 정한 이 프로세스의 ShardConfig를 반환합니다. .env 로드 이후 처음 호출할 때 읽습니다."""
+    global _shard_config
+    if _shard_config is None:
+        _shard_config = ShardConfig.from_env()
+    return _shard_config
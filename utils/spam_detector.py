@@ -0,0 +1,122 @@
+from collections import OrderedDict, deque
+
+# spam_protection 설정의 기본값
+DEFAULT_FLOOD_MESSAGES = 6            # 이 개수를 넘는 메시지를
+DEFAULT_FLOOD_WINDOW_SECONDS = 5      # 이 시간(초) 안에 보내면 도배
+DEFAULT_DUPLICATE_COUNT = 3           # 거의 같은 메시지를 이 횟수만큼
+DEFAULT_DUPLICATE_WINDOW_SECONDS = 60 # 이 시간(초) 안에 보내면 복사 붙여넣기 도배
+
+SIMHASH_BITS = 64
+SIMHASH_MAX_DISTANCE = 12 # 다른 비트가 이 개수 이하면 거의 같은 메시지로 봄 (관계없는 메시지는 평균 32개가 다름)
+SHINGLE_SIZE = 3          # SimHash를 만들 때 쓰는 글자 묶음 길이
+MIN_DUPLICATE_LENGTH = 8  # 이보다 짧은 메시지(ㅋㅋㅋ 등)는 반복 검사 없이 빈도만 셈
+MAX_SIMHASH_CHARS = 500   # 긴 메시지는 앞부분만 비교하여 검사 비용을 제한
+RECENT_MESSAGES = 10      # 사용자별로 비교하는 최근 메시지 수
+MAX_TRACKED_USERS = 20000 # 기억하는 (서버, 사용자) 수. 넘으면 가장 오래 조용했던 사용자부터 잊음
+
+
+def get_spam_settings(server_config):
+    """서버 설정에서 도배 감지 설정을 기본값을 채워 반환합니다."""
+    spam_config = server_config.get('spam_protection', {})
+    return {
+        "enabled": spam_config.get('enabled', False),
+        "flood_messages": max(2, spam_config.get('flood_messages', DEFAULT_FLOOD_MESSAGES)),
+        "flood_window_seconds": max(1, spam_config.get('flood_window_seconds', DEFAULT_FLOOD_WINDOW_SECONDS)),
+        "duplicate_count": max(2, spam_config.get('duplicate_count', DEFAULT_DUPLICATE_COUNT)),
+        "duplicate_window_seconds": max(1, spam_config.get('duplicate_window_seconds', DEFAULT_DUPLICATE_WINDOW_SECONDS)),
+    }
+
+
+def simhash(normalized):
+    """normalize_text로 정규화한 문자열의 글자 묶음(shingle)으로 64비트 SimHash를 만듭니다. 비슷한 문자열은 다른 비트 수가 적습니다.
+
+    hash()는 프로세스마다 값이 달라지므로 결과를 저장하거나 다른 프로세스와 비교하지 마세요.
+    """
+    normalized = normalized[:MAX_SIMHASH_CHARS]
+    if len(normalized) <= SHINGLE_SIZE:
+        shingles = [normalized]
+    else:
+        shingles = [normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)]
+
+    # 각 비트 자리에서 1이 과반인 자리만 1로 둠 (비트 문자열을 열 단위로 세어 파이썬 반복을 줄임)
+    mask = (1 << SIMHASH_BITS) - 1
+    bit_strings = [format(hash(shingle) & mask, f'0{SIMHASH_BITS}b') for shingle in shingles]
+    half = len(bit_strings) / 2
+    fingerprint = 0
+    for column in zip(*bit_strings):
+        fingerprint = fingerprint << 1 | (column.count('1') > half)
+    return fingerprint
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class UserActivity:
+    """한 사용자의 최근 메시지 시각과 SimHash 값입니다."""
+
+    __slots__ = ('times', 'fingerprints')
+
+    def __init__(self, flood_messages):
+        self.times = deque(maxlen=flood_messages + 1)   # 최근 메시지 시각
+        self.fingerprints = deque(maxlen=RECENT_MESSAGES)  # [(시각, SimHash)]
+
+
+class SpamDetector:
+    """서버·사용자별로 메시지 빈도(슬라이딩 윈도우)와 거의 같은 메시지 반복(SimHash)을 감지합니다.
+
+    사용자별 상태는 최근 몇 개의 시각과 해시만 보관하고, 추적하는 사용자가 max_users를 넘으면
+    가장 오래 메시지를 보내지 않은 사용자부터 지우므로 메모리 사용량이 일정하게 유지됩니다.
+    """
+
+    def __init__(self, max_users=MAX_TRACKED_USERS):
+        self.max_users = max_users
+        self._users = OrderedDict()  # {(guild_id, user_id): UserActivity} 최근에 메시지를 보낸 순서
+
+    def __len__(self):
+        return len(self._users)
+
+    def _activity(self, key, flood_messages):
+        activity = self._users.get(key)
+        if activity is None or activity.times.maxlen != flood_messages + 1:
+            activity = UserActivity(flood_messages)
+            self._users[key] = activity
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(key)
+        return activity
+
+    def check(self, guild_id, user_id, normalized, now, settings):
+        """메시지를 기록하고 도배면 사유 문구를, 아니면 None을 반환합니다.
+
+        normalized는 normalize_text로 정규화한 메시지 내용, settings는 get_spam_settings()의 결과입니다.
+        """
+        activity = self._activity((guild_id, user_id), settings['flood_messages'])
+
+        times = activity.times
+        times.append(now)
+        if len(times) == times.maxlen and times[0] > now - settings['flood_window_seconds']:
+            times.clear()  # 같은 도배로 메시지마다 다시 걸리지 않도록 초기화
+            return f"{settings['flood_window_seconds']}초 안에 메시지 {settings['flood_messages']}개 초과"
+
+        if len(normalized) < MIN_DUPLICATE_LENGTH:
+            return None
+        fingerprint = simhash(normalized)
+        cutoff = now - settings['duplicate_window_seconds']
+        similar = 1 + sum(
+            1 for at, previous in activity.fingerprints
+            if at > cutoff and hamming_distance(fingerprint, previous) <= SIMHASH_MAX_DISTANCE
+        )
+        if similar >= settings['duplicate_count']:
+            activity.fingerprints.clear()
+            return f"{settings['duplicate_window_seconds']}초 안에 같은 메시지 {similar}번 반복"
+        activity.fingerprints.append((now, fingerprint))
+        return None
+
+    def reset(self, guild_id):
+        """서버의 모든 사용자 상태를 지웁니다. 설정을 바꿨을 때 호출합니다."""
+        for key in [key for key in self._users if key[0] == guild_id]:
+            del self._users[key]
+
+
+spam_detector = SpamDetector()
@@ -0,0 +1,42 @@
+import time
+from contextlib import contextmanager
+
+
+class StartupReport:
+    """봇 시작 과정의 단계별 소요 시간(모듈 import, 확장 로드, 게이트웨이 연결 등)을 기록합니다."""
+
+    def __init__(self, started_at=None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.steps = []  # [(단계 이름, 초)]
+        self.finished = False
+
+    def record(self, name, seconds):
+        """단계 시간을 기록합니다. finish() 이후(재연결 등)의 기록은 무시합니다."""
+        if not self.finished:
+            self.steps.append((name, seconds))
+
+    @contextmanager
+    def measure(self, name):
+        """with 블록의 실행 시간을 name 단계로 기록합니다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def elapsed(self):
+        """시작 후 지금까지 걸린 시간(초)을 반환합니다."""
+        return time.perf_counter() - self.started_at
+
+    def finish(self):
+        """기록을 마치고 보고 문자열을 반환합니다."""
+        report = self.format()
+        self.finished = True
+        return report
+
+    def format(self):
+        """단계별 시간을 실행 순서대로 정리한 문자열을 반환합니다."""
+        width = max((len(name) for name, _ in self.steps), default=0)
+        lines = [f"  {name:<{width}}  {seconds * 1000:8.1f}ms" for name, seconds in self.steps]
+        lines.append(f"  {'전체':<{width}}  {self.elapsed() * 1000:8.1f}ms")
+        return "시작 시간 보고:\n" + "\n".join(lines)
@@ -0,0 +1,442 @@
+import os
+import copy
+import json
+import time
+import threading
+import sqlite3
+import datetime
+
+EXPORT_CHUNK_ROWS = 1000  # 내보내기에서 저장소에서 한 번에 읽는 행 수
+
+
+class StorageBatch:
+    """한 번의 저장에서 기록할 변경 사항 묶음입니다. 값이 None이면 해당 항목을 삭제합니다."""
+    def __init__(self):
+        self.settings = {}     # {guild_id: dict | None}
+        self.warnings = {}     # {(guild_id, user_id): [경고 시각] | None}
+        self.voice_times = {}  # {(guild_id, user_id): float}
+        self.voice_daily = {}  # {(guild_id, user_id, 날짜 번호): float}
+
+    def __bool__(self):
+        return bool(self.settings or self.warnings or self.voice_times or self.voice_daily)
+
+
+class StorageBackend:
+    """설정, 경고 횟수, 음성 채널 체류 시간을 보관하는 저장소의 공통 인터페이스입니다."""
+
+    def load(self):
+        """(settings, warnings, voice_times) 튜플을 반환합니다.
+
+        settings는 {guild_id: dict}, warnings는 {guild_id: {user_id: [경고 시각]}},
+        voice_times는 {guild_id: {user_id: 초}} 형태입니다.
+        """
+        raise NotImplementedError
+
+    def load_voice_daily(self, since_day):
+        """since_day 이후의 일별 체류 시간을 {guild_id: {user_id: {날짜 번호: 초}}} 형태로 반환합니다."""
+        raise NotImplementedError
+
+    def write_batch(self, batch: StorageBatch):
+        """변경 사항 묶음을 저장소에 반영합니다. 쓰기 전용 스레드에서 호출되며, 실패 시 예외를 그대로 올립니다."""
+        raise NotImplementedError
+
+    def export_rows(self, kind, guild_id=None, user_id=None, start=None, end=None):
+        """kind('voice_totals', 'voice_daily', 'warnings')의 행을 하나씩 내보냅니다.
+
+        guild_id, user_id를 주면 해당 서버/사용자만, start와 end(datetime.date, 포함)를 주면 그 기간의 기록만 내보냅니다.
+        누적 체류 시간(voice_totals)은 날짜가 없으므로 기간을 적용하지 않습니다. 쓰기 스레드와 다른 스레드에서 호출해도 안전하며, load() 이후에 호출해야 합니다.
+        """
+        raise NotImplementedError
+
+    # 여러 프로세스가 함께 쓸 수 있는 저장소인지 여부
+    shared = False
+
+    def changed_settings(self):
+        """마지막 확인 이후 다른 프로세스가 저장한 서버 설정을 {guild_id: dict}로 반환합니다."""
+        return {}
+
+    def close(self):
+        """저장소 연결을 정리합니다."""
+
+
+class JsonBackend(StorageBackend):
+    """기존 config.json 한 파일에 모든 데이터를 저장하는 백엔드입니다."""
+
+    # 서버 항목 안에 설정과 함께 저장되지만 설정은 아닌 키
+    DATA_KEYS = ('warning_times', 'voice_time_tracking', 'voice_daily')
+
+    def __init__(self, path, read_only=False):
+        self.path = path
+        self.read_only = read_only  # True면 읽기만 하고 파일을 고치지 않음 (다른 저장소로 옮길 때)
+        self._document = {}
+        self._lock = threading.Lock()  # 쓰기 스레드가 문서를 고치는 동안 내보내기가 복사하지 않도록 함
+
+    def load(self):
+        document = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                try:
+                    document = json.load(f)
+                except json.JSONDecodeError:
+                    document = {}
+        self._document = document
+
+        # 경고 시각 없이 횟수만 저장하던 이전 형식은 처음 읽을 때 한 번만 지금 받은 경고로 바꿔 저장
+        # (읽을 때마다 바꾸면 재시작할 때마다 경고 시각이 새로 찍혀 만료되지 않음)
+        migrated_at = time.time()
+        migrated = False
+        for guild_data in document.values():
+            legacy_counts = guild_data.pop('warning_counts', None)
+            if legacy_counts is None:
+                continue
+            warning_times = guild_data.setdefault('warning_times', {})
+            for user_id, count in legacy_counts.items():
+                warning_times.setdefault(user_id, [migrated_at] * count)
+            migrated = True
+        if migrated and not self.read_only:
+            self._save()
+
+        settings, warnings, voice_times = {}, {}, {}
+        for guild_id, guild_data in document.items():
+            guild_settings = {key: value for key, value in guild_data.items() if key not in self.DATA_KEYS}
+            guild_warnings = dict(guild_data.get('warning_times', {}))
+            guild_voice = guild_data.get('voice_time_tracking')
+            settings[guild_id] = guild_settings
+            if guild_warnings:
+                warnings[guild_id] = guild_warnings
+            if guild_voice:
+                voice_times[guild_id] = dict(guild_voice)
+        return settings, warnings, voice_times
+
+    def load_voice_daily(self, since_day):
+        voice_daily = {}
+        for guild_id, guild_data in self._document.items():
+            for user_id, days in guild_data.get('voice_daily', {}).items():
+                recent = {int(day): seconds for day, seconds in days.items() if int(day) >= since_day}
+                if recent:
+                    voice_daily.setdefault(guild_id, {})[user_id] = recent
+        return voice_daily
+
+    def write_batch(self, batch):
+        with self._lock:
+            self._apply_batch(batch)
+        self._save()
+
+    def _apply_batch(self, batch):
+        for guild_id, guild_settings in batch.settings.items():
+            guild_data = self._document.get(guild_id, {})
+            kept = {key: guild_data[key] for key in self.DATA_KEYS if key in guild_data}
+            if guild_settings is None and not kept:
+                self._document.pop(guild_id, None)
+            else:
+                self._document[guild_id] = {**(guild_settings or {}), **kept}
+
+        for (guild_id, user_id), times in batch.warnings.items():
+            warning_times = self._document.setdefault(guild_id, {}).setdefault('warning_times', {})
+            if times is None:
+                warning_times.pop(user_id, None)
+            else:
+                warning_times[user_id] = times
+
+        for (guild_id, user_id), seconds in batch.voice_times.items():
+            self._document.setdefault(guild_id, {}).setdefault('voice_time_tracking', {})[user_id] = seconds
+
+        for (guild_id, user_id, day), seconds in batch.voice_daily.items():
+            self._document.setdefault(guild_id, {}).setdefault('voice_daily', {}).setdefault(user_id, {})[str(day)] = seconds
+
+    def _save(self):
+        # 임시 파일에 먼저 쓰고 교체하여, 기록 중 종료되어도 config.json이 잘리지 않도록 함
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._document, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def _snapshot(self, guild_id, key, user_id=None):
+        """서버 하나의 key 데이터({user_id: 값})를 복사해 반환합니다. 쓰기 스레드가 문서를 고치는 중에도 안전합니다."""
+        with self._lock:
+            users = self._document.get(guild_id, {}).get(key, {})
+            if user_id is not None:
+                users = {user_id: users[user_id]} if user_id in users else {}
+            return copy.deepcopy(users)
+
+    def export_rows(self, kind, guild_id=None, user_id=None, start=None, end=None):
+        # 이미 읽어 둔 문서에서 서버 하나씩 복사해 내보내므로 한 번에 복사하는 양은 한 서버의 데이터로 제한됨
+        key = {'voice_totals': 'voice_time_tracking', 'voice_daily': 'voice_daily', 'warnings': 'warning_times'}.get(kind)
+        if key is None:
+            raise ValueError(f"알 수 없는 내보내기 종류입니다: {kind}")
+        start_day, end_day, start_at, end_at = _export_range(start, end)
+        with self._lock:
+            guild_ids = [guild_id] if guild_id is not None else list(self._document)
+
+        for current_guild in guild_ids:
+            users = self._snapshot(current_guild, key, user_id)
+            for current_user, value in users.items():
+                if kind == 'voice_totals':
+                    yield current_guild, current_user, round(float(value), 1)
+                elif kind == 'voice_daily':
+                    for day, seconds in sorted((int(day), seconds) for day, seconds in value.items()):
+                        if start_day <= day <= end_day:
+                            yield current_guild, current_user, datetime.date.fromordinal(day).isoformat(), round(seconds, 1)
+                else:
+                    for at in value:
+                        if start_at <= at < end_at:
+                            yield current_guild, current_user, _format_time(at)
+
+
+class SqliteBackend(StorageBackend):
+    """설정, 경고, 음성 기록을 각각의 테이블에 저장하는 SQLite(WAL) 백엔드입니다.
+
+    변경된 항목만 행 단위로 기록하므로 경고 한 번, 퇴장 한 번이 다른 서버의 데이터를 다시 쓰지 않습니다.
+    스키마 변경은 PRAGMA user_version으로 버전을 매겨 MIGRATIONS 순서대로 한 번씩만 적용합니다.
+    """
+
+    shared = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS guild_settings (
+            guild_id TEXT PRIMARY KEY,
+            data     TEXT NOT NULL,
+            revision INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS warnings (
+            guild_id TEXT NOT NULL,
+            user_id  TEXT NOT NULL,
+            count    INTEGER NOT NULL,
+            times    TEXT NOT NULL DEFAULT '[]',
+            PRIMARY KEY (guild_id, user_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS voice_totals (
+            guild_id      TEXT NOT NULL,
+            user_id       TEXT NOT NULL,
+            total_seconds REAL NOT NULL,
+            PRIMARY KEY (guild_id, user_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_voice_totals_rank ON voice_totals (guild_id, total_seconds DESC);
+        CREATE TABLE IF NOT EXISTS voice_daily (
+            guild_id TEXT NOT NULL,
+            user_id  TEXT NOT NULL,
+            day      INTEGER NOT NULL,
+            seconds  REAL NOT NULL,
+            PRIMARY KEY (guild_id, user_id, day)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_voice_daily_day ON voice_daily (guild_id, day);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        for target_version, migration in enumerate(self.MIGRATIONS, start=1):
+            if version < target_version:
+                with self._conn:
+                    migration(self)
+                    self._conn.execute(f"PRAGMA user_version = {target_version}")
+
+    def _add_warning_times(self):
+        """경고 횟수만 있던 warnings 테이블에 경고 시각(times) 열을 추가합니다. 기존 경고는 지금 받은 것으로 봅니다."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(warnings)")}
+        if 'times' not in columns:
+            self._conn.execute("ALTER TABLE warnings ADD COLUMN times TEXT NOT NULL DEFAULT '[]'")
+        migrated_at = time.time()
+        rows = self._conn.execute("SELECT guild_id, user_id, count FROM warnings WHERE times = '[]'").fetchall()
+        for guild_id, user_id, count in rows:
+            self._conn.execute(
+                "UPDATE warnings SET times = ? WHERE guild_id = ? AND user_id = ?",
+                (json.dumps([migrated_at] * count), guild_id, user_id)
+            )
+
+    def _add_settings_revision(self):
+        """다른 프로세스의 설정 변경을 찾을 수 있도록 guild_settings에 변경 순번(revision) 열을 추가합니다."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(guild_settings)")}
+        if 'revision' not in columns:
+            self._conn.execute("ALTER TABLE guild_settings ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_guild_settings_revision ON guild_settings (revision)")
+
+    MIGRATIONS = (_add_warning_times, _add_settings_revision)
+
+    def load(self):
+        settings, warnings, voice_times = {}, {}, {}
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._revision = 0
+        for guild_id, data, revision in self._conn.execute("SELECT guild_id, data, revision FROM guild_settings"):
+            settings[guild_id] = json.loads(data)
+            self._revision = max(self._revision, revision)
+        for guild_id, user_id, times in self._conn.execute("SELECT guild_id, user_id, times FROM warnings"):
+            warnings.setdefault(guild_id, {})[user_id] = json.loads(times)
+        for guild_id, user_id, seconds in self._conn.execute("SELECT guild_id, user_id, total_seconds FROM voice_totals"):
+            voice_times.setdefault(guild_id, {})[user_id] = seconds
+        return settings, warnings, voice_times
+
+    def load_voice_daily(self, since_day):
+        voice_daily = {}
+        rows = self._conn.execute("SELECT guild_id, user_id, day, seconds FROM voice_daily WHERE day >= ?", (since_day,))
+        for guild_id, user_id, day, seconds in rows:
+            voice_daily.setdefault(guild_id, {}).setdefault(user_id, {})[day] = seconds
+        return voice_daily
+
+    def write_batch(self, batch):
+        with self._conn:
+            for guild_id, guild_settings in batch.settings.items():
+                if guild_settings is None:
+                    self._conn.execute("DELETE FROM guild_settings WHERE guild_id = ?", (guild_id,))
+                else:
+                    # 쓰기 잠금을 잡은 상태에서 순번을 정하므로 프로세스가 여럿이어도 커밋 순서대로 증가함
+                    self._conn.execute(
+                        "INSERT INTO guild_settings (guild_id, data, revision) "
+                        "VALUES (?, ?, (SELECT COALESCE(MAX(revision), 0) + 1 FROM guild_settings)) "
+                        "ON CONFLICT(guild_id) DO UPDATE SET data = excluded.data, revision = excluded.revision",
+                        (guild_id, json.dumps(guild_settings, ensure_ascii=False))
+                    )
+
+            for (guild_id, user_id), times in batch.warnings.items():
+                if times is None:
+                    self._conn.execute("DELETE FROM warnings WHERE guild_id = ? AND user_id = ?", (guild_id, user_id))
+                else:
+                    self._conn.execute(
+                        "INSERT INTO warnings (guild_id, user_id, count, times) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(guild_id, user_id) DO UPDATE SET count = excluded.count, times = excluded.times",
+                        (guild_id, user_id, len(times), json.dumps(times))
+                    )
+
+            for (guild_id, user_id), seconds in batch.voice_times.items():
+                self._conn.execute(
+                    "INSERT INTO voice_totals (guild_id, user_id, total_seconds) VALUES (?, ?, ?) "
+                    "ON CONFLICT(guild_id, user_id) DO UPDATE SET total_seconds = excluded.total_seconds",
+                    (guild_id, user_id, seconds)
+                )
+
+            for (guild_id, user_id, day), seconds in batch.voice_daily.items():
+                self._conn.execute(
+                    "INSERT INTO voice_daily (guild_id, user_id, day, seconds) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(guild_id, user_id, day) DO UPDATE SET seconds = excluded.seconds",
+                    (guild_id, user_id, day, seconds)
+                )
+
+    def changed_settings(self):
+        # data_version은 다른 연결이 커밋했을 때만 바뀌므로, 변경이 없으면 쿼리 한 번으로 끝남
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return {}
+        self._data_version = data_version
+
+        changed = {}
+        rows = self._conn.execute("SELECT guild_id, data, revision FROM guild_settings WHERE revision > ?", (self._revision,))
+        for guild_id, data, revision in rows:
+            changed[guild_id] = json.loads(data)
+            self._revision = max(self._revision, revision)
+        return changed
+
+    def export_rows(self, kind, guild_id=None, user_id=None, start=None, end=None):
+        start_day, end_day, start_at, end_at = _export_range(start, end)
+        conditions, params = [], []
+        if guild_id is not None:
+            conditions.append("guild_id = ?")
+            params.append(guild_id)
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+
+        if kind == 'voice_totals':
+            query = "SELECT guild_id, user_id, total_seconds FROM voice_totals"
+        elif kind == 'voice_daily':
+            query = "SELECT guild_id, user_id, day, seconds FROM voice_daily"
+            conditions.append("day BETWEEN ? AND ?")
+            params += [start_day, end_day]
+        elif kind == 'warnings':
+            query = "SELECT guild_id, user_id, times FROM warnings"
+        else:
+            raise ValueError(f"알 수 없는 내보내기 종류입니다: {kind}")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY guild_id, user_id" + (", day" if kind == 'voice_daily' else "")
+
+        # 쓰기 연결과 별도의 읽기 전용 연결에서 EXPORT_CHUNK_ROWS개씩 읽어 메모리 사용량을 일정하게 유지
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute("PRAGMA query_only = ON")
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(EXPORT_CHUNK_ROWS)
+                if not rows:
+                    break
+                for row in rows:
+                    if kind == 'voice_totals':
+                        yield row[0], row[1], round(row[2], 1)
+                    elif kind == 'voice_daily':
+                        yield row[0], row[1], datetime.date.fromordinal(row[2]).isoformat(), round(row[3], 1)
+                    else:
+                        for at in json.loads(row[2]):
+                            if start_at <= at < end_at:
+                                yield row[0], row[1], _format_time(at)
+        finally:
+            conn.close()
+
+    def close(self):
+        self._conn.close()
+
+
+def _export_range(start, end):
+    """내보내기 기간(date, 포함)을 (시작 날짜 번호, 끝 날짜 번호, 시작 시각, 끝 시각 미만)으로 바꿉니다."""
+    start_day = start.toordinal() if start else 0
+    end_day = end.toordinal() if end else datetime.date.max.toordinal()
+    start_at = time.mktime(start.timetuple()) if start else float('-inf')
+    end_at = time.mktime((end + datetime.timedelta(days=1)).timetuple()) if end else float('inf')
+    return start_day, end_day, start_at, end_at
+
+def _format_time(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).isoformat(timespec='seconds')
+
+
+BACKENDS = {
+    'json': JsonBackend,
+    'sqlite': SqliteBackend,
+}
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """기존 config.json의 모든 데이터를 SQLite 데이터베이스로 옮기고 옮긴 서버 수를 반환합니다."""
+    # 옮기기가 실패해도 원본을 그대로 다시 쓸 수 있도록 config.json은 고치지 않음
+    source = JsonBackend(json_path, read_only=True)
+    settings, warnings, voice_times = source.load()
+
+    batch = StorageBatch()
+    batch.settings = dict(settings)
+    for guild_id, users in warnings.items():
+        for user_id, times in users.items():
+            batch.warnings[(guild_id, user_id)] = times
+    for guild_id, totals in voice_times.items():
+        for user_id, seconds in totals.items():
+            batch.voice_times[(guild_id, user_id)] = seconds
+    for guild_id, users in source.load_voice_daily(0).items():
+        for user_id, days in users.items():
+            for day, seconds in days.items():
+                batch.voice_daily[(guild_id, user_id, day)] = seconds
+
+    backend = SqliteBackend(db_path)
+    try:
+        backend.write_batch(batch)
+    finally:
+        backend.close()
+    return len(settings.keys() | warnings.keys() | voice_times.keys())
+
+
+def open_backend(name, json_path, db_path):
+    """이름에 해당하는 저장소를 엽니다. SQLite 파일이 처음 만들어질 때 config.json이 있으면 자동으로 가져옵니다."""
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 저장소 종류입니다: {name}")
+
+    if name == 'json':
+        return JsonBackend(json_path)
+
+    if not os.path.exists(db_path) and os.path.exists(json_path):
+        count = migrate_json_to_sqlite(json_path, db_path)
+        print(f"{json_path}의 {count}개 서버 데이터를 {db_path}(으)로 옮겼습니다.")
+    return SqliteBackend(db_path)
@@ -0,0 +1,129 @@
+import unicodedata
+
+# 모양이 비슷해 검열 우회에 쓰이는 문자 → 대표 문자
+HOMOGLYPHS = {
+    # 키릴 문자
+    'а': 'a', 'в': 'b', 'е': 'e', 'к': 'k', 'м': 'm', 'н': 'h', 'о': 'o', 'р': 'p',
+    'с': 'c', 'т': 't', 'у': 'y', 'х': 'x', 'і': 'i', 'ј': 'j', 'ѕ': 's', 'ԁ': 'd',
+    # 그리스 문자
+    'α': 'a', 'β': 'b', 'ε': 'e', 'ι': 'i', 'κ': 'k', 'ν': 'v', 'ο': 'o', 'ρ': 'p',
+    'τ': 't', 'υ': 'u', 'χ': 'x',
+    # 숫자/기호 치환
+    '0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '@': 'a', '$': 's', '!': 'i',
+}
+
+# 한글 자모 조합용 상수
+_SYLLABLE_BASE = 0xAC00
+_CHOSEONG_BASE = 0x1100
+_JUNGSEONG_BASE = 0x1161
+_JONGSEONG_BASE = 0x11A7
+_CHOSEONG_COUNT = 19
+_JUNGSEONG_COUNT = 21
+_JONGSEONG_COUNT = 28
+# 초성 번호 → 같은 자음의 종성 번호 (ㄸ, ㅃ, ㅉ은 종성이 없음)
+_CHOSEONG_TO_JONGSEONG = [1, 2, 4, 7, 0, 8, 16, 17, 0, 19, 20, 21, 22, 0, 23, 24, 25, 26, 27]
+
+
+def _choseong_index(ch):
+    index = ord(ch) - _CHOSEONG_BASE
+    return index if 0 <= index < _CHOSEONG_COUNT else -1
+
+def _jungseong_index(ch):
+    index = ord(ch) - _JUNGSEONG_BASE
+    return index if 0 <= index < _JUNGSEONG_COUNT else -1
+
+def _jongseong_index(ch):
+    index = ord(ch) - _JONGSEONG_BASE
+    return index if 0 < index < _JONGSEONG_COUNT else -1
+
+def _open_syllable_index(ch):
+    """받침 없는 완성형 음절이면 음절 번호를, 아니면 -1을 반환합니다."""
+    index = ord(ch) - _SYLLABLE_BASE
+    if 0 <= index < _CHOSEONG_COUNT * _JUNGSEONG_COUNT * _JONGSEONG_COUNT and index % _JONGSEONG_COUNT == 0:
+        return index
+    return -1
+
+
+def _compose_jamo(chars, starts, ends, spaced):
+    """풀어 쓴 자모(ㄱㅏㄴ 등)를 완성형 음절로 합칩니다. 원문 위치도 함께 합칩니다.
+
+    받침은 자모로 합친 음절에만 붙입니다. 원래 완성형인 음절('바보ㅋㅋ'의 '보'), 공백 건너편의 자음,
+    모음 없이 이어지는 자음 줄('ㅋㅋ')의 첫 자음은 받침으로 보지 않습니다. spaced는 앞에 공백이 있던 글자의 번호 집합입니다.
+    """
+    out_chars, out_starts, out_ends = [], [], []
+    i, length = 0, len(chars)
+    while i < length:
+        ch = chars[i]
+        start, end = starts[i], ends[i]
+        syllable = -1
+
+        lead = _choseong_index(ch)
+        composed = lead >= 0 and i + 1 < length and _jungseong_index(chars[i + 1]) >= 0
+        if composed:
+            syllable = (lead * _JUNGSEONG_COUNT + _jungseong_index(chars[i + 1])) * _JONGSEONG_COUNT
+            end = ends[i + 1]
+            i += 2
+        else:
+            syllable = _open_syllable_index(ch)
+            i += 1
+
+        if syllable < 0:
+            out_chars.append(ch)
+            out_starts.append(start)
+            out_ends.append(end)
+            continue
+
+        # 뒤따르는 자음을 받침으로 붙임 (원래 종성 자모는 완성형 음절에도 붙임)
+        if i < length and i not in spaced:
+            tail = _jongseong_index(chars[i])
+            if tail < 0 and composed:
+                tail = _tail_from_choseong(chars, i, spaced)
+            if tail > 0:
+                syllable += tail
+                end = ends[i]
+                i += 1
+
+        out_chars.append(chr(_SYLLABLE_BASE + syllable))
+        out_starts.append(start)
+        out_ends.append(end)
+    return out_chars, out_starts, out_ends
+
+def _tail_from_choseong(chars, i, spaced):
+    """chars[i]의 초성 자모를 앞 음절의 받침으로 볼 수 있으면 종성 번호를, 아니면 -1을 반환합니다."""
+    lead = _choseong_index(chars[i])
+    if lead < 0:
+        return -1
+    following = i + 1
+    if following < len(chars) and following not in spaced:
+        if _jungseong_index(chars[following]) >= 0:
+            return -1  # 다음 음절의 초성
+        if _choseong_index(chars[following]) >= 0 and not (
+            following + 1 < len(chars) and _jungseong_index(chars[following + 1]) >= 0
+        ):
+            return -1  # 'ㅋㅋ'처럼 모음 없이 이어지는 자음
+    return _CHOSEONG_TO_JONGSEONG[lead] or -1
+
+
+def normalize_text(text, fold_homoglyphs=True):
+    """검열 비교용으로 문자열을 정규화합니다.
+
+    NFKC 정규화, 소문자 변환, 공백·제로폭·결합 문자 제거, 유사 문자 치환, 한글 자모 조합을 한 번에 수행하고
+    (정규화된 문자열, 각 글자의 원문 시작 위치 목록, 원문 끝 위치 목록)을 반환합니다.
+    """
+    chars, starts, ends = [], [], []
+    spaced = set()  # 바로 앞에 공백이 있던 글자의 번호
+    for position, original in enumerate(text):
+        for ch in unicodedata.normalize('NFKC', original).lower():
+            if ch.isspace():
+                spaced.add(len(chars))
+                continue
+            if unicodedata.category(ch) in ('Cf', 'Mn', 'Me'):
+                continue
+            if fold_homoglyphs:
+                ch = HOMOGLYPHS.get(ch, ch)
+            chars.append(ch)
+            starts.append(position)
+            ends.append(position + 1)
+
+    chars, starts, ends = _compose_jamo(chars, starts, ends, spaced)
+    return ''.join(chars), starts, ends
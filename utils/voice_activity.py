@@ -0,0 +1,68 @@
+import datetime
+from array import array
+
+BUCKET_DAYS = 31  # 메모리에 보관하는 일별 기록 기간 (이번 달 랭킹까지 계산 가능)
+
+PERIODS = {"all": "전체", "day": "오늘", "week": "이번 주", "month": "이번 달"}
+
+
+def day_number(timestamp):
+    """유닉스 시각을 (봇이 실행되는 지역 시간 기준) 날짜 번호로 바꿉니다."""
+    return datetime.date.fromtimestamp(timestamp).toordinal()
+
+def split_by_day(started_at, ended_at):
+    """[started_at, ended_at) 구간을 날짜별로 나눠 {날짜 번호: 초}를 반환합니다."""
+    result = {}
+    current = started_at
+    while current < ended_at:
+        day = day_number(current)
+        next_midnight = datetime.datetime.combine(datetime.date.fromordinal(day + 1), datetime.time()).timestamp()
+        segment_end = min(ended_at, next_midnight)
+        result[day] = result.get(day, 0) + (segment_end - current)
+        current = segment_end
+    return result
+
+def period_start_day(period, today=None):
+    """기간의 첫 날짜 번호를 반환합니다. 'all'이면 None입니다."""
+    today = today or datetime.date.today()
+    if period == "day":
+        return today.toordinal()
+    if period == "week":
+        return today.toordinal() - today.weekday()
+    if period == "month":
+        return today.replace(day=1).toordinal()
+    return None
+
+
+class DailyBuckets:
+    """한 사용자의 최근 BUCKET_DAYS일 체류 시간을 고정 크기 배열에 날짜별로 보관합니다.
+
+    날짜 번호를 배열 크기로 나눈 나머지 칸을 쓰고, 칸에 적힌 날짜가 다르면 오래된 값으로 보고 덮어씁니다.
+    """
+
+    __slots__ = ('seconds', 'days')
+
+    def __init__(self):
+        self.seconds = array('d', bytes(8 * BUCKET_DAYS))
+        self.days = array('q', [-1] * BUCKET_DAYS)
+
+    def add(self, day, seconds):
+        """날짜에 체류 시간을 더하고 그 날짜의 새 합계를 반환합니다."""
+        index = day % BUCKET_DAYS
+        if self.days[index] != day:
+            if self.days[index] > day:
+                return None  # 보관 기간보다 오래된 날짜
+            self.days[index] = day
+            self.seconds[index] = 0.0
+        self.seconds[index] += seconds
+        return self.seconds[index]
+
+    def total(self, start_day, end_day):
+        """start_day부터 end_day까지(포함)의 합계를 반환합니다. 최대 BUCKET_DAYS칸만 확인합니다."""
+        start_day = max(start_day, end_day - BUCKET_DAYS + 1)
+        total = 0.0
+        for day in range(start_day, end_day + 1):
+            index = day % BUCKET_DAYS
+            if self.days[index] == day:
+                total += self.seconds[index]
+        return total
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from .sharding import get_shard_config
+
+VOICE_LEDGER_FILE = "voice_sessions.jsonl"
+HEARTBEAT_INTERVAL = 60  # 봇이 살아 있음을 기록하는 주기(초)
+COMPACT_LINES = 10000    # 파일이 이 줄 수(열린 세션 수의 2배가 더 크면 그 수)를 넘으면 생존 기록 때 다시 씀
+
+
+class VoiceLedger:
+    """열려 있는 음성 채널 세션을 추가 전용(JSONL) 파일에 기록하여 재시작 후에도 복원합니다.
+
+    기록 종류는 open(입장), close(퇴장), alive(봇 생존 시각) 세 가지이며, 시작할 때와 실행 중 파일이
+    COMPACT_LINES를 넘었을 때 열린 세션만 남기고 파일을 다시 씁니다. 파일 쓰기는 전용 스레드에서 처리합니다.
+    샤드를 여러 프로세스가 나눠 맡으면 프로세스마다 별도의 파일을 씁니다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.sessions = {}     # {(guild_id, user_id): (channel_id, 입장 시각)}
+        self.last_seen = None  # 마지막으로 봇이 살아 있던 시각 (재시작 시 빠진 퇴장을 이 시각으로 마감)
+        self._loaded = False
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="voice-ledger")
+        self._heartbeat_task = None
+        self._closed = False
+        self._lines = 0  # 파일의 기록 줄 수 (다시 쓸 때를 정함)
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None:
+            self.path = get_shard_config().scoped_path(VOICE_LEDGER_FILE)
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 기록 도중 종료되어 잘린 마지막 줄
+                at = record.get("at")
+                if at is not None and (self.last_seen is None or at > self.last_seen):
+                    self.last_seen = at
+
+                key = (record.get("guild"), record.get("user"))
+                if record.get("op") == "open":
+                    self.sessions[key] = (record.get("channel"), at)
+                elif record.get("op") == "close":
+                    self.sessions.pop(key, None)
+
+        self._rewrite(self._compacted_records())
+
+    def _compacted_records(self):
+        """열린 세션과 마지막 생존 시각만 담은 기록 목록을 만듭니다."""
+        records = [self._open_record(key, channel_id, joined_at) for key, (channel_id, joined_at) in self.sessions.items()]
+        if self.last_seen is not None:
+            records.append({"op": "alive", "at": self.last_seen})
+        return records
+
+    def _rewrite(self, records):
+        # 열린 세션만 남겨 파일을 압축 (임시 파일에 쓴 뒤 교체)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        os.replace(temp_path, self.path)
+        self._lines = len(records)
+
+    @staticmethod
+    def _open_record(key, channel_id, joined_at):
+        return {"op": "open", "guild": key[0], "user": key[1], "channel": channel_id, "at": joined_at}
+
+    def _write(self, records):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        self._lines += len(records)
+
+    def _append(self, records):
+        if records and not self._closed:
+            self._writer.submit(self._write, records)
+
+    def get(self, guild_id, user_id):
+        """열린 세션을 (channel_id, 입장 시각)으로 반환합니다. 없으면 None입니다."""
+        self._ensure_loaded()
+        return self.sessions.get((str(guild_id), str(user_id)))
+
+    def guild_sessions(self, guild_id):
+        """서버의 열린 세션을 {user_id: (channel_id, 입장 시각)}으로 반환합니다."""
+        self._ensure_loaded()
+        guild_id = str(guild_id)
+        return {user_id: session for (g, user_id), session in self.sessions.items() if g == guild_id}
+
+    def open_many(self, entries, at=None):
+        """[(guild_id, user_id, channel_id)] 세션을 한 번에 엽니다."""
+        self._ensure_loaded()
+        at = at or time.time()
+        records = []
+        for guild_id, user_id, channel_id in entries:
+            key = (str(guild_id), str(user_id))
+            self.sessions[key] = (channel_id, at)
+            records.append(self._open_record(key, channel_id, at))
+        self._append(records)
+
+    def close_many(self, keys, at=None):
+        """[(guild_id, user_id)] 세션을 한 번에 닫고 {(guild_id, user_id): (channel_id, 체류 시간)}을 반환합니다."""
+        self._ensure_loaded()
+        at = at or time.time()
+        closed, records = {}, []
+        for guild_id, user_id in keys:
+            key = (str(guild_id), str(user_id))
+            session = self.sessions.pop(key, None)
+            if session is None:
+                continue
+            channel_id, joined_at = session
+            closed[key] = (channel_id, max(0.0, at - joined_at))
+            records.append({"op": "close", "guild": key[0], "user": key[1], "at": at})
+        self._append(records)
+        return closed
+
+    def open(self, guild_id, user_id, channel_id, at=None):
+        """세션을 엽니다."""
+        self.open_many([(guild_id, user_id, channel_id)], at)
+
+    def close(self, guild_id, user_id, at=None):
+        """세션을 닫고 (channel_id, 체류 시간)을 반환합니다. 열린 세션이 없으면 None입니다."""
+        return self.close_many([(guild_id, user_id)], at).get((str(guild_id), str(user_id)))
+
+    def last_alive(self):
+        """이전 기록 기준으로 봇이 마지막으로 살아 있던 시각을 반환합니다. 기록이 없으면 None입니다."""
+        self._ensure_loaded()
+        return self.last_seen
+
+    def heartbeat(self):
+        """봇이 지금 살아 있음을 기록합니다."""
+        self._ensure_loaded()
+        self.last_seen = time.time()
+        if self._lines > max(COMPACT_LINES, 2 * len(self.sessions)) and not self._closed:
+            # 지금까지의 상태로 다시 쓰며, 쓰기 스레드가 순서대로 처리하므로 이후 기록은 새 파일 뒤에 붙음
+            self._writer.submit(self._rewrite, self._compacted_records())
+        else:
+            self._append([{"op": "alive", "at": self.last_seen}])
+
+    def start_heartbeat(self):
+        """주기적으로 생존 시각을 기록하는 작업을 시작합니다. 이미 실행 중이면 아무것도 하지 않습니다."""
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self):
+        while True:
+            self.heartbeat()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    def shutdown(self):
+        """종료 시각을 기록하고 남은 쓰기가 끝날 때까지 기다립니다."""
+        if self._closed:
+            return
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+        if self._loaded:
+            self.heartbeat()
+        self._closed = True
+        self._writer.shutdown(wait=True)
+
+
+voice_ledger = VoiceLedger()
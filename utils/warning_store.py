@@ -0,0 +1,46 @@
+from collections import deque
+
+DAY_SECONDS = 86400
+
+
+class WarningHistory:
+    """한 사용자의 경고 시각을 오래된 순서로 보관합니다.
+
+    만료된 경고는 주기적으로 훑어 지우지 않고, 조회하거나 새 경고를 더할 때 앞쪽부터 필요한 만큼만 버립니다.
+    """
+
+    __slots__ = ('times',)
+
+    def __init__(self, times=()):
+        self.times = deque(sorted(times))
+
+    def __len__(self):
+        return len(self.times)
+
+    def prune(self, cutoff):
+        """cutoff보다 오래된 경고를 버리고 버린 개수를 반환합니다. cutoff가 None이면 만료 없음입니다."""
+        if cutoff is None:
+            return 0
+        times = self.times
+        removed = 0
+        while times and times[0] < cutoff:
+            times.popleft()
+            removed += 1
+        return removed
+
+    def add(self, at):
+        """at 시각의 경고를 더하고 새 경고 수를 반환합니다."""
+        if self.times and at < self.times[-1]:
+            at = self.times[-1]  # 시계가 뒤로 가도 오래된 순서를 유지
+        self.times.append(at)
+        return len(self.times)
+
+    def to_list(self):
+        return list(self.times)
+
+
+def decay_cutoff(decay_days, now):
+    """경고 유효 기간(일) 기준으로, 이보다 오래된 경고는 세지 않는 시각을 반환합니다. 0이면 None입니다."""
+    if not decay_days or decay_days <= 0:
+        return None
+    return now - decay_days * DAY_SECONDS
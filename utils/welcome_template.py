@@ -0,0 +1,75 @@
+from string import Template
+from .config_manager import add_settings_listener
+
+# 입장할 때마다 멤버에 따라 달라지는 변수
+MEMBER_FIELDS = {
+    'user_mention': lambda member: member.mention,
+    'user_name': lambda member: member.display_name,
+    'user_id': lambda member: member.id,
+    'member_count': lambda member: member.guild.member_count,
+    'user': str,
+}
+
+
+class WelcomeTemplate:
+    """환영 메시지 템플릿을 한 번만 해석해 둔 것입니다.
+
+    server_name, server_id, server 같은 서버 고정 값은 컴파일할 때 글자로 채워 넣고, 멤버 변수 자리만 남겨
+    입장할 때는 문자열 조각을 이어 붙이기만 합니다. 알 수 없는 변수나 잘못된 $는 safe_substitute처럼 그대로 둡니다.
+    """
+
+    __slots__ = ('source', 'guild_name', 'literals', 'fields')
+
+    def __init__(self, source, guild):
+        self.source = source
+        self.guild_name = guild.name
+        static_values = {'server_name': guild.name, 'server_id': guild.id, 'server': str(guild)}
+
+        self.literals = []  # 변수 자리 사이의 글자 조각 (len(fields) + 1개)
+        self.fields = []    # 멤버 변수 값을 구하는 함수
+        literal = []
+        position = 0
+        for match in Template.pattern.finditer(source):
+            literal.append(source[position:match.start()])
+            position = match.end()
+            name = match.group('named') or match.group('braced')
+            if match.group('escaped') is not None:
+                literal.append('$')
+            elif name in static_values:
+                # 채워 넣은 값은 다시 해석하지 않으므로 서버 이름에 $가 있어도 변수로 바뀌지 않음
+                literal.append(str(static_values[name]))
+            elif name in MEMBER_FIELDS:
+                self.literals.append(''.join(literal))
+                self.fields.append(MEMBER_FIELDS[name])
+                literal = []
+            else:
+                literal.append(match.group())
+        literal.append(source[position:])
+        self.literals.append(''.join(literal))
+
+    def render(self, member):
+        """멤버 변수를 채운 환영 메시지를 반환합니다."""
+        parts = [self.literals[0]]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            parts.append(str(field(member)))
+            parts.append(literal)
+        return ''.join(parts)
+
+
+# 서버별로 컴파일된 환영 메시지 캐시 (메시지를 저장할 때 비움)
+_welcome_templates = {}
+
+def get_welcome_template(guild, source):
+    """서버의 컴파일된 환영 메시지를 반환합니다. 메시지나 서버 이름이 바뀌었으면 다시 컴파일합니다."""
+    guild_id = str(guild.id)
+    template = _welcome_templates.get(guild_id)
+    if template is None or template.source != source or template.guild_name != guild.name:
+        template = _welcome_templates[guild_id] = WelcomeTemplate(source, guild)
+    return template
+
+def invalidate_welcome_template(guild_id):
+    """환영 메시지가 바뀌었을 때 호출하여 다음 입장 때 다시 컴파일하도록 합니다."""
+    _welcome_templates.pop(str(guild_id), None)
+
+# 다른 프로세스(샤드)에서 설정이 바뀌어도 다시 만들도록 등록
+add_settings_listener(invalidate_welcome_template)
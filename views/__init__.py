@@ -1,13 +1,2 @@
-from .settings_view import SettingsView
-from .welcome_view import WelcomeSettingsView, WelcomeMessageModal
-from .punishment_view import PunishmentSettingsView, PunishmentConfigModal
-from .keyword_modal import KeywordModal
-
-__all__ = [
-    'SettingsView',
-    'WelcomeSettingsView',
-    'WelcomeMessageModal',
-    'PunishmentSettingsView',
-    'PunishmentConfigModal',
-    'KeywordModal'
-]
+# View는 필요한 모듈에서 직접 가져옵니다. (예: from views.settings_view import SettingsView)
+# 패키지를 import할 때 모든 View 모듈을 불러오지 않도록 여기서는 아무것도 re-export하지 않습니다.
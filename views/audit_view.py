@@ -0,0 +1,56 @@
+import discord
+from utils import AUDIT_ACTIONS, AUDIT_COUNT_CAP, audit_journal
+
+PAGE_SIZE = 10
+
+def format_audit_entry(at, user_id, actor_id, action, detail, show_user):
+    """감사 기록 한 줄을 만듭니다."""
+    line = f"<t:{int(at)}:f> **{AUDIT_ACTIONS.get(action, action)}**"
+    if show_user and user_id:
+        line += f" <@{user_id}>"
+    if detail:
+        line += f" · {detail[:150]}"
+    if actor_id:
+        line += f" (처리: <@{actor_id}>)"
+    return line
+
+
+class AuditLogView(discord.ui.View):
+    """감사 기록을 페이지 단위로 넘겨보는 UI 뷰"""
+    def __init__(self, guild_id: str, user: discord.abc.User = None):
+        super().__init__(timeout=300)
+        self.guild_id = guild_id
+        self.user = user
+        self.page = 0
+        self.total = None
+        self._cursors = [None]  # 페이지별 시작 위치 (이전 페이지 마지막 기록)
+
+    async def build_embed(self):
+        """현재 페이지의 기록을 조회해 임베드를 만들고 버튼 상태를 갱신합니다."""
+        user_id = self.user.id if self.user else None
+        if self.total is None:
+            self.total = await audit_journal.count(self.guild_id, user_id)
+        rows, next_cursor = await audit_journal.query(self.guild_id, user_id, limit=PAGE_SIZE, before=self._cursors[self.page])
+        del self._cursors[self.page + 1:]
+        if next_cursor is not None:
+            self._cursors.append(next_cursor)
+
+        title = f"📜 {self.user.display_name} 님의 기록" if self.user else "📜 서버 감사 기록"
+        lines = [format_audit_entry(*row, show_user=self.user is None) for row in rows]
+        embed = discord.Embed(title=title, description="\n".join(lines) or "남은 기록이 없습니다.", color=discord.Color.dark_teal())
+        total = f"{self.total:,}건 이상" if self.total >= AUDIT_COUNT_CAP else f"{self.total:,}건"
+        embed.set_footer(text=f"{self.page + 1} 페이지 · 전체 {total}")
+
+        self.previous_button.disabled = self.page == 0
+        self.next_button.disabled = next_cursor is None
+        return embed
+
+    @discord.ui.button(label="이전", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        await interaction.response.edit_message(embed=await self.build_embed(), view=self)
+
+    @discord.ui.button(label="다음", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = min(self.page + 1, len(self._cursors) - 1)
+        await interaction.response.edit_message(embed=await self.build_embed(), view=self)
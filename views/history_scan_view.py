@@ -0,0 +1,31 @@
+import discord
+
+def build_scan_embed(scan, status):
+    """지난 메시지 검사의 진행 상황과 처리량을 보여주는 임베드를 만듭니다."""
+    color = discord.Color.green() if scan.finished else discord.Color.orange() if scan.cancelled else discord.Color.blue()
+    embed = discord.Embed(title="🔎 지난 메시지 검열 검사", description=f"{scan.channel.mention} · {status}", color=color)
+    embed.add_field(name="검사한 메시지", value=f"{scan.scanned:,}개", inline=True)
+    embed.add_field(name="삭제한 메시지", value=f"{scan.deleted:,}개", inline=True)
+    embed.add_field(name="처리 속도", value=f"{scan.rate():,.0f}개/초", inline=True)
+    embed.add_field(
+        name="삭제 요청",
+        value=f"일괄 삭제 {scan.bulk_calls}번 · 개별 삭제 {scan.single_deletes}번" + (f" · 실패 {scan.failed}개" if scan.failed else ""),
+        inline=False
+    )
+    embed.set_footer(text=f"검사 범위: {scan.until.astimezone():%Y-%m-%d %H:%M} 이후 메시지 (14일이 지난 메시지는 하나씩 삭제됩니다)")
+    return embed
+
+
+class HistoryScanView(discord.ui.View):
+    """진행 중인 지난 메시지 검사를 멈추는 버튼"""
+    def __init__(self, scan):
+        super().__init__(timeout=None)
+        self.scan = scan
+
+    @discord.ui.button(label="중지", style=discord.ButtonStyle.danger, emoji="⏹️")
+    async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.scan.cancel()
+        button.disabled = True
+        await interaction.response.edit_message(
+            embed=build_scan_embed(self.scan, "현재 페이지를 마친 뒤 중지합니다..."), view=self
+        )
@@ -1,17 +1,25 @@
 import discord
-from utils import load_config, save_config, config_lock
+from utils import load_config, save_config, guild_lock, invalidate_keyword_matcher, invalidate_pattern_rules, compile_rule
 
 class KeywordModal(discord.ui.Modal):
-    def __init__(self, title: str, action: str):
+    def __init__(self, title: str, action: str, rule_type: str = 'keyword'):
         super().__init__(title=title)
         self.action = action
-        self.keyword_input = discord.ui.TextInput(label="키워드", placeholder="등록하거나 삭제할 키워드를 입력하세요.")
+        self.rule_type = rule_type
+        if rule_type == 'keyword':
+            self.keyword_input = discord.ui.TextInput(label="키워드", placeholder="등록하거나 삭제할 키워드를 입력하세요.")
+        else:
+            self.keyword_input = discord.ui.TextInput(label="패턴", placeholder="예: 바*보 (와일드카드) 또는 ^광고.+ (정규식)", max_length=200)
         self.add_item(self.keyword_input)
 
     async def on_submit(self, interaction: discord.Interaction):
+        if self.rule_type != 'keyword':
+            await self.submit_pattern(interaction)
+            return
+
         keyword = self.keyword_input.value
         guild_id = str(interaction.guild.id)
-        async with config_lock:
+        async with guild_lock(guild_id, 'censored_keywords'):
             config = load_config()
             if guild_id not in config:
                 config[guild_id] = {"censored_keywords": []}
@@ -21,17 +29,70 @@ class KeywordModal(discord.ui.Modal):
             keywords = config[guild_id]["censored_keywords"]
 
             if self.action == 'add':
-                if keyword not in keywords:
+                changed = keyword not in keywords
+                if changed:
                     keywords.append(keyword)
-                    save_config(config)
-                    await interaction.response.send_message(f"✅ 키워드 '{keyword}' 추가 완료.", ephemeral=True)
-                else:
-                    await interaction.response.send_message(f"⚠️ 이미 등록된 키워드입니다.", ephemeral=True)
-
-            elif self.action == 'remove':
-                if keyword in keywords:
+            else:
+                changed = keyword in keywords
+                if changed:
                     keywords.remove(keyword)
-                    save_config(config)
-                    await interaction.response.send_message(f"🗑️ 키워드 '{keyword}' 삭제 완료.", ephemeral=True)
-                else:
-                    await interaction.response.send_message(f"❓ 등록되지 않은 키워드입니다.", ephemeral=True)
+
+            if changed:
+                save_config(config, guild_id)
+                invalidate_keyword_matcher(guild_id)
+
+        # 응답 전송은 잠금 밖에서 처리
+        if self.action == 'add':
+            if changed:
+                await interaction.response.send_message(f"✅ 키워드 '{keyword}' 추가 완료.", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"⚠️ 이미 등록된 키워드입니다.", ephemeral=True)
+
+        elif self.action == 'remove':
+            if changed:
+                await interaction.response.send_message(f"🗑️ 키워드 '{keyword}' 삭제 완료.", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"❓ 등록되지 않은 키워드입니다.", ephemeral=True)
+
+    async def submit_pattern(self, interaction: discord.Interaction):
+        """와일드카드/정규식 규칙을 추가하거나 삭제합니다."""
+        rule = {"type": self.rule_type, "pattern": self.keyword_input.value}
+        guild_id = str(interaction.guild.id)
+
+        if self.action == 'add':
+            try:
+                compile_rule(rule["type"], rule["pattern"])
+            except ValueError as e:
+                await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+                return
+
+        async with guild_lock(guild_id, 'censored_patterns'):
+            config = load_config()
+            if guild_id not in config:
+                config[guild_id] = {}
+            patterns = config[guild_id].setdefault("censored_patterns", [])
+
+            if self.action == 'add':
+                changed = rule not in patterns
+                if changed:
+                    patterns.append(rule)
+            else:
+                changed = rule in patterns
+                if changed:
+                    patterns.remove(rule)
+
+            if changed:
+                save_config(config, guild_id)
+                invalidate_pattern_rules(guild_id)
+
+        if self.action == 'add':
+            if changed:
+                await interaction.response.send_message(f"✅ 패턴 '{rule['pattern']}' 추가 완료.", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"⚠️ 이미 등록된 패턴입니다.", ephemeral=True)
+
+        elif self.action == 'remove':
+            if changed:
+                await interaction.response.send_message(f"🗑️ 패턴 '{rule['pattern']}' 삭제 완료.", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"❓ 등록되지 않은 패턴입니다.", ephemeral=True)
@@ -1,5 +1,5 @@
 import discord
-from utils import load_config, save_config, config_lock
+from utils import load_config, save_config, guild_lock
 
 class PunishmentConfigModal(discord.ui.Modal):
     """처벌 임계값과 타임아웃 시간을 설정하는 모달"""
@@ -14,6 +14,9 @@ class PunishmentConfigModal(discord.ui.Modal):
             self.duration_input = discord.ui.TextInput(label="타임아웃 시간 (분)", placeholder="예: 10 (10분간 타임아웃)", required=True)
             self.add_item(self.duration_input)
 
+        self.decay_input = discord.ui.TextInput(label="경고 유효 기간 (일)", placeholder="예: 30 (30일이 지난 경고는 세지 않음, 비워두면 만료 없음)", required=False)
+        self.add_item(self.decay_input)
+
     async def on_submit(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
 
@@ -33,7 +36,16 @@ class PunishmentConfigModal(discord.ui.Modal):
                 await interaction.response.send_message("타임아웃 시간은 0보다 큰 숫자로 입력해주세요.", ephemeral=True)
                 return
 
-        async with config_lock:
+        decay_days = 0
+        if self.decay_input.value.strip():
+            try:
+                decay_days = int(self.decay_input.value)
+                if decay_days < 0: raise ValueError
+            except ValueError:
+                await interaction.response.send_message("경고 유효 기간은 0 이상의 숫자로 입력해주세요.", ephemeral=True)
+                return
+
+        async with guild_lock(guild_id, 'punishment'):
             config = load_config()
             if guild_id not in config:
                 config[guild_id] = {}
@@ -41,9 +53,10 @@ class PunishmentConfigModal(discord.ui.Modal):
             config[guild_id]['punishment'] = {
                 "type": self.punishment_type,
                 "threshold": threshold,
-                "timeout_duration_minutes": duration
+                "timeout_duration_minutes": duration,
+                "warning_decay_days": decay_days
             }
-            save_config(config)
+            save_config(config, guild_id)
         await interaction.response.send_message(f"✅ 처벌 설정이 저장되었습니다.", ephemeral=True)
 
 
@@ -65,13 +78,13 @@ class PunishmentSettingsView(discord.ui.View):
         punishment_type = select.values[0]
 
         if punishment_type == "none":
-            async with config_lock:
+            guild_id = str(interaction.guild.id)
+            async with guild_lock(guild_id, 'punishment'):
                 config = load_config()
-                guild_id = str(interaction.guild.id)
                 if guild_id not in config:
                     config[guild_id] = {}
                 config[guild_id]['punishment'] = {"type": "none", "threshold": 0, "timeout_duration_minutes": 0}
-                save_config(config)
+                save_config(config, guild_id)
             await interaction.response.send_message("✅ 자동 처벌을 사용하지 않도록 설정했습니다.", ephemeral=True)
         else:
             await interaction.response.send_modal(PunishmentConfigModal(punishment_type))
@@ -1,5 +1,11 @@
 import discord
-from utils import load_config, save_config, config_lock
+from utils import load_config, save_config, guild_lock, get_tracked_voice_channels
+
+def format_voice_channels(guild):
+    """서버에서 감시 중인 음성 채널들을 멘션 목록 문자열로 반환합니다."""
+    channels = [guild.get_channel(channel_id) for channel_id in get_tracked_voice_channels(guild.id)]
+    mentions = sorted((channel.mention for channel in channels if channel), key=str)
+    return ", ".join(mentions) if mentions else "미설정"
 
 class SettingsView(discord.ui.View):
     """채널 설정을 위한 드롭다운 메뉴가 포함된 UI 뷰 클래스입니다."""
@@ -10,18 +16,22 @@ class SettingsView(discord.ui.View):
     @discord.ui.select(
         cls=discord.ui.ChannelSelect,
         channel_types=[discord.ChannelType.voice],
-        placeholder="📢 감시할 음성 채널을 선택하세요",
+        placeholder="📢 감시할 음성 채널을 선택하세요 (여러 개 선택 가능)",
+        min_values=1,
+        max_values=25,
         row=0
     )
     async def voice_channel_select(self, interaction: discord.Interaction, select: discord.ui.ChannelSelect):
-        selected_channel = select.values[0]
-        async with config_lock:
+        selected_channels = select.values
+        async with guild_lock(self.guild_id, 'channels'):
             config = load_config()
             if self.guild_id not in config:
                 config[self.guild_id] = {}
-            config[self.guild_id]["voice_channel_id"] = selected_channel.id
-            save_config(config)
-        await self.update_embed(interaction, f"음성 채널이 {selected_channel.mention}(으)로 설정되었습니다.")
+            config[self.guild_id]["voice_channel_ids"] = [channel.id for channel in selected_channels]
+            config[self.guild_id].pop("voice_channel_id", None)  # 단일 채널 설정은 목록으로 대체
+            save_config(config, self.guild_id)
+        mentions = ", ".join(channel.mention for channel in selected_channels)
+        await self.update_embed(interaction, f"음성 채널이 {mentions}(으)로 설정되었습니다.")
 
     @discord.ui.select(
         cls=discord.ui.ChannelSelect,
@@ -31,23 +41,21 @@ class SettingsView(discord.ui.View):
     )
     async def text_channel_select(self, interaction: discord.Interaction, select: discord.ui.ChannelSelect):
         selected_channel = select.values[0]
-        async with config_lock:
+        async with guild_lock(self.guild_id, 'channels'):
             config = load_config()
             if self.guild_id not in config:
                 config[self.guild_id] = {}
             config[self.guild_id]["text_channel_id"] = selected_channel.id
-            save_config(config)
+            save_config(config, self.guild_id)
         await self.update_embed(interaction, f"로그 채널이 {selected_channel.mention}(으)로 설정되었습니다.")
 
     async def update_embed(self, interaction: discord.Interaction, status_message: str):
         config = load_config().get(self.guild_id, {})
-        voice_channel_id = config.get("voice_channel_id")
         text_channel_id = config.get("text_channel_id")
-        vc = interaction.guild.get_channel(voice_channel_id) if voice_channel_id else None
         tc = interaction.guild.get_channel(text_channel_id) if text_channel_id else None
 
         embed = discord.Embed(title="🎙️ 음성 채널 로그 설정", color=discord.Color.blue())
         embed.description = status_message
-        embed.add_field(name="감시 중인 음성 채널", value=vc.mention if vc else "미설정", inline=False)
+        embed.add_field(name="감시 중인 음성 채널", value=format_voice_channels(interaction.guild), inline=False)
         embed.add_field(name="로그가 기록될 텍스트 채널", value=tc.mention if tc else "미설정", inline=False)
         await interaction.response.edit_message(embed=embed, view=self)
@@ -1,7 +1,6 @@
 import discord
 import datetime
-from string import Template
-from utils import load_config, save_config, config_lock
+from utils import load_config, save_config, guild_lock, WelcomeTemplate, invalidate_welcome_template
 
 class WelcomeMessageModal(discord.ui.Modal, title="환영 메시지 편집"):
     """환영 메시지 내용을 편집하는 모달"""
@@ -39,14 +38,15 @@ class WelcomeMessageModal(discord.ui.Modal, title="환영 메시지 편집"):
         guild_id = str(interaction.guild.id)
         embed_enabled = self.embed_toggle.value.lower() == "true"
 
-        async with config_lock:
+        async with guild_lock(guild_id, 'welcome_message'):
             config = load_config()
             if guild_id not in config: config[guild_id] = {}
             if 'welcome_message' not in config[guild_id]: config[guild_id]['welcome_message'] = {}
 
             config[guild_id]['welcome_message']['message'] = self.message_input.value
             config[guild_id]['welcome_message']['use_embed'] = embed_enabled
-            save_config(config)
+            save_config(config, guild_id)
+        invalidate_welcome_template(guild_id)
 
         await interaction.response.send_message("✅ 환영 메시지가 성공적으로 저장되었습니다.", ephemeral=True)
 
@@ -67,13 +67,13 @@ class WelcomeSettingsView(discord.ui.View):
     )
     async def toggle_welcome(self, interaction: discord.Interaction, select: discord.ui.Select):
         enabled = select.values[0] == "true"
-        async with config_lock:
+        async with guild_lock(self.guild_id, 'welcome_message'):
             config = load_config()
             if self.guild_id not in config: config[self.guild_id] = {}
             if 'welcome_message' not in config[self.guild_id]: config[self.guild_id]['welcome_message'] = {}
 
             config[self.guild_id]['welcome_message']['enabled'] = enabled
-            save_config(config)
+            save_config(config, self.guild_id)
 
         await self.update_and_respond(interaction, f"환영 메시지 기능이 {'✅ 켜졌습니다' if enabled else '❌ 꺼졌습니다'}.")
 
@@ -85,13 +85,13 @@ class WelcomeSettingsView(discord.ui.View):
     )
     async def channel_select(self, interaction: discord.Interaction, select: discord.ui.ChannelSelect):
         channel = select.values[0]
-        async with config_lock:
+        async with guild_lock(self.guild_id, 'welcome_message'):
             config = load_config()
             if self.guild_id not in config: config[self.guild_id] = {}
             if 'welcome_message' not in config[self.guild_id]: config[self.guild_id]['welcome_message'] = {}
 
             config[self.guild_id]['welcome_message']['channel_id'] = channel.id
-            save_config(config)
+            save_config(config, self.guild_id)
 
         await self.update_and_respond(interaction, f"환영 메시지 채널이 {channel.mention}(으)로 설정되었습니다.")
 
@@ -114,18 +114,9 @@ class WelcomeSettingsView(discord.ui.View):
             await interaction.response.send_message("⚠️ 설정된 환영 메시지가 없습니다. 먼저 메시지를 작성해주세요.", ephemeral=True)
             return
 
-        # 미리보기용 변수 치환
+        # 미리보기용 변수 치환 (실제 입장 메시지와 같은 방식으로 처리)
         try:
-            formatted_message = Template(message_template).safe_substitute(
-                user_mention=interaction.user.mention,
-                user_name=interaction.user.display_name,
-                user_id=interaction.user.id,
-                server_name=interaction.guild.name,
-                server_id=interaction.guild.id,
-                member_count=interaction.guild.member_count,
-                user=str(interaction.user),
-                server=str(interaction.guild)
-            )
+            formatted_message = WelcomeTemplate(message_template, interaction.guild).render(interaction.user)
         except Exception as e:
             await interaction.response.send_message(f"⚠️ 메시지 형식 오류: {e}", ephemeral=True)
             return